@@ -0,0 +1,100 @@
+"""
+Latency/throughput benchmark of micro-batched encoding against direct calls
+
+Runs concurrent client threads that each embed one text at a time, first
+calling the model directly (batch size 1), then through an EncodeDispatcher
+for each max_batch setting, and reports p50/p99 request latency, throughput
+and the mean batch size actually formed.
+
+By default the model is a synthetic stand-in whose encode call costs a fixed
+overhead plus a per-text cost and runs one call at a time, like a single
+device; pass --model to measure a real SentenceTransformer instead.
+
+    python -m ai_utils.benchmark_encode --clients 32 --requests 50 --batches 1,8,32,64
+    python -m ai_utils.benchmark_encode --model sentence-transformers/all-MiniLM-L6-v2
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from ai_utils.encode_dispatcher import EncodeDispatcher
+
+class SyntheticModel:
+    """Model stand-in: one call at a time, costing overhead + per_item * len(texts)"""
+
+    def __init__(self, overhead_ms, per_item_ms, dim=384):
+        self.overhead = overhead_ms / 1000
+        self.per_item = per_item_ms / 1000
+        self.dim = dim
+        self._lock = threading.Lock()
+
+    def encode(self, texts):
+        single = isinstance(texts, str)
+        count = 1 if single else len(texts)
+        with self._lock:
+            time.sleep(self.overhead + self.per_item * count)
+        embeddings = np.random.default_rng(count).normal(size=(count, self.dim)).astype(np.float32)
+        return embeddings[0] if single else embeddings
+
+def run_clients(embed, clients, requests, texts):
+    """Run client threads calling embed(text); returns (latencies in ms, wall seconds)"""
+    latencies = [[] for _ in range(clients)]
+    barrier = threading.Barrier(clients + 1)
+
+    def client(index):
+        barrier.wait()
+        for i in range(requests):
+            text = texts[(index * requests + i) % len(texts)]
+            start = time.perf_counter()
+            embed(text)
+            latencies[index].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return np.concatenate([np.asarray(l) for l in latencies]), time.perf_counter() - start
+
+def report(label, latencies, wall, batch_size):
+    print(f"{label:>10} {np.percentile(latencies, 50):>9.1f} {np.percentile(latencies, 99):>9.1f} "
+          f"{len(latencies) / wall:>10.0f} {batch_size:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=None, help='SentenceTransformer name (default: synthetic model)')
+    parser.add_argument('--overhead-ms', type=float, default=8.0)
+    parser.add_argument('--per-item-ms', type=float, default=0.3)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--batches', default='1,8,32,64')
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.model:
+        from ai_utils.model_registry import MODEL_REGISTRY
+        model = MODEL_REGISTRY.get(args.model)
+        model.encode(["warmup"])
+    else:
+        model = SyntheticModel(args.overhead_ms, args.per_item_ms)
+    texts = [f"How should I budget for expense number {i} this month?" for i in range(1000)]
+
+    print(f"{args.clients} clients x {args.requests} requests, max_wait {args.max_wait_ms} ms")
+    print(f"{'max_batch':>10} {'p50 ms':>9} {'p99 ms':>9} {'texts/s':>10} {'mean batch':>10}")
+
+    latencies, wall = run_clients(model.encode, args.clients, args.requests, texts)
+    report('direct', latencies, wall, 1.0)
+
+    for max_batch in [int(b) for b in args.batches.split(',')]:
+        dispatcher = EncodeDispatcher(model.encode, max_batch=max_batch, max_wait=args.max_wait_ms / 1000)
+        latencies, wall = run_clients(lambda text: dispatcher.submit(text).result(),
+                                      args.clients, args.requests, texts)
+        dispatcher.close()
+        report(str(max_batch), latencies, wall, dispatcher.mean_batch_size())
+
+if __name__ == '__main__':
+    main()
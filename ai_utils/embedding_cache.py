@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # No file locking (Windows): only one process may write a cache directory
+    fcntl = None
+
+def normalize_text(text: str) -> str:
+    """Canonical form of a text for cache keys: NFC, trimmed, single spaces"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def embedding_key(model_name: str, text: str) -> str:
+    """Cache key of a text's embedding under a model"""
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+class _DiskStore:
+    """Append-only float32 embedding file of one model, read through a memory map
+
+    Files share a prefix: `.json` holds the model name and dimension, `.f32`
+    the embedding rows and `.index` one key per line, line n naming row n.
+    Rows are written before their keys, so after a crash any rows without a
+    key (or a torn last key) are truncated by the next writer.
+
+    Several processes may share a store. Appends hold an exclusive lock on
+    the `.lock` file (on platforms with fcntl), row numbers come from the
+    index file itself, and each process picks up rows appended by others by
+    reading the index from where it last stopped.
+    """
+
+    def __init__(self, prefix: str, model_name: str):
+        self.model_name = model_name
+        self.meta_path = f"{prefix}.json"
+        self.data_path = f"{prefix}.f32"
+        self.index_path = f"{prefix}.index"
+        self.lock_path = f"{prefix}.lock"
+        self.dim: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        self._count = 0
+        self._index_offset = 0
+        self._map: Optional[np.memmap] = None
+        self._map_rows = 0
+        with self._locked(exclusive=True):
+            self._catch_up()
+            self._repair()
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        """Hold the store's file lock (a no-op without fcntl)"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _catch_up(self) -> None:
+        """Read index lines appended since the last call, ignoring a torn last line"""
+        if self.dim is None and os.path.exists(self.meta_path):
+            with open(self.meta_path, "r") as f:
+                self.dim = json.load(f)["dim"]
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        for key in data[:end].decode("utf-8").splitlines():
+            self.rows[key] = self._count
+            self._count += 1
+        self._index_offset += end
+
+    def _repair(self) -> None:
+        """Drop partial writes: a torn last key, rows without keys and keys without rows"""
+        if os.path.exists(self.index_path) and os.path.getsize(self.index_path) != self._index_offset:
+            with open(self.index_path, "r+b") as f:
+                f.truncate(self._index_offset)
+        if self.dim is None or not os.path.exists(self.data_path):
+            return
+
+        row_bytes = self.dim * 4
+        data_rows = os.path.getsize(self.data_path) // row_bytes
+        if data_rows < self._count:
+            keys = sorted(self.rows, key=self.rows.__getitem__)[:data_rows]
+            with open(self.index_path, "w") as f:
+                f.writelines(f"{key}\n" for key in keys)
+            self.rows = {key: row for row, key in enumerate(keys)}
+            self._count = data_rows
+            self._index_offset = os.path.getsize(self.index_path)
+        if os.path.getsize(self.data_path) != self._count * row_bytes:
+            with open(self.data_path, "r+b") as f:
+                f.truncate(self._count * row_bytes)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            # Pick up rows other processes appended, if the index grew
+            if not os.path.exists(self.index_path) or os.path.getsize(self.index_path) <= self._index_offset:
+                return None
+            with self._locked(exclusive=False):
+                self._catch_up()
+            row = self.rows.get(key)
+            if row is None:
+                return None
+        # Remap only when the row lies beyond the current mapping (the file grew)
+        if row >= self._map_rows:
+            self._map = np.memmap(self.data_path, dtype=np.float32, mode="r", shape=(self._count, self.dim))
+            self._map_rows = self._count
+        return np.array(self._map[row])
+
+    def append(self, keys: Sequence[str], embeddings: np.ndarray) -> None:
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        with self._locked(exclusive=True):
+            self._catch_up()
+            self._repair()
+            if self.dim is None:
+                self.dim = embeddings.shape[1]
+                with open(self.meta_path, "w") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+            elif embeddings.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {embeddings.shape[1]} does not match cache dimension {self.dim}")
+
+            # Another process may have cached some of these keys meanwhile
+            new = [i for i, key in enumerate(keys) if key not in self.rows]
+            if not new:
+                return
+            with open(self.data_path, "ab") as f:
+                f.write(embeddings[new].tobytes())
+            with open(self.index_path, "a") as f:
+                f.writelines(f"{keys[i]}\n" for i in new)
+            self._catch_up()
+
+class EmbeddingCache:
+    """Two-tier cache of text embeddings keyed by (model name, normalized text hash)
+
+    An in-memory LRU of recently used embeddings sits in front of an optional
+    on-disk store per model: a memory-mapped float32 matrix plus an index file
+    mapping keys to rows. Disk hits are promoted into memory; new embeddings
+    are appended to both tiers. Processes may share a cache directory.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_memory_entries: int = 10000):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._stores: Dict[str, _DiskStore] = {}
+        self._lock = threading.Lock()
+
+        # Lookup counters: memory_hits, disk_hits, misses
+        self.stats: Counter = Counter()
+
+    def _store(self, model_name: str) -> Optional[_DiskStore]:
+        """Disk store of a model, opened on first use"""
+        if not self.cache_dir:
+            return None
+        store = self._stores.get(model_name)
+        if store is None:
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+            store = _DiskStore(os.path.join(self.cache_dir, slug), model_name)
+            self._stores[model_name] = store
+        return store
+
+    def _remember(self, key: str, embedding: np.ndarray) -> None:
+        """Insert into the memory LRU, evicting the least recently used"""
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Copies of the cached embeddings of texts, with None for each miss"""
+        keys = [embedding_key(model_name, text) for text in texts]
+        results: List[Optional[np.ndarray]] = []
+        with self._lock:
+            store = self._store(model_name)
+            for key in keys:
+                embedding = self._memory.get(key)
+                if embedding is not None:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                elif store is not None:
+                    embedding = store.get(key)
+                    if embedding is not None:
+                        self._remember(key, embedding)
+                        self.stats["disk_hits"] += 1
+                if embedding is None:
+                    self.stats["misses"] += 1
+                # Callers may modify what they get without touching the cache
+                results.append(None if embedding is None else embedding.copy())
+        return results
+
+    def put_many(self, model_name: str, texts: Sequence[str], embeddings: np.ndarray) -> None:
+        """Add newly computed embeddings to both tiers"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        new_keys, new_rows, seen = [], [], set()
+        with self._lock:
+            store = self._store(model_name)
+            for text, embedding in zip(texts, embeddings):
+                key = embedding_key(model_name, text)
+                self._remember(key, embedding.copy())
+                if store is not None and key not in store.rows and key not in seen:
+                    seen.add(key)
+                    new_keys.append(key)
+                    new_rows.append(embedding)
+            if new_keys:
+                try:
+                    store.append(new_keys, np.stack(new_rows))
+                except Exception as e:
+                    print(f"Error writing embedding cache: {e}")
+
+    def metrics(self) -> Dict[str, float]:
+        """Hit counters, hit rate and tier sizes"""
+        with self._lock:
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            lookups = hits + self.stats["misses"]
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": sum(len(store.rows) for store in self._stores.values()),
+                "memory_hits": self.stats["memory_hits"],
+                "disk_hits": self.stats["disk_hits"],
+                "misses": self.stats["misses"],
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
+
+# Caches shared by every EmbeddingManager in the process, one per directory
+_SHARED_CACHES: Dict[Optional[str], EmbeddingCache] = {}
+_SHARED_CACHES_LOCK = threading.Lock()
+
+def shared_embedding_cache(cache_dir: Optional[str] = None, max_memory_entries: int = 10000) -> EmbeddingCache:
+    """The process-wide cache for a directory (None for memory only), created on first use"""
+    with _SHARED_CACHES_LOCK:
+        cache = _SHARED_CACHES.get(cache_dir)
+        if cache is None:
+            cache = EmbeddingCache(cache_dir, max_memory_entries)
+            _SHARED_CACHES[cache_dir] = cache
+        return cache
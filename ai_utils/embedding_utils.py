@@ -1,16 +1,46 @@
 import os
 import json
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Union
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from .model_registry import MODEL_REGISTRY, ModelRegistry
+from .encode_dispatcher import EncodeDispatcher
+from .embedding_cache import EmbeddingCache, shared_embedding_cache
+from .ranking import normalize_rows, top_k_indices
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
 class EmbeddingManager:
     """Handles text embeddings using various models"""
     
-    def __init__(self, config_path: str = "../config.json"):
+    def __init__(self, config_path: str = "../config.json", registry: Optional[ModelRegistry] = None,
+                 cache: Optional[EmbeddingCache] = None):
         self.config = self._load_config(config_path)
-        self.model_name = self.config.get("ai_models", {}).get("embedding_model", "sentence-transformers/all-MiniLM-L6-v2")
-        self.model = self._load_model()
+        self.model_name = self.config.get("ai_models", {}).get("embedding_model", DEFAULT_EMBEDDING_MODEL)
+        
+        # Models are shared process-wide and loaded on first encode
+        self.registry = registry or MODEL_REGISTRY
+        
+        # Micro-batching of concurrent get_embedding calls ("micro_batching",
+        # "max_batch" and "max_wait_ms" in the embedding model config). Off by
+        # default: it only pays off under concurrent load, since a lone call
+        # waits up to max_wait_ms for company.
+        embedding_config = self.config.get("ai_models", {}).get("embedding", {})
+        self.micro_batching = embedding_config.get("micro_batching", False)
+        self.max_batch = embedding_config.get("max_batch", 32)
+        self.max_wait_ms = embedding_config.get("max_wait_ms", 5)
+        self._dispatcher = None
+        self._dispatcher_lock = threading.Lock()
+        
+        # Embedding cache ("cache": {"dir", "memory_entries"} in the embedding
+        # model config), shared by every manager using the same directory
+        cache_config = embedding_config.get("cache")
+        if cache is None and cache_config:
+            cache = shared_embedding_cache(cache_config.get("dir"), cache_config.get("memory_entries", 10000))
+        self.cache = cache
         
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from JSON file"""
@@ -19,57 +49,183 @@ class EmbeddingManager:
                 return json.load(f)
         except Exception as e:
             print(f"Error loading config: {e}")
-            return {"ai_models": {"embedding_model": "sentence-transformers/all-MiniLM-L6-v2"}}
+            return {"ai_models": {"embedding_model": DEFAULT_EMBEDDING_MODEL}}
             
     def _load_model(self) -> SentenceTransformer:
-        """Load the embedding model"""
+        """Get the embedding model from the shared registry"""
         try:
-            return SentenceTransformer(self.model_name)
+            return self.registry.get(self.model_name)
         except Exception as e:
             print(f"Error loading model {self.model_name}: {e}")
             # Fallback to a common model
-            return SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+            self.model_name = DEFAULT_EMBEDDING_MODEL
+            return self.registry.get(self.model_name)
+    
+    @property
+    def model(self) -> SentenceTransformer:
+        """The shared embedding model, loaded on first use"""
+        return self._load_model()
+    
+    def embedding_dimension(self) -> int:
+        """Dimension of the model's embeddings (the configured "dimension" if the model cannot tell)"""
+        get_dimension = getattr(self.model, "get_sentence_embedding_dimension", None)
+        dimension = get_dimension() if get_dimension is not None else None
+        if dimension is None:
+            dimension = self.config.get("ai_models", {}).get("embedding", {}).get("dimension", 384)
+        return dimension
+    
+    def warmup(self) -> None:
+        """Load the model ahead of the first request"""
+        self.model.encode(["warmup"])
+    
+    def unload(self) -> None:
+        """Release the shared model; it is reloaded on next use"""
+        self.registry.unload(self.model_name)
             
+    def _encode_uncached(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Run the model on texts and cache the results"""
+        kwargs = {"batch_size": batch_size} if batch_size else {}
+        embeddings = self.model.encode(texts, **kwargs)
+        if self.cache is not None:
+            self.cache.put_many(self.model_name, texts, embeddings)
+        return embeddings
+    
+    def _encode(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
+        """Embed texts, running the model only for texts missing from the cache"""
+        if self.cache is None:
+            return self._encode_uncached(texts, batch_size)
+        embeddings = self.cache.get_many(self.model_name, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            computed = self._encode_uncached([texts[i] for i in missing], batch_size)
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+        return np.stack(embeddings)
+    
+    def cache_metrics(self) -> Optional[Dict[str, float]]:
+        """Embedding cache hit counters and hit rate (None without a cache)"""
+        return self.cache.metrics() if self.cache is not None else None
+    
     def get_embeddings(self, texts: List[str]) -> List[np.ndarray]:
         """Generate embeddings for a list of texts"""
         if not texts:
             return []
-        return self.model.encode(texts)
+        return self._encode(texts)
+    
+    def get_embeddings_batched(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Embed texts in chunked model calls into one contiguous float32 matrix"""
+        if not texts:
+            return np.empty((0, self.embedding_dimension()), dtype=np.float32)
+        
+        embeddings = None
+        for start in range(0, len(texts), batch_size):
+            chunk = self._encode(texts[start:start + batch_size], batch_size)
+            if embeddings is None:
+                embeddings = np.empty((len(texts), chunk.shape[1]), dtype=np.float32)
+            embeddings[start:start + len(chunk)] = chunk
+        return embeddings
     
     def get_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for a single text"""
         if not text:
             return np.zeros(384)  # Default dimension for the model
+        if self.micro_batching:
+            return self.get_embedding_async(text).result()
+        if self.cache is not None:
+            return self._encode([text])[0]
         return self.model.encode(text)
     
+    def _get_dispatcher(self) -> EncodeDispatcher:
+        """Start the micro-batching dispatcher on first use"""
+        with self._dispatcher_lock:
+            if self._dispatcher is None:
+                self._dispatcher = EncodeDispatcher(
+                    self._encode_uncached,
+                    max_batch=self.max_batch,
+                    max_wait=self.max_wait_ms / 1000
+                )
+            return self._dispatcher
+    
+    def get_embedding_async(self, text: str) -> Future:
+        """Queue a text for batched encoding and return a Future for its embedding
+        
+        Concurrent calls are coalesced into one model call of up to max_batch
+        texts, flushed after at most max_wait_ms. Cache hits resolve at once
+        with a copy of the cached embedding.
+        """
+        if not text:
+            future: Future = Future()
+            future.set_result(np.zeros(384))
+            return future
+        if self.cache is not None:
+            cached = self.cache.get_many(self.model_name, [text])[0]
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+        return self._get_dispatcher().submit(text)
+    
+    def close(self) -> None:
+        """Stop the micro-batching dispatcher"""
+        with self._dispatcher_lock:
+            if self._dispatcher is not None:
+                self._dispatcher.close()
+                self._dispatcher = None
+    
     def similarity(self, text1: str, text2: str) -> float:
         """Calculate cosine similarity between two texts"""
-        emb1 = self.get_embedding(text1)
-        emb2 = self.get_embedding(text2)
+        if self.micro_batching:
+            # Queue both texts before waiting, so they share one flush
+            futures = [self.get_embedding_async(text1), self.get_embedding_async(text2)]
+            emb1, emb2 = (future.result() for future in futures)
+        else:
+            emb1 = self.get_embedding(text1)
+            emb2 = self.get_embedding(text2)
         return self._cosine_similarity(emb1, emb2)
     
-    def similarities(self, query: str, texts: List[str]) -> List[float]:
-        """Calculate cosine similarities between a query and multiple texts"""
-        query_emb = self.get_embedding(query)
-        text_embs = self.get_embeddings(texts)
-        return [self._cosine_similarity(query_emb, text_emb) for text_emb in text_embs]
+    def encode_corpus(self, texts: List[str]) -> "EmbeddingCorpus":
+        """Embed candidate texts once for reuse across similarity queries"""
+        return EmbeddingCorpus(list(texts), normalize_rows(self.get_embeddings_batched(list(texts))))
+    
+    def _query_scores(self, query: str, texts: Union[List[str], "EmbeddingCorpus"]) -> np.ndarray:
+        """Cosine similarities of a query to texts or a precomputed corpus, as one matmul"""
+        corpus = texts if isinstance(texts, EmbeddingCorpus) else self.encode_corpus(texts)
+        query_emb = normalize_rows(np.asarray(self.get_embedding(query), dtype=np.float32)[None, :])[0]
+        return corpus.embeddings @ query_emb
+    
+    def similarities(self, query: str, texts: Union[List[str], "EmbeddingCorpus"]) -> List[float]:
+        """Calculate cosine similarities between a query and multiple texts (or an encoded corpus)"""
+        if not len(texts):
+            return []
+        return self._query_scores(query, texts).tolist()
     
     def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
         """Calculate cosine similarity between two vectors"""
         return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
     
-    def most_similar(self, query: str, texts: List[str], top_k: int = 5) -> List[Dict[str, Any]]:
-        """Find the most similar texts to a query"""
-        if not texts or not query:
+    def most_similar(self, query: str, texts: Union[List[str], "EmbeddingCorpus"],
+                     top_k: int = 5) -> List[Dict[str, Any]]:
+        """Find the most similar texts (or corpus entries) to a query"""
+        if not len(texts) or not query:
             return []
-            
-        similarities = self.similarities(query, texts)
         
-        # Create pairs of (text, similarity)
-        pairs = list(zip(texts, similarities))
+        scores = self._query_scores(query, texts)
+        candidates = texts.texts if isinstance(texts, EmbeddingCorpus) else texts
         
-        # Sort by similarity in descending order
-        sorted_pairs = sorted(pairs, key=lambda x: x[1], reverse=True)
-        
-        # Return top_k results with text and score
-        return [{"text": text, "score": float(score)} for text, score in sorted_pairs[:top_k]] 
\ No newline at end of file
+        # Return top_k results with text and score, best first
+        return [{"text": candidates[i], "score": float(scores[i])} for i in top_k_indices(scores, top_k)]
+
+class EmbeddingCorpus:
+    """Candidate texts with precomputed unit-length embeddings
+    
+    Built by EmbeddingManager.encode_corpus and passed to similarities or
+    most_similar in place of a text list, so the candidates are embedded once
+    and each query costs one encode plus one matrix-vector product.
+    """
+    
+    def __init__(self, texts: List[str], embeddings: np.ndarray):
+        self.texts = texts
+        self.embeddings = embeddings
+    
+    def __len__(self) -> int:
+        return len(self.texts)
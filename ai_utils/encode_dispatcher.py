@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, List, Optional, Tuple
+
+import numpy as np
+
+class EncodeDispatcher:
+    """Coalesces concurrent single-text encode calls into model batches
+
+    Callers submit one text at a time and get a Future for its embedding. A
+    background thread takes queued texts in batches of up to max_batch and
+    runs one encode call per batch. A batch is flushed as soon as it is full,
+    or max_wait seconds after its oldest text was queued, so a lone request
+    waits at most max_wait while concurrent requests share forward passes.
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], np.ndarray], max_batch: int = 32,
+                 max_wait: float = 0.005):
+        self.encode_batch = encode_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        # Queue of (text, future, enqueue time)
+        self._queue: Deque[Tuple[str, Future, float]] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+        # Counters for batch-size monitoring
+        self.batches = 0
+        self.items = 0
+
+        self._thread = threading.Thread(target=self._run, name="encode-dispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for encoding and return a Future for its embedding"""
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Encode dispatcher is closed")
+            self._queue.append((text, future, time.monotonic()))
+            if len(self._queue) == 1 or len(self._queue) >= self.max_batch:
+                self._condition.notify()
+        return future
+
+    def _take_batch(self) -> List[Tuple[str, Future, float]]:
+        """Wait for a full batch or the oldest text's deadline (empty once closed)"""
+        with self._condition:
+            while not self._queue and not self._closed:
+                self._condition.wait()
+            if not self._queue:
+                return []
+
+            deadline = self._queue[0][2] + self.max_wait
+            while len(self._queue) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            count = min(self.max_batch, len(self._queue))
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _run(self) -> None:
+        """Dispatcher thread: encode batches until closed and drained"""
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+
+            # Skip texts whose callers cancelled while they were queued
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                embeddings = self.encode_batch([text for text, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future, _), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+    def mean_batch_size(self) -> float:
+        """Average number of texts per encode call so far"""
+        return self.items / self.batches if self.batches else 0.0
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting texts, encode what is queued and stop the thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
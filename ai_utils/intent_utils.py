@@ -6,16 +6,18 @@ import numpy as np
 
 from .embedding_utils import EmbeddingManager
 from .llm_utils import LLMManager
+from .keyword_matcher import KeywordMatcher
 
 class IntentClassifier:
     """Classifier for identifying user intents from messages"""
     
-    def __init__(self, config_path: str = "../config.json"):
+    def __init__(self, config_path: str = "../config.json",
+                 embedding_manager: Optional[EmbeddingManager] = None):
         self.config = self._load_config(config_path)
         self.intent_config = self.config.get("ai_models", {}).get("intent", {})
         
         # Initialize components
-        self.embedding_manager = EmbeddingManager(config_path)
+        self.embedding_manager = embedding_manager or EmbeddingManager(config_path)
         self.llm_manager = LLMManager(config_path)
         
         # Load or initialize intents
@@ -52,28 +54,12 @@ class IntentClassifier:
     
     def classify_intent_rule_based(self, text: str) -> str:
         """Classify intent using simple rule-based approach"""
-        text = text.lower()
-        
-        if any(word in text for word in ["news", "article", "headline", "update"]):
-            return "news_inquiry"
-        
-        if any(word in text for word in ["recommend", "suggestion", "advice", "what should"]):
-            return "recommendation_request"
-            
-        if any(word in text for word in ["explain", "how", "what is", "tell me about"]):
-            return "information_request"
-            
-        if any(word in text for word in ["hello", "hi", "hey", "greetings"]):
-            return "greeting"
-            
-        if any(word in text for word in ["bye", "goodbye", "see you", "talk later"]):
-            return "farewell"
-            
-        if any(word in text for word in ["thanks", "thank you", "appreciate"]):
-            return "gratitude"
-            
-        if any(phrase in text for phrase in ["help me", "i need help", "can you help", "assist me"]):
-            return "help_request"
+        # One pass over the text finds every rule keyword; the first intent
+        # in priority order with a match wins
+        matched = INTENT_MATCHER.labels(text)
+        for intent in INTENT_KEYWORDS:
+            if intent in matched:
+                return intent
             
         return "general_query"
     
@@ -262,6 +248,19 @@ DEFAULT_INTENT_EXAMPLES = {
     ]
 }
 
+# Rule-based intent keywords in priority order (substring matches)
+INTENT_KEYWORDS = {
+    "news_inquiry": ["news", "article", "headline", "update"],
+    "recommendation_request": ["recommend", "suggestion", "advice", "what should"],
+    "information_request": ["explain", "how", "what is", "tell me about"],
+    "greeting": ["hello", "hi", "hey", "greetings"],
+    "farewell": ["bye", "goodbye", "see you", "talk later"],
+    "gratitude": ["thanks", "thank you", "appreciate"],
+    "help_request": ["help me", "i need help", "can you help", "assist me"]
+}
+
+INTENT_MATCHER = KeywordMatcher(INTENT_KEYWORDS, unit="char")
+
 # Stopwords for keyword extraction
 STOPWORDS = {
     "a", "about", "above", "after", "again", "against", "all", "am", "an", "and", "any", "are", "aren't", "as", "at",
@@ -0,0 +1,124 @@
+import re
+from collections import Counter, deque
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple, Union
+
+# Tokens are maximal runs of word characters
+TOKEN_PATTERN = re.compile(r'\w+')
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds many labelled keywords and phrases in one pass
+
+    Patterns are grouped under labels (e.g. keyword categories, sentiment
+    polarities or intents); one pattern may carry several labels. The
+    automaton runs over one of two units:
+
+    - "token": text is matched as a sequence of word tokens, so patterns only
+      match whole words and multi-word phrases ("interest rate") match
+      consecutive tokens.
+    - "char": text is matched character by character, which gives the same
+      substring semantics as `keyword in text`.
+
+    Matching is case-insensitive for string input; token lists are assumed to
+    be lowercased already.
+    """
+
+    def __init__(self, patterns: Dict[str, Iterable[str]], unit: str = "token"):
+        if unit not in ("token", "char"):
+            raise ValueError(f"Unknown matcher unit: {unit}")
+        self.unit = unit
+
+        # Pattern -> labels, keeping first-seen pattern order
+        self.pattern_labels: Dict[str, Set[str]] = {}
+        for label, keywords in patterns.items():
+            for keyword in keywords:
+                self.pattern_labels.setdefault(keyword.lower(), set()).add(label)
+        self.patterns: List[str] = list(self.pattern_labels)
+
+        self._build()
+
+    def _symbols(self, pattern: str) -> Sequence[str]:
+        """Split a pattern into automaton symbols"""
+        return tuple(TOKEN_PATTERN.findall(pattern)) if self.unit == "token" else pattern
+
+    def _build(self) -> None:
+        """Build the goto, failure and output tables"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        # Trie of all patterns
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for symbol in self._symbols(pattern):
+                next_state = self._goto[state].get(symbol)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][symbol] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            if state:
+                self._output[state] += (pattern_id,)
+
+        # Failure links in breadth-first order; outputs inherit along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for symbol, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and symbol not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(symbol, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+        # Every symbol that appears in some pattern
+        self._alphabet = frozenset(symbol for edges in self._goto for symbol in edges)
+
+    def _sequence(self, text: Union[str, Sequence[str]]) -> Sequence[str]:
+        """Turn input text into a symbol sequence"""
+        if isinstance(text, str):
+            text = text.lower()
+            return TOKEN_PATTERN.findall(text) if self.unit == "token" else text
+        return text
+
+    def iter_matches(self, text: Union[str, Sequence[str]]) -> Iterator[Tuple[int, str]]:
+        """Yield (end position, pattern) for every match, including overlapping ones"""
+        sequence = self._sequence(text)
+        alphabet = self._alphabet
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+
+        # Symbols outside the alphabet always return the automaton to the
+        # root, so only positions of alphabet symbols need to be stepped
+        state = 0
+        previous = -2
+        for position in [i for i, symbol in enumerate(sequence) if symbol in alphabet]:
+            if position != previous + 1:
+                state = 0
+            previous = position
+            symbol = sequence[position]
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            for pattern_id in output[state]:
+                yield position, patterns[pattern_id]
+
+    def count(self, text: Union[str, Sequence[str]]) -> Counter:
+        """Count occurrences of each pattern"""
+        return Counter(pattern for _, pattern in self.iter_matches(text))
+
+    def label_counts(self, text: Union[str, Sequence[str]]) -> Counter:
+        """Count pattern occurrences per label"""
+        counts = Counter()
+        for pattern, occurrences in self.count(text).items():
+            for label in self.pattern_labels[pattern]:
+                counts[label] += occurrences
+        return counts
+
+    def labels(self, text: Union[str, Sequence[str]]) -> Set[str]:
+        """Labels with at least one matching pattern"""
+        found = set()
+        for pattern in set(pattern for _, pattern in self.iter_matches(text)):
+            found |= self.pattern_labels[pattern]
+        return found
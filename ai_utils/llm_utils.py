@@ -6,6 +6,9 @@ import requests
 from langchain.llms import HuggingFaceHub, OpenAI
 from langchain.schema import LLMResult
 
+# Returned by LLMManager.generate when every provider failed
+UNAVAILABLE_RESPONSE = "I'm unable to generate a response at the moment. Please try again later."
+
 class LLMManager:
     """Manager for interacting with different LLM providers"""
     
@@ -122,7 +125,7 @@ class LLMManager:
                 print(f"Fallback LLM error: {e}")
         
         # If all else fails, return a default message
-        return "I'm unable to generate a response at the moment. Please try again later."
+        return UNAVAILABLE_RESPONSE
     
     def generate_with_context(self, prompt: str, context: List[str], retry_count: int = 1) -> str:
         """Generate a response from the LLM with context provided"""
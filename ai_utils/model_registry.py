@@ -0,0 +1,64 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sentence_transformers import SentenceTransformer
+
+class ModelRegistry:
+    """Process-wide, thread-safe registry of loaded embedding models
+
+    Models are keyed by name and loaded lazily on first use, so every
+    EmbeddingManager (and every component built on one) in a process shares
+    a single copy of each model. Loading takes a per-name lock: concurrent
+    first requests for one model wait for a single load, while different
+    models load in parallel.
+    """
+
+    def __init__(self, loader: Callable[[str], Any] = SentenceTransformer):
+        self.loader = loader
+        self._models: Dict[str, Any] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        """Return the model for a name, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        with load_lock:
+            model = self._models.get(name)
+            if model is None:
+                model = self.loader(name)
+                with self._lock:
+                    self._models[name] = model
+            return model
+
+    def warmup(self, names: Iterable[str]) -> None:
+        """Load models ahead of the first request and run one encode through each"""
+        for name in names:
+            self.get(name).encode(["warmup"])
+
+    def unload(self, name: Optional[str] = None) -> None:
+        """Drop a model (or every model) from the registry
+
+        Managers fetch the model from the registry on every call, so an
+        unloaded model is reloaded on its next use.
+        """
+        with self._lock:
+            if name is None:
+                self._models.clear()
+            else:
+                self._models.pop(name, None)
+
+    def loaded(self) -> List[str]:
+        """Names of the currently loaded models"""
+        with self._lock:
+            return list(self._models)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._models
+
+# Registry shared by every EmbeddingManager in the process
+MODEL_REGISTRY = ModelRegistry()
@@ -12,13 +12,14 @@ class RAGManager:
     
     def __init__(self, 
                  collection_name: str = "default", 
-                 config_path: str = "../config.json"):
+                 config_path: str = "../config.json",
+                 embedding_manager: Optional[EmbeddingManager] = None):
         
         self.config = self._load_config(config_path)
         self.rag_config = self.config.get("ai_models", {}).get("rag", {})
         
         # Initialize components
-        self.embedding_manager = EmbeddingManager(config_path)
+        self.embedding_manager = embedding_manager or EmbeddingManager(config_path)
         self.vector_store = VectorStore(collection_name, self.embedding_manager, config_path)
         self.llm_manager = LLMManager(config_path)
     
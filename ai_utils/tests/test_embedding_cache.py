@@ -0,0 +1,77 @@
+import os
+import threading
+
+import numpy as np
+
+from ai_utils.embedding_cache import EmbeddingCache, embedding_key
+
+
+def test_cached_embeddings_are_returned_as_copies():
+    cache = EmbeddingCache()
+    computed = np.array([[1.0, 2.0]], dtype=np.float32)
+    cache.put_many('model', ['text'], computed)
+    computed[0, 0] = 99.0
+
+    first, = cache.get_many('model', ['text'])
+    first[1] = -1.0
+    assert cache.get_many('model', ['text'])[0].tolist() == [1.0, 2.0]
+
+
+def test_keys_normalize_whitespace_and_separate_models():
+    assert embedding_key('m', '  Rates rise\n') == embedding_key('m', 'Rates rise')
+    assert embedding_key('m', 'Rates rise') != embedding_key('other', 'Rates rise')
+
+
+def test_disk_tier_persists_across_instances(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_memory_entries=1)
+    cache.put_many('org/model', ['a', 'b'], np.array([[1.0, 0.0], [0.0, 1.0]]))
+    # 'a' was evicted from memory and comes back from disk
+    assert [e.tolist() for e in cache.get_many('org/model', ['b', 'a', 'c'])[:2]] == [[0.0, 1.0], [1.0, 0.0]]
+    assert cache.metrics() == {
+        'memory_entries': 1, 'disk_entries': 2, 'memory_hits': 1, 'disk_hits': 1, 'misses': 1, 'hit_rate': 2 / 3
+    }
+
+    reopened = EmbeddingCache(str(tmp_path))
+    assert reopened.get_many('org/model', ['a'])[0].tolist() == [1.0, 0.0]
+    assert reopened.get_many('other', ['a']) == [None]
+    assert reopened.metrics()['disk_hits'] == 1
+
+
+def test_instances_sharing_a_directory_see_each_others_rows(tmp_path):
+    first, second = EmbeddingCache(str(tmp_path)), EmbeddingCache(str(tmp_path))
+    assert second.get_many('m', ['a']) == [None]
+
+    def put(cache, prefix):
+        for i in range(50):
+            cache.put_many('m', [f"{prefix}{i}", 'shared'], np.array([[float(i), 1.0], [0.0, 0.0]]))
+
+    threads = [threading.Thread(target=put, args=(cache, prefix)) for cache, prefix in ((first, 'x'), (second, 'y'))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reopened = EmbeddingCache(str(tmp_path))
+    texts = [f"{prefix}{i}" for prefix in 'xy' for i in range(50)] + ['shared']
+    embeddings = reopened.get_many('m', texts)
+    assert [e.tolist() for e in embeddings] == [[float(i), 1.0] for _ in 'xy' for i in range(50)] + [[0.0, 0.0]]
+    # Keys cached by both writers are stored once
+    assert reopened.metrics()['disk_entries'] == 101
+    assert first.get_many('m', ['y7'])[0].tolist() == [7.0, 1.0]
+
+
+def test_partial_writes_are_repaired_on_open(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many('m', ['a', 'b'], np.array([[1.0, 2.0], [3.0, 4.0]]))
+    prefix = str(tmp_path / 'm')
+    # A crashed writer left a row without a key and a torn key
+    with open(f"{prefix}.f32", 'ab') as f:
+        f.write(np.array([[5.0, 6.0]], dtype=np.float32).tobytes())
+    with open(f"{prefix}.index", 'a') as f:
+        f.write('c0ffee')
+
+    reopened = EmbeddingCache(str(tmp_path))
+    assert [e.tolist() for e in reopened.get_many('m', ['a', 'b'])] == [[1.0, 2.0], [3.0, 4.0]]
+    assert os.path.getsize(f"{prefix}.f32") == 2 * 2 * 4
+    reopened.put_many('m', ['c'], np.array([[7.0, 8.0]]))
+    assert EmbeddingCache(str(tmp_path)).get_many('m', ['c'])[0].tolist() == [7.0, 8.0]
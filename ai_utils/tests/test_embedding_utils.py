@@ -0,0 +1,113 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+# embedding_utils imports SentenceTransformer for type hints and the default registry
+pytest.importorskip('sentence_transformers')
+
+from ai_utils.embedding_cache import EmbeddingCache
+from ai_utils.embedding_utils import EmbeddingManager
+from ai_utils.model_registry import ModelRegistry
+
+
+class FakeModel:
+    """Deterministic stand-in for a SentenceTransformer: embeds text as letter counts"""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+    def _embed(self, text):
+        return [text.count('a') + 1.0, text.count('b') + 0.0, float(len(text))]
+
+    def encode(self, texts, batch_size=None):
+        with self._lock:
+            self.calls.append(texts)
+        if isinstance(texts, str):
+            return np.array(self._embed(texts), dtype=np.float32)
+        return np.array([self._embed(text) for text in texts], dtype=np.float32).reshape(len(texts), 3)
+
+
+@pytest.fixture
+def make_manager(tmp_path):
+    managers = []
+
+    def make(cache=None, **embedding_config):
+        config_path = tmp_path / f"config-{len(managers)}.json"
+        config_path.write_text(json.dumps({'ai_models': {'embedding': embedding_config}}))
+        model = FakeModel()
+        manager = EmbeddingManager(str(config_path), registry=ModelRegistry(loader=lambda name: model),
+                                   cache=cache)
+        managers.append(manager)
+        return manager, model
+
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+def test_micro_batched_embeddings_match_direct_encoding(make_manager):
+    manager, model = make_manager(micro_batching=True, max_batch=8, max_wait_ms=20)
+    texts = [f"{'a' * i}{'b' * (i % 3)}" for i in range(1, 17)]
+    futures = [manager.get_embedding_async(text) for text in texts]
+    embeddings = [future.result(5) for future in futures]
+
+    assert [e.tolist() for e in embeddings] == [model._embed(text) for text in texts]
+    assert all(len(call) <= 8 for call in model.calls)
+    assert len(model.calls) < len(texts)
+    assert manager.similarity('ab', 'ab') == pytest.approx(1.0)
+
+
+def test_micro_batching_is_off_by_default(make_manager):
+    manager, model = make_manager()
+    assert manager.get_embedding('ab').tolist() == model._embed('ab')
+    assert model.calls == ['ab']
+    assert manager._dispatcher is None
+
+
+def test_async_cache_hits_resolve_at_once_with_copies(make_manager):
+    manager, model = make_manager(cache=EmbeddingCache(), micro_batching=True, max_wait_ms=1)
+    first = manager.get_embedding_async('ab').result(5)
+    hit = manager.get_embedding_async('ab')
+    assert hit.done()
+    hit.result()[0] = -1.0
+    assert manager.get_embedding_async('ab').result().tolist() == first.tolist()
+    assert model.calls == [['ab']]
+
+
+def test_batched_embeddings_fill_one_float32_matrix(make_manager):
+    manager, model = make_manager()
+    texts = [f"{'a' * i}b" for i in range(10)]
+    embeddings = manager.get_embeddings_batched(texts, batch_size=4)
+
+    assert [len(call) for call in model.calls] == [4, 4, 2]
+    assert embeddings.dtype == np.float32 and embeddings.flags['C_CONTIGUOUS']
+    assert embeddings.tolist() == [model._embed(text) for text in texts]
+    assert manager.get_embeddings_batched([]).shape == (0, 3)
+
+
+def test_most_similar_matches_pairwise_cosine_ranking(make_manager):
+    manager, model = make_manager()
+    texts = ['a', 'aab', 'bbb', 'ab', 'aaaa', 'b', 'ba']
+    scores = [manager.similarity('aab', text) for text in texts]
+    expected = sorted(range(len(texts)), key=lambda i: (-scores[i], i))[:4]
+
+    ranked = manager.most_similar('aab', texts, top_k=4)
+    assert [r['text'] for r in ranked] == [texts[i] for i in expected]
+    assert [r['score'] for r in ranked] == pytest.approx([scores[i] for i in expected])
+    assert manager.similarities('aab', texts) == pytest.approx(scores)
+    assert manager.most_similar('aab', []) == []
+
+
+def test_encoded_corpus_is_embedded_once(make_manager):
+    manager, model = make_manager()
+    corpus = manager.encode_corpus(['a', 'ab', 'b'])
+    model.calls.clear()
+    assert manager.most_similar('b', corpus, top_k=1)[0]['text'] == 'b'
+    assert manager.similarities('a', corpus)[0] == pytest.approx(1.0)
+    assert model.calls == ['b', 'a']
@@ -0,0 +1,83 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ai_utils.encode_dispatcher import EncodeDispatcher
+
+
+class RecordingEncoder:
+    """encode_batch stand-in returning [len(text)] per text and recording batches"""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, texts):
+        self.release.wait(5)
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError('model crashed')
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+
+def test_concurrent_submissions_share_batches():
+    encoder = RecordingEncoder()
+    encoder.release.clear()
+    dispatcher = EncodeDispatcher(encoder, max_batch=4, max_wait=0.05)
+    try:
+        # The first text is encoded alone while the rest queue up behind it
+        first = dispatcher.submit('x')
+        while dispatcher._queue:
+            time.sleep(0.001)
+        futures = [dispatcher.submit('y' * i) for i in range(1, 9)]
+        encoder.release.set()
+
+        assert first.result(5).tolist() == [1.0]
+        assert [future.result(5).tolist() for future in futures] == [[float(i)] for i in range(1, 9)]
+        assert [len(batch) for batch in encoder.batches] == [1, 4, 4]
+        assert dispatcher.mean_batch_size() == 3.0
+    finally:
+        dispatcher.close()
+
+
+def test_partial_batch_is_flushed_after_max_wait():
+    encoder = RecordingEncoder()
+    dispatcher = EncodeDispatcher(encoder, max_batch=32, max_wait=0.02)
+    try:
+        started = time.monotonic()
+        futures = [dispatcher.submit('a'), dispatcher.submit('bb')]
+        assert [future.result(5).tolist() for future in futures] == [[1.0], [2.0]]
+        assert time.monotonic() - started < 1.0
+        assert encoder.batches == [['a', 'bb']]
+    finally:
+        dispatcher.close()
+
+
+def test_encode_errors_fail_the_batch_and_dispatching_continues():
+    encoder = RecordingEncoder(fail=True)
+    dispatcher = EncodeDispatcher(encoder, max_batch=2, max_wait=0.01)
+    try:
+        failed = dispatcher.submit('a')
+        with pytest.raises(RuntimeError, match='model crashed'):
+            failed.result(5)
+        encoder.fail = False
+        assert dispatcher.submit('abc').result(5).tolist() == [3.0]
+        assert dispatcher.batches == 1
+    finally:
+        dispatcher.close()
+
+
+def test_close_drains_queued_texts_and_rejects_new_ones():
+    encoder = RecordingEncoder()
+    dispatcher = EncodeDispatcher(encoder, max_batch=32, max_wait=10.0)
+    futures = [dispatcher.submit(text) for text in ('a', 'bb', 'ccc')]
+    dispatcher.close(timeout=5)
+
+    assert [future.result(0).tolist() for future in futures] == [[1.0], [2.0], [3.0]]
+    assert not dispatcher._thread.is_alive()
+    with pytest.raises(RuntimeError):
+        dispatcher.submit('late')
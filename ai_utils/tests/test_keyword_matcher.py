@@ -0,0 +1,65 @@
+import random
+from collections import Counter
+
+import pytest
+
+from ai_utils.keyword_matcher import KeywordMatcher, TOKEN_PATTERN
+
+PATTERNS = {
+    'debt': ['debt', 'loan', 'interest rate', 'credit'],
+    'savings': ['save', 'savings', 'nest egg', 'interest'],
+    'negative': ['loss', 'crash', 'credit crunch']
+}
+
+WORDS = ['debt', 'loan', 'interest', 'rate', 'rates', 'credit', 'crunch', 'save', 'savings',
+         'nest', 'egg', 'loss', 'crash', 'the', 'a', 'market', 'saved']
+
+
+def naive_token_counts(tokens, patterns):
+    """Occurrences of each pattern as a run of consecutive tokens"""
+    counts = Counter()
+    for pattern in patterns:
+        symbols = TOKEN_PATTERN.findall(pattern)
+        for start in range(len(tokens) - len(symbols) + 1):
+            if tokens[start:start + len(symbols)] == symbols:
+                counts[pattern] += 1
+    return counts
+
+
+def naive_char_counts(text, patterns):
+    """Overlapping substring occurrences of each pattern"""
+    counts = Counter()
+    for pattern in patterns:
+        counts[pattern] = sum(1 for i in range(len(text)) if text.startswith(pattern, i))
+    return +counts
+
+
+def test_token_matching_agrees_with_naive_scan():
+    matcher = KeywordMatcher(PATTERNS)
+    patterns = matcher.patterns
+    rng = random.Random(0)
+    for _ in range(200):
+        tokens = [rng.choice(WORDS) for _ in range(rng.randint(0, 30))]
+        assert matcher.count(tokens) == naive_token_counts(tokens, patterns)
+
+
+def test_char_matching_agrees_with_substring_scan():
+    matcher = KeywordMatcher(PATTERNS, unit='char')
+    rng = random.Random(1)
+    for _ in range(200):
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 20)))
+        assert matcher.count(text) == naive_char_counts(text, matcher.patterns)
+
+
+def test_labels_and_label_counts():
+    matcher = KeywordMatcher(PATTERNS)
+    text = "The Interest Rate on my loan rose; savings took a loss"
+    assert matcher.labels(text) == {'debt', 'savings', 'negative'}
+    # "interest" inside "interest rate" counts for savings as well
+    assert matcher.label_counts(text) == Counter({'debt': 2, 'savings': 2, 'negative': 1})
+    assert 'credit crunch' not in matcher.count("credit and crunch")
+
+
+def test_unknown_unit_is_rejected():
+    with pytest.raises(ValueError):
+        KeywordMatcher(PATTERNS, unit='word')
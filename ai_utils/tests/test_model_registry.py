@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+# model_registry defaults its loader to SentenceTransformer
+pytest.importorskip('sentence_transformers')
+
+from ai_utils.model_registry import ModelRegistry
+
+
+class CountingLoader:
+    """Model loader that records every load and takes a while to finish"""
+
+    def __init__(self):
+        self.loads = []
+
+    def __call__(self, name):
+        self.loads.append(name)
+        time.sleep(0.05)
+        return object()
+
+
+def test_concurrent_first_use_loads_a_model_once():
+    loader = CountingLoader()
+    registry = ModelRegistry(loader=loader)
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(registry.get('mini'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.loads == ['mini']
+    assert all(model is models[0] for model in models)
+    assert registry.loaded() == ['mini']
+
+
+def test_unloaded_models_are_reloaded_on_next_use():
+    loader = CountingLoader()
+    registry = ModelRegistry(loader=loader)
+    first = registry.get('mini')
+    registry.get('large')
+    registry.unload('mini')
+    assert 'mini' not in registry and 'large' in registry
+    assert registry.get('mini') is not first
+
+    registry.unload()
+    assert registry.loaded() == []
+    assert loader.loads == ['mini', 'large', 'mini']
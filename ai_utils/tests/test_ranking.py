@@ -0,0 +1,19 @@
+import numpy as np
+
+from ai_utils.ranking import normalize_rows, top_k_indices
+
+
+def test_top_k_matches_a_stable_sort_under_ties():
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        # Few distinct values, so ties at the k-th score are common
+        scores = rng.integers(0, 4, size=int(rng.integers(1, 30))).astype(np.float32)
+        k = int(rng.integers(1, len(scores) + 2))
+        expected = np.argsort(-scores, kind='stable')[:k]
+        assert top_k_indices(scores, k).tolist() == expected.tolist()
+
+
+def test_normalize_rows_keeps_zero_rows():
+    normed = normalize_rows(np.array([[3.0, 4.0], [0.0, 0.0]]))
+    assert normed.dtype == np.float32
+    assert normed.tolist() == [[0.6000000238418579, 0.800000011920929], [0.0, 0.0]]
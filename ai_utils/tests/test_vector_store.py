@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('chromadb')
+pytest.importorskip('sentence_transformers')
+
+from ai_utils.vector_store import BatchedEmbeddingFunction
+
+
+class FakeManager:
+    """EmbeddingManager stand-in recording the batch size it is asked for"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_embeddings_batched(self, texts, batch_size=64):
+        self.calls.append((list(texts), batch_size))
+        return np.arange(len(texts) * 2, dtype=np.float32).reshape(len(texts), 2)
+
+
+def test_embedding_function_encodes_documents_in_batches():
+    manager = FakeManager()
+    embed = BatchedEmbeddingFunction(manager, batch_size=16)
+    embeddings = embed(('first', 'second'))
+
+    assert manager.calls == [(['first', 'second'], 16)]
+    assert embeddings == [[0.0, 1.0], [2.0, 3.0]]
+    assert all(type(value) is float for row in embeddings for value in row)
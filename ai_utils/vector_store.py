@@ -5,17 +5,29 @@ from typing import List, Dict, Any, Optional, Union
 import numpy as np
 import chromadb
 from chromadb.config import Settings
-from chromadb.utils import embedding_functions
 
 from .embedding_utils import EmbeddingManager
 
+class BatchedEmbeddingFunction:
+    """Chroma embedding function that encodes documents in chunked model calls"""
+    
+    def __init__(self, embedding_manager: EmbeddingManager, batch_size: int = 64):
+        self.embedding_manager = embedding_manager
+        self.batch_size = batch_size
+    
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        embeddings = self.embedding_manager.get_embeddings_batched(list(input), self.batch_size)
+        # Chroma validates embeddings as lists of Python floats
+        return embeddings.tolist()
+
 class VectorStore:
     """Vector database for storing and retrieving embeddings"""
     
     def __init__(self, 
                  collection_name: str = "default", 
                  embedding_manager: Optional[EmbeddingManager] = None,
-                 config_path: str = "../config.json"):
+                 config_path: str = "../config.json",
+                 embedding_batch_size: Optional[int] = None):
         
         self.config = self._load_config(config_path)
         self.db_path = self.config.get("vector_db", {}).get("path", "./vector_db")
@@ -25,6 +37,10 @@ class VectorStore:
         # Create embedding manager if not provided
         self.embedding_manager = embedding_manager or EmbeddingManager(config_path)
         
+        # Texts per model call when embedding documents and queries
+        self.embedding_batch_size = embedding_batch_size or self.config.get("vector_db", {}).get(
+            "embedding_batch_size", 64)
+        
         # Initialize Chroma client
         self.client = chromadb.PersistentClient(
             path=self.db_path,
@@ -58,10 +74,8 @@ class VectorStore:
             )
     
     def _embedding_function(self):
-        """Create a custom embedding function that uses our embedding manager"""
-        return embedding_functions.PythonEmbeddingFunction(
-            lambda texts: [self.embedding_manager.get_embedding(text).tolist() for text in texts]
-        )
+        """Create a custom embedding function that batches texts through our embedding manager"""
+        return BatchedEmbeddingFunction(self.embedding_manager, self.embedding_batch_size)
     
     def add(self, 
             texts: List[str], 
@@ -131,6 +131,7 @@ try:
     
     # Initialize AI utilities
     EMBEDDING_MANAGER = EmbeddingManager(config_path=CONFIG_PATH)
+    EMBEDDING_MANAGER.warmup()  # Load the shared model before the first request
     LLM_MANAGER = LLMManager(config_path=CONFIG_PATH)
     
     # Initialize vector store for news
@@ -0,0 +1,233 @@
+import numpy as np
+
+class IVFFlatIndex:
+    """
+    Inverted-file (IVF-flat) approximate nearest-neighbour index for VectorDB
+
+    Rows are partitioned by their nearest centroid from a spherical k-means
+    trained on a sample of the store; a query scores the centroids, probes the
+    n_probe best partitions and ranks only their rows exactly. n_lists and
+    n_probe are the recall/latency knobs: more probes means higher recall and
+    more rows scored.
+
+    The index works on row numbers of the store's unit-normalized matrix and
+    is kept consistent with upserts (upsert), swap-remove deletes (remove +
+    move). Until enough rows exist to train, search() returns None and the
+    store falls back to an exact scan.
+    """
+
+    def __init__(self, n_lists=256, n_probe=8, min_train_rows=None, train_sample=None,
+                 kmeans_iterations=10, seed=0):
+        """
+        Initialize an untrained index
+
+        Args:
+            n_lists (int): Number of partitions (k-means centroids)
+            n_probe (int): Partitions scanned per query
+            min_train_rows (int): Rows required before the index trains itself
+            train_sample (int): Rows sampled for k-means training
+            kmeans_iterations (int): Lloyd iterations during training
+            seed (int): Random seed for sampling and initialization
+        """
+        self.requested_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train_rows = min_train_rows or n_lists * 39
+        self.train_sample = train_sample or n_lists * 64
+        self.kmeans_iterations = kmeans_iterations
+        self._rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self):
+        """Forget centroids and assignments; the index retrains on the next search"""
+        self.n_lists = self.requested_lists
+        self.centroids = None
+        self._lists = []
+        self._list_sizes = None
+        self._assignment = np.zeros(0, dtype=np.int32)
+        self._position = np.zeros(0, dtype=np.int64)
+
+    @property
+    def trained(self):
+        """Whether centroids have been trained"""
+        return self.centroids is not None
+
+    def _grow_rows(self, rows):
+        """Make the per-row assignment/position arrays hold at least rows entries"""
+        if rows > len(self._assignment):
+            capacity = max(rows, len(self._assignment) * 2, 64)
+            assignment = np.full(capacity, -1, dtype=np.int32)
+            assignment[:len(self._assignment)] = self._assignment
+            position = np.zeros(capacity, dtype=np.int64)
+            position[:len(self._position)] = self._position
+            self._assignment, self._position = assignment, position
+
+    def _append(self, list_id, row):
+        """Append a row to a partition's posting array"""
+        size = self._list_sizes[list_id]
+        postings = self._lists[list_id]
+        if size == len(postings):
+            grown = np.zeros(max(16, size * 2), dtype=np.int64)
+            grown[:size] = postings
+            self._lists[list_id] = postings = grown
+        postings[size] = row
+        self._list_sizes[list_id] = size + 1
+        self._assignment[row] = list_id
+        self._position[row] = size
+
+    def _detach(self, row):
+        """Swap-remove a row from its partition"""
+        list_id = self._assignment[row]
+        if list_id < 0:
+            return
+        postings = self._lists[list_id]
+        last = self._list_sizes[list_id] - 1
+        pos = self._position[row]
+        moved = postings[last]
+        postings[pos] = moved
+        self._position[moved] = pos
+        self._list_sizes[list_id] = last
+        self._assignment[row] = -1
+
+    def _nearest_lists(self, vectors, n):
+        """Ids of the n best-scoring centroids for each vector"""
+        scores = vectors @ self.centroids.T
+        if n >= self.n_lists:
+            return np.argsort(-scores, axis=1)
+        return np.argpartition(-scores, n - 1, axis=1)[:, :n]
+
+    def train(self, normed):
+        """
+        Train centroids with spherical k-means and assign every row
+
+        Args:
+            normed (np.ndarray): (rows x d) unit-normalized store matrix
+        """
+        rows = len(normed)
+        n_lists = min(self.n_lists, rows)
+        sample_size = min(rows, max(self.train_sample, n_lists))
+        sample = normed[self._rng.choice(rows, sample_size, replace=False)]
+
+        centroids = sample[self._rng.choice(sample_size, n_lists, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=n_lists)
+            # Re-seed empty partitions from random sample rows
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[self._rng.choice(sample_size, int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        self.n_lists = n_lists
+        self.centroids = centroids
+        self.rebuild(normed)
+
+    def rebuild(self, normed):
+        """
+        Reassign every row to its nearest trained centroid
+
+        Args:
+            normed (np.ndarray): (rows x d) unit-normalized store matrix
+        """
+        rows = len(normed)
+        self._lists = [np.zeros(16, dtype=np.int64) for _ in range(self.n_lists)]
+        self._list_sizes = np.zeros(self.n_lists, dtype=np.int64)
+        self._assignment = np.full(0, -1, dtype=np.int32)
+        self._position = np.zeros(0, dtype=np.int64)
+        self._grow_rows(rows)
+
+        # Assign in chunks to bound the (chunk x n_lists) score matrix
+        chunk = 65536
+        labels = np.empty(rows, dtype=np.int64)
+        for start in range(0, rows, chunk):
+            labels[start:start + chunk] = self._nearest_lists(normed[start:start + chunk], 1)[:, 0]
+
+        # Bulk-fill posting arrays grouped by label
+        order = np.argsort(labels, kind='stable')
+        counts = np.bincount(labels, minlength=self.n_lists)
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+        for list_id in range(self.n_lists):
+            members = order[bounds[list_id]:bounds[list_id + 1]]
+            postings = np.zeros(max(16, len(members) * 2), dtype=np.int64)
+            postings[:len(members)] = members
+            self._lists[list_id] = postings
+            self._list_sizes[list_id] = len(members)
+            self._assignment[members] = list_id
+            self._position[members] = np.arange(len(members))
+
+    def upsert(self, row, normed_vector):
+        """Insert a row or move an updated row to its new nearest partition"""
+        if not self.trained:
+            return
+        self._grow_rows(row + 1)
+        self._detach(row)
+        self._append(int(self._nearest_lists(normed_vector[None, :], 1)[0, 0]), row)
+
+    def remove(self, row):
+        """Drop a row from the index"""
+        if self.trained and row < len(self._assignment):
+            self._detach(row)
+
+    def move(self, src, dst):
+        """Relabel row src as dst (the store moved its last row into a freed slot)"""
+        if not self.trained or src >= len(self._assignment):
+            return
+        list_id = self._assignment[src]
+        if list_id < 0:
+            return
+        self._grow_rows(dst + 1)
+        pos = self._position[src]
+        self._lists[list_id][pos] = dst
+        self._assignment[dst] = list_id
+        self._position[dst] = pos
+        self._assignment[src] = -1
+
+    def search(self, queries, top_n, normed, top_k):
+        """
+        Approximate top-k for a batch of unit-normalized queries
+
+        Args:
+            queries (np.ndarray): (m x d) unit-normalized queries
+            top_n (int): Results per query
+            normed (np.ndarray): (rows x d) unit-normalized store matrix
+            top_k (callable): Selection helper returning (rows, scores)
+
+        Returns:
+            list: (rows, scores) per query, or None if the index cannot serve yet
+        """
+        if not self.trained:
+            if len(normed) < self.min_train_rows:
+                return None
+            self.train(normed)
+
+        results = []
+        probe = min(self.n_probe, self.n_lists)
+        for query, list_ids in zip(queries, self._nearest_lists(queries, probe)):
+            candidates = np.concatenate([self._lists[i][:self._list_sizes[i]] for i in list_ids])
+            if len(candidates) == 0:
+                results.append((candidates, np.zeros(0, dtype=np.float32)))
+                continue
+            positions, scores = top_k(normed[candidates] @ query, top_n)
+            results.append((candidates[positions], scores))
+        return results
+
+
+def create_index(kind, **params):
+    """
+    Build an ANN index by name
+
+    Args:
+        kind (str): 'ivf' for IVFFlatIndex, or '' / 'exact' / None for no index
+        **params: Keyword arguments for the index constructor
+
+    Returns:
+        IVFFlatIndex: The index, or None for exact search
+    """
+    if not kind or kind == 'exact':
+        return None
+    if kind == 'ivf':
+        return IVFFlatIndex(**params)
+    raise ValueError(f"Unknown ANN index type: {kind}")
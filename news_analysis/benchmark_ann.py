@@ -0,0 +1,71 @@
+"""
+Recall-vs-latency benchmark of the IVF-flat index against exact search
+
+Generates a synthetic clustered corpus of unit vectors (one million articles
+by default), trains an IVFFlatIndex on it and reports, for each n_probe,
+the mean recall@k against the exact matrix-vector scan and the per-query
+latency of both.
+
+    python benchmark_ann.py --rows 1000000 --dim 64 --lists 1024 --probes 1,4,16,64
+"""
+import argparse
+import time
+import numpy as np
+from ann_index import IVFFlatIndex
+from vector_db_connector import normalize_rows, top_k
+
+def synthetic_corpus(rows, dim, clusters, seed):
+    """Clustered unit vectors, roughly like topic-grouped news"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=rows)
+    corpus = np.empty((rows, dim), dtype=np.float32)
+    chunk = 100000
+    for start in range(0, rows, chunk):
+        part = labels[start:start + chunk]
+        noise = rng.normal(scale=0.6, size=(len(part), dim)).astype(np.float32)
+        corpus[start:start + chunk] = centers[part] + noise
+    return normalize_rows(corpus)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--dim', type=int, default=64)
+    parser.add_argument('--clusters', type=int, default=200)
+    parser.add_argument('--lists', type=int, default=1024)
+    parser.add_argument('--probes', default='1,4,16,64')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows} x {args.dim} corpus...")
+    corpus = synthetic_corpus(args.rows, args.dim, args.clusters, args.seed)
+    queries = normalize_rows(corpus[np.random.default_rng(args.seed + 1).choice(args.rows, args.queries)]
+                             + np.random.default_rng(args.seed + 2).normal(scale=0.3, size=(args.queries, args.dim)))
+
+    # Exact baseline
+    start = time.perf_counter()
+    exact = [top_k(corpus @ q, args.k)[0] for q in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / args.queries
+    print(f"exact scan: {exact_ms:.2f} ms/query")
+
+    index = IVFFlatIndex(n_lists=args.lists)
+    start = time.perf_counter()
+    index.train(corpus)
+    print(f"IVF train + assign ({index.n_lists} lists): {time.perf_counter() - start:.1f} s")
+
+    print(f"{'n_probe':>8} {'recall@' + str(args.k):>10} {'ms/query':>10} {'speedup':>8}")
+    for probe in [int(p) for p in args.probes.split(',')]:
+        index.n_probe = probe
+        start = time.perf_counter()
+        results = index.search(queries, args.k, corpus, top_k)
+        ann_ms = (time.perf_counter() - start) * 1000 / args.queries
+        recall = np.mean([
+            len(np.intersect1d(rows, truth)) / len(truth)
+            for (rows, _), truth in zip(results, exact)
+        ])
+        print(f"{probe:>8} {recall:>10.3f} {ann_ms:>10.2f} {exact_ms / ann_ms:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
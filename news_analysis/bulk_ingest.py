@@ -0,0 +1,95 @@
+"""
+Streaming NDJSON bulk ingestion for NewsAnalyzer
+
+Articles arrive as newline-delimited JSON (one article object per line) and
+are read incrementally, so only one micro-batch of articles is held in
+memory at a time regardless of upload size. Each micro-batch goes through
+NewsAnalyzer.batch_process_news and produces a progress record; malformed
+lines are reported and skipped without aborting the upload.
+"""
+import json
+
+def read_ndjson(stream, max_line_bytes=1 << 20):
+    """
+    Parse newline-delimited JSON objects from a binary stream
+
+    Lines longer than max_line_bytes are skipped without being buffered.
+
+    Args:
+        stream: Binary file-like object supporting readline(limit)
+        max_line_bytes (int): Longest accepted line
+
+    Yields:
+        tuple: (line number, parsed object or None, error message or None);
+            blank lines are skipped
+    """
+    line_number = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        line_number += 1
+
+        if len(line) > max_line_bytes and not line.endswith(b'\n'):
+            # Discard the rest of the oversized line in bounded reads
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(max_line_bytes + 1)
+            yield line_number, None, f"Line exceeds {max_line_bytes} bytes"
+            continue
+
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            article = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(article, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, article, None
+
+def ingest_ndjson(analyzer, stream, batch_size=256, max_line_bytes=1 << 20):
+    """
+    Feed an NDJSON article stream to a NewsAnalyzer in fixed-size micro-batches
+
+    Args:
+        analyzer (NewsAnalyzer): Analyzer that processes and stores articles
+        stream: Binary file-like object with one article per line
+        batch_size (int): Articles per batch_process_news call
+        max_line_bytes (int): Longest accepted line
+
+    Yields:
+        dict: An 'error' record per rejected line, a 'progress' record after each
+            micro-batch and a final 'completed' record, each carrying running
+            totals of lines read, articles processed, duplicates skipped and errors
+    """
+    totals = {'lines': 0, 'processed': 0, 'duplicates_skipped': 0, 'errors': 0, 'batches': 0}
+
+    def flush(batch):
+        try:
+            processed = analyzer.batch_process_news(batch)
+        except Exception as e:
+            totals['errors'] += len(batch)
+            return {'type': 'error', 'message': f"Batch failed: {e}", **totals}
+        totals['batches'] += 1
+        totals['processed'] += len(processed)
+        totals['duplicates_skipped'] += len(batch) - len(processed)
+        return {'type': 'progress', **totals}
+
+    batch = []
+    for line_number, article, error in read_ndjson(stream, max_line_bytes):
+        totals['lines'] = line_number
+        if error is not None:
+            totals['errors'] += 1
+            yield {'type': 'error', 'line': line_number, 'message': error, **totals}
+            continue
+        batch.append(article)
+        if len(batch) >= batch_size:
+            yield flush(batch)
+            batch = []
+
+    if batch:
+        yield flush(batch)
+    yield {'type': 'completed', **totals}
@@ -0,0 +1,117 @@
+import json
+import math
+import os
+import time
+from collections import Counter
+from vector_log import write_atomically
+
+class CorpusStats:
+    """
+    Document-frequency table for NewsAnalyzer TF-IDF
+
+    Instead of keeping every tokenized document, this keeps the number of
+    documents seen plus, per keyword category, the number of documents
+    containing it. Adding a batch is O(categories) and IDF lookups are O(1),
+    and memory is bounded by the number of categories rather than the
+    number of articles ingested.
+
+    With a half_life, counts decay exponentially with time so the statistics
+    describe a sliding window of recent news instead of all history.
+    """
+
+    def __init__(self, categories, half_life=None):
+        """
+        Initialize empty statistics
+
+        Args:
+            categories (dict): Category name -> list of keywords
+            half_life (float): Seconds after which a document counts half; None disables decay
+        """
+        self.categories = {name: frozenset(keywords) for name, keywords in categories.items()}
+        self.half_life = half_life
+        self.document_count = 0.0
+        self.category_doc_freq = Counter()
+        self.updated_at = None
+
+    def advance_to(self, timestamp=None):
+        """
+        Age every count to the given time
+
+        Args:
+            timestamp (float): Time to decay to (defaults to now)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.half_life and self.updated_at is not None and timestamp > self.updated_at:
+            factor = 0.5 ** ((timestamp - self.updated_at) / self.half_life)
+            self.document_count *= factor
+            for key in self.category_doc_freq:
+                self.category_doc_freq[key] *= factor
+        if self.updated_at is None or timestamp > self.updated_at:
+            self.updated_at = timestamp
+
+    def add_counts(self, document_count, category_doc_freq, timestamp=None):
+        """
+        Count a batch of documents from precomputed document frequencies
+
+        Args:
+            document_count (int): Number of documents in the batch
+            category_doc_freq (dict): Category -> documents in the batch containing it
+            timestamp (float): Ingest time (defaults to now)
+        """
+        self.advance_to(timestamp)
+        self.document_count += document_count
+        self.category_doc_freq.update({k: v for k, v in category_doc_freq.items() if v})
+
+    def idf(self, category):
+        """
+        Smoothed inverse document frequency of a keyword category
+
+        Args:
+            category (str): Category name
+
+        Returns:
+            float: log((N + 1) / (df + 1)) + 1
+        """
+        corpus_size = max(1, self.document_count)
+        return math.log((corpus_size + 1) / (self.category_doc_freq[category] + 1)) + 1
+
+    def to_dict(self):
+        """Serializable form of the statistics"""
+        return {
+            'document_count': self.document_count,
+            'category_doc_freq': dict(self.category_doc_freq),
+            'half_life': self.half_life,
+            'updated_at': self.updated_at
+        }
+
+    def load_dict(self, data):
+        """
+        Restore counts saved by to_dict
+
+        Counts for categories no longer configured are dropped, as are the
+        per-keyword counts older files carry.
+
+        Args:
+            data (dict): Output of to_dict
+        """
+        self.document_count = float(data.get('document_count', 0))
+        self.category_doc_freq = Counter({
+            k: v for k, v in data.get('category_doc_freq', {}).items() if k in self.categories
+        })
+        self.updated_at = data.get('updated_at')
+
+    def save(self, path):
+        """Atomically write the statistics to a JSON file"""
+        try:
+            write_atomically(path, lambda f: f.write(json.dumps(self.to_dict()).encode('utf-8')))
+        except Exception as e:
+            print(f"Error saving corpus statistics: {e}")
+
+    def load(self, path):
+        """Load statistics from a JSON file if it exists"""
+        try:
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    self.load_dict(json.load(f))
+        except Exception as e:
+            print(f"Error loading corpus statistics: {e}")
@@ -0,0 +1,232 @@
+import os
+import re
+import sys
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ai_utils.keyword_matcher import KeywordMatcher, TOKEN_PATTERN
+from near_duplicates import MinHasher
+
+def tokenize(text):
+    """Lowercase text and split it into runs of word characters"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def article_text(article):
+    """Full text of an article used for analysis"""
+    title = article.get('title', '')
+    content = article.get('content', '')
+    summary = article.get('summary', '')
+    return f"{title} {summary} {content}"
+
+def extractive_summary(article, matcher, max_sentences=2):
+    """
+    Extractive summary of an article: its most keyword-dense sentences
+
+    Sentences are scored by keyword and sentiment term matches, with a small
+    bonus for the lead sentence, and the best max_sentences are kept in their
+    original order.
+
+    Args:
+        article (dict): News article
+        matcher (KeywordMatcher): Matcher over the keyword and sentiment terms
+        max_sentences (int): Sentences to keep
+
+    Returns:
+        str: Summary text
+    """
+    content = article.get('content') or ''
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+|\n+', content) if s.strip()]
+    if not sentences:
+        return article.get('summary') or article.get('title') or ''
+
+    scores = [
+        sum(matcher.count(tokenize(sentence)).values()) + (0.5 if i == 0 else 0.0)
+        for i, sentence in enumerate(sentences)
+    ]
+    best = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))[:max_sentences]
+    return ' '.join(sentences[i] for i in sorted(best))
+
+class BatchFeatureExtractor:
+    """
+    Vectorized NewsAnalyzer feature extraction for a batch of tokenized articles
+
+    Every keyword and sentiment term gets an id in one shared vocabulary and
+    is matched with one Aho-Corasick pass over the tokens, so multi-word
+    terms ("nest egg", "interest rate") count as single hits. A batch is
+    turned into sparse (document, term id, count) triples and
+    scatter-added into a (documents x vocabulary) count matrix; category term
+    frequencies, document frequencies and sentiment are then products of that
+    matrix with fixed membership matrices.
+
+    The vocabulary is only a few dozen terms, so the count matrix is stored
+    densely; only in-vocabulary tokens are ever materialized.
+    """
+
+    def __init__(self, keyword_categories, sentiment_lexicon):
+        """
+        Build the vocabulary and membership matrices
+
+        Args:
+            keyword_categories (dict): Category name -> keywords (vector column order)
+            sentiment_lexicon (dict): 'positive' / 'negative' -> terms
+        """
+        self.categories = list(keyword_categories)
+        terms = []
+        for keywords in keyword_categories.values():
+            terms.extend(keywords)
+        for polarity in ('positive', 'negative'):
+            terms.extend(sentiment_lexicon[polarity])
+        self.vocabulary = {term: i for i, term in enumerate(dict.fromkeys(terms))}
+        self.terms = list(self.vocabulary)
+        self.matcher = KeywordMatcher({'terms': self.terms}, unit='token')
+
+        size = len(self.vocabulary)
+        self.category_matrix = np.zeros((size, len(self.categories)), dtype=np.float64)
+        for j, keywords in enumerate(keyword_categories.values()):
+            for keyword in keywords:
+                self.category_matrix[self.vocabulary[keyword], j] = 1.0
+
+        self.polarity_matrix = np.zeros((size, 2), dtype=np.float64)
+        for j, polarity in enumerate(('positive', 'negative')):
+            for term in sentiment_lexicon[polarity]:
+                self.polarity_matrix[self.vocabulary[term], j] = 1.0
+
+        # Terms reported in an article's 'keywords' field
+        self.keyword_mask = self.category_matrix.any(axis=1)
+
+    def term_counts(self, token_lists):
+        """
+        (documents x vocabulary) counts of vocabulary terms
+
+        Each document is scanned once by the keyword matcher, producing sparse
+        (document, term, count) triples that are scattered into the count
+        matrix in one bincount.
+
+        Args:
+            token_lists (list): Tokenized documents
+
+        Returns:
+            np.ndarray: Term counts per document
+        """
+        n_docs = len(token_lists)
+        size = len(self.vocabulary)
+        vocabulary = self.vocabulary
+        doc_index, term_index, values = [], [], []
+        for doc, tokens in enumerate(token_lists):
+            for term, count in self.matcher.count(tokens).items():
+                doc_index.append(doc)
+                term_index.append(vocabulary[term])
+                values.append(count)
+
+        flat_index = np.asarray(doc_index, dtype=np.int64) * size + np.asarray(term_index, dtype=np.int64)
+        flat = np.bincount(flat_index, weights=np.asarray(values, dtype=np.float64), minlength=n_docs * size)
+        return flat.reshape(n_docs, size)
+
+    def extract(self, token_lists, prior_document_count, prior_category_doc_freq):
+        """
+        Compute NewsAnalyzer features for a batch
+
+        Document frequencies accumulate through the batch, so every article
+        sees the same IDF it would get when processed one at a time in order.
+
+        Args:
+            token_lists (list): Tokenized documents
+            prior_document_count (float): Documents counted before this batch
+            prior_category_doc_freq (dict): Category -> document frequency before this batch
+
+        Returns:
+            dict: 'vectors' (n x categories), 'sentiment' (n), 'keywords' (list of lists)
+                and 'category_presence' (n x categories bool) for updating corpus
+                statistics
+        """
+        counts = self.term_counts(token_lists)
+        lengths = np.array([len(tokens) for tokens in token_lists], dtype=np.float64)
+        return self.extract_from_counts(counts, lengths, prior_document_count, prior_category_doc_freq)
+
+    def extract_from_counts(self, counts, lengths, prior_document_count, prior_category_doc_freq):
+        """
+        Compute NewsAnalyzer features from precomputed term counts
+
+        Args:
+            counts (np.ndarray): (n x vocabulary) term counts, see term_counts
+            lengths (np.ndarray): Token count per document
+            prior_document_count (float): Documents counted before this batch
+            prior_category_doc_freq (dict): Category -> document frequency before this batch
+
+        Returns:
+            dict: Same as extract
+        """
+        n_docs = len(lengths)
+        present = counts > 0
+
+        # Term frequency per category
+        category_counts = counts @ self.category_matrix
+        safe_lengths = np.where(lengths > 0, lengths, 1.0)
+        tf = category_counts / safe_lengths[:, None]
+
+        # Document frequency including every earlier document in the batch
+        category_presence = (present.astype(np.float64) @ self.category_matrix) > 0
+        prior_df = np.array([prior_category_doc_freq.get(c, 0) for c in self.categories], dtype=np.float64)
+        df = prior_df + np.cumsum(category_presence, axis=0)
+        corpus_size = np.maximum(1, prior_document_count + np.arange(1, n_docs + 1))
+        idf = np.log((corpus_size[:, None] + 1) / (df + 1)) + 1
+
+        vectors = np.where(lengths[:, None] > 0, tf * idf, 0.0)
+
+        # Normalize each vector by its maximum component, capped at 1
+        max_values = vectors.max(axis=1, initial=0.0)
+        max_values[max_values <= 0] = 1.0
+        vectors = np.minimum(1.0, vectors / max_values[:, None])
+
+        # Sentiment: (positive - negative) / (positive + negative)
+        polarity = counts @ self.polarity_matrix
+        total = polarity.sum(axis=1)
+        sentiment = np.divide(polarity[:, 0] - polarity[:, 1], total,
+                              out=np.zeros(n_docs), where=total > 0)
+
+        keyword_hits = present & self.keyword_mask
+        keywords = [[self.terms[i] for i in np.flatnonzero(row)] for row in keyword_hits]
+
+        return {
+            'vectors': vectors,
+            'sentiment': sentiment,
+            'keywords': keywords,
+            'category_presence': category_presence
+        }
+
+
+# Per-process extractor, MinHasher and extractive summary length for
+# ingestion pool workers, set by init_worker
+_worker_extractor = None
+_worker_hasher = None
+_worker_summary_sentences = 0
+
+def init_worker(keyword_categories, sentiment_lexicon, minhash_params=None, summary_sentences=0):
+    """Process pool initializer: build the worker's extractor (and MinHasher) once"""
+    global _worker_extractor, _worker_hasher, _worker_summary_sentences
+    _worker_extractor = BatchFeatureExtractor(keyword_categories, sentiment_lexicon)
+    _worker_hasher = MinHasher(**minhash_params) if minhash_params else None
+    _worker_summary_sentences = summary_sentences
+
+def count_articles(articles):
+    """
+    Process pool task: tokenize a chunk of articles and count vocabulary terms
+
+    Args:
+        articles (list): News articles
+
+    Returns:
+        tuple: ((n x vocabulary) term counts, token count per article,
+            MinHash signature per article or None when deduplication is off,
+            extractive summary per article or None when summaries are off)
+    """
+    token_lists = [tokenize(article_text(article)) for article in articles]
+    lengths = np.array([len(tokens) for tokens in token_lists], dtype=np.float64)
+    signatures = [_worker_hasher.signature(tokens) for tokens in token_lists] if _worker_hasher else None
+    summaries = None
+    if _worker_summary_sentences:
+        summaries = [
+            extractive_summary(article, _worker_extractor.matcher, _worker_summary_sentences)
+            for article in articles
+        ]
+    return _worker_extractor.term_counts(token_lists), lengths, signatures, summaries
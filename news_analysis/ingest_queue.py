@@ -0,0 +1,201 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+class QueueFull(Exception):
+    """Raised when a submission does not fit in the ingestion queue"""
+
+class BatchTooLarge(QueueFull):
+    """Raised when a submission exceeds the queue's capacity and could never fit"""
+
+class IngestQueue:
+    """
+    Bounded asynchronous ingestion queue in front of NewsAnalyzer
+
+    Submitted batches become jobs whose articles wait in a FIFO queue bounded
+    by a total number of articles; a submission that does not fit is
+    rejected with QueueFull so callers can apply backpressure, or with
+    BatchTooLarge if it exceeds the whole capacity and must be split. Worker threads
+    drain the queue in batches of up to max_batch articles, possibly spanning
+    several jobs, and feed each batch to NewsAnalyzer.batch_process_news.
+    Job progress is kept for status polling; the oldest finished jobs are
+    forgotten once more than max_finished_jobs have accumulated.
+    """
+
+    def __init__(self, analyzer, max_pending=10000, workers=2, max_batch=256, max_finished_jobs=1000):
+        """
+        Start the worker threads
+
+        Args:
+            analyzer (NewsAnalyzer): Analyzer that processes and stores articles
+            max_pending (int): Maximum queued articles across all jobs
+            workers (int): Number of worker threads
+            max_batch (int): Maximum articles per batch_process_news call
+            max_finished_jobs (int): Finished jobs kept for status queries
+        """
+        self.analyzer = analyzer
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.max_finished_jobs = max_finished_jobs
+
+        # Queue of (job id, articles) chunks and the number of queued articles
+        self._chunks = deque()
+        self._pending = 0
+        self._jobs = OrderedDict()
+        self._finished = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"news-ingest-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def pending(self):
+        """Number of queued articles not yet taken by a worker"""
+        return self._pending
+
+    def submit(self, articles):
+        """
+        Queue a batch of articles as a new job
+
+        Args:
+            articles (list): News articles
+
+        Returns:
+            str: Job id
+
+        Raises:
+            BatchTooLarge: If there are more articles than max_pending
+            QueueFull: If the articles do not fit in the queue right now
+        """
+        articles = list(articles)
+        if len(articles) > self.max_pending:
+            raise BatchTooLarge(
+                f"Batch of {len(articles)} articles exceeds the ingestion queue capacity of {self.max_pending}"
+            )
+        with self._condition:
+            if self._closed:
+                raise QueueFull("Ingestion queue is closed")
+            if self._pending + len(articles) > self.max_pending:
+                raise QueueFull(
+                    f"Ingestion queue full ({self._pending}/{self.max_pending} articles pending)"
+                )
+
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'queued',
+                'total': len(articles),
+                'processed': 0,
+                'duplicates_skipped': 0,
+                'failed': 0,
+                'error': None,
+                'submitted_at': time.time(),
+                'finished_at': None,
+                '_remaining': len(articles)
+            }
+            for start in range(0, len(articles), self.max_batch):
+                self._chunks.append((job_id, articles[start:start + self.max_batch]))
+            self._pending += len(articles)
+            if not articles:
+                self._finish_job(self._jobs[job_id])
+            self._condition.notify_all()
+            return job_id
+
+    def status(self, job_id):
+        """
+        Progress of a job
+
+        Args:
+            job_id (str): Id returned by submit
+
+        Returns:
+            dict: Job status ('queued', 'processing', 'completed' or 'failed') and
+                article counts, or None for an unknown or forgotten job
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {key: value for key, value in job.items() if not key.startswith('_')}
+
+    def _take_batch(self):
+        """Wait for queued chunks and take up to max_batch articles (None once closed)"""
+        with self._condition:
+            while not self._chunks and not self._closed:
+                self._condition.wait()
+            if not self._chunks:
+                return None
+
+            batch, taken = [], 0
+            while self._chunks and taken < self.max_batch:
+                job_id, articles = self._chunks[0]
+                room = self.max_batch - taken
+                if len(articles) > room:
+                    self._chunks[0] = (job_id, articles[room:])
+                    articles = articles[:room]
+                else:
+                    self._chunks.popleft()
+                batch.append((job_id, articles))
+                taken += len(articles)
+                self._jobs[job_id]['status'] = 'processing'
+            self._pending -= taken
+            return batch
+
+    def _finish_job(self, job):
+        """Mark a job finished and forget the oldest finished jobs beyond the limit"""
+        job['status'] = 'failed' if job['failed'] else 'completed'
+        job['finished_at'] = time.time()
+        self._finished.append(job['job_id'])
+        while len(self._finished) > self.max_finished_jobs:
+            self._jobs.pop(self._finished.popleft(), None)
+
+    def _worker_loop(self):
+        """Worker thread: process queued batches until closed"""
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+
+            articles = [article for _, chunk in batch for article in chunk]
+            error = None
+            stored_ids = set()
+            try:
+                processed = self.analyzer.batch_process_news(articles)
+                stored_ids = {article.get('id') for article in processed}
+            except Exception as e:
+                error = str(e)
+                print(f"Error processing queued news batch: {e}")
+
+            with self._condition:
+                for job_id, chunk in batch:
+                    job = self._jobs[job_id]
+                    if error is None:
+                        # Articles without an id are never collapsed as duplicates
+                        stored = sum(1 for a in chunk if not a.get('id') or a.get('id') in stored_ids)
+                        job['processed'] += stored
+                        job['duplicates_skipped'] += len(chunk) - stored
+                    else:
+                        job['failed'] += len(chunk)
+                        job['error'] = error
+                    job['_remaining'] -= len(chunk)
+                    if job['_remaining'] == 0:
+                        self._finish_job(job)
+
+    def close(self, timeout=None):
+        """
+        Stop accepting jobs and wait for the workers to drain the queue
+
+        Args:
+            timeout (float): Seconds to wait for each worker (None waits indefinitely)
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
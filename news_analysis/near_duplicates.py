@@ -0,0 +1,332 @@
+import json
+import os
+import threading
+import zlib
+from collections import Counter
+import numpy as np
+from vector_log import AppendLog, write_atomically
+
+class MinHasher:
+    """
+    MinHash signatures of tokenized documents
+
+    A document is reduced to its set of word shingles (runs of shingle_size
+    consecutive tokens); each of num_perm hash functions keeps the minimum
+    hash over that set. The fraction of positions where two signatures agree
+    estimates the Jaccard similarity of the shingle sets.
+    """
+
+    def __init__(self, num_perm=128, shingle_size=3, seed=1):
+        """
+        Initialize the hash family
+
+        Args:
+            num_perm (int): Number of hash functions (signature length)
+            shingle_size (int): Tokens per shingle
+            seed (int): Random seed for the hash functions
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+
+        # Multiply-shift hashing of 32-bit shingle hashes: ((a * x + b) mod 2^64) >> 32
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+    def shingle_hashes(self, tokens):
+        """32-bit hashes of the distinct shingles of a document"""
+        size = self.shingle_size
+        if len(tokens) <= size:
+            shingles = {' '.join(tokens)} if tokens else set()
+        else:
+            shingles = {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+        return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+    def signature(self, tokens):
+        """
+        MinHash signature of a tokenized document
+
+        Args:
+            tokens (list): Tokenized document
+
+        Returns:
+            np.ndarray: (num_perm,) uint32 signature, or None for an empty document
+        """
+        hashes = self.shingle_hashes(tokens)
+        if len(hashes) == 0:
+            return None
+        with np.errstate(over='ignore'):
+            values = (hashes[:, None] * self._a + self._b) >> np.uint64(32)
+        return values.min(axis=0).astype(np.uint32)
+
+
+def optimal_bands(threshold, num_perm, false_negative_weight=0.9):
+    """
+    LSH banding (bands, rows per band) for a Jaccard threshold
+
+    Picks the split of num_perm signature positions whose candidate
+    probability curve 1 - (1 - s^rows)^bands has the least weighted
+    false-positive plus false-negative area around the threshold. Every
+    candidate is verified against the threshold afterwards, so a false
+    positive only costs one comparison while a false negative is a missed
+    duplicate; misses are weighted accordingly.
+
+    Args:
+        threshold (float): Jaccard similarity treated as a duplicate
+        num_perm (int): Signature length
+        false_negative_weight (float): Weight of missed duplicates (false positives get the rest)
+
+    Returns:
+        tuple: (bands, rows)
+    """
+    similarity = np.linspace(0.0, 1.0, 201)
+    below = similarity < threshold
+    best, best_error = (1, num_perm), None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            probability = 1 - (1 - similarity ** rows) ** bands
+            error = ((1 - false_negative_weight) * probability[below].sum()
+                     + false_negative_weight * (1 - probability[~below]).sum())
+            if best_error is None or error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index for detecting near-duplicate articles at ingest
+
+    Signatures are split into bands; each band is hashed into a bucket
+    table, and articles sharing any bucket become candidates. Only
+    candidates are compared, so a lookup costs time proportional to the
+    bucket sizes rather than the number of indexed articles. Candidates are
+    confirmed with the estimated Jaccard similarity against the threshold.
+
+    With a path, signatures persist as a snapshot (<path>.npz) plus an
+    append-only log of additions and removals (<path>.log.ndjson), so a
+    restart reloads the index without re-reading stored articles. The log is
+    folded into the snapshot once it outgrows the index.
+    """
+
+    # Minimum log records before the log is folded into the snapshot
+    COMPACT_MIN_RECORDS = 1000
+
+    def __init__(self, threshold=0.8, num_perm=128, shingle_size=3, seed=1, path=None):
+        """
+        Initialize an empty index
+
+        Args:
+            threshold (float): Estimated Jaccard similarity at or above which articles are duplicates
+            num_perm (int): Signature length
+            shingle_size (int): Tokens per shingle
+            seed (int): Random seed for the hash functions
+            path (str): Base path for persisted signatures (None keeps them in memory only)
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"Duplicate threshold must be in (0, 1]: {threshold}")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+        # Dedupe counters: documents checked, duplicates found, candidates compared
+        self.stats = Counter()
+
+        self.path = path
+        self._log = None
+        if path:
+            self._log = AppendLog(f"{path}.log.ndjson")
+            self._load()
+
+    def _params(self):
+        """Settings a persisted index must match to be reused"""
+        return {'threshold': self.threshold, 'num_perm': self.hasher.num_perm,
+                'shingle_size': self.hasher.shingle_size, 'seed': self.hasher.seed}
+
+    def _load(self):
+        """Load the persisted snapshot and replay the log (discarding both if the settings changed)"""
+        snapshot_path = f"{self.path}.npz"
+        try:
+            if os.path.exists(snapshot_path):
+                with np.load(snapshot_path, allow_pickle=False) as data:
+                    meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+                    if meta['params'] != self._params():
+                        raise ValueError("index settings changed")
+                    for key, signature in zip(meta['keys'], data['signatures']):
+                        self._add(key, signature.copy(), persist=False)
+            for record in self._log.replay():
+                if record['op'] == 'add':
+                    signature = np.frombuffer(bytes.fromhex(record['signature']), dtype=np.uint32).copy()
+                    self._add(record['id'], signature, persist=False)
+                else:
+                    self._remove(record['id'], persist=False)
+            if not os.path.exists(snapshot_path):
+                # The snapshot records the settings the log was written with
+                self._compact()
+            return
+        except Exception as e:
+            print(f"Discarding persisted near-duplicate index: {e}")
+            self._buckets = [{} for _ in range(self.bands)]
+            self._signatures = {}
+            self._log.rotate()
+            self._log.discard_rotated()
+            self._compact()
+
+    def _persist(self, records):
+        """Append records to the log, compacting it once it outgrows the index"""
+        if self._log is None or not records:
+            return
+        try:
+            self._log.append(records)
+            if self._log.record_count >= max(self.COMPACT_MIN_RECORDS, 2 * len(self._signatures)):
+                self._compact()
+        except Exception as e:
+            print(f"Error persisting near-duplicate index: {e}")
+
+    def _compact(self):
+        """Fold the log into a fresh snapshot (called under the lock)"""
+        self._log.rotate()
+        keys = list(self._signatures)
+        signatures = (np.stack([self._signatures[k] for k in keys]) if keys
+                      else np.zeros((0, self.hasher.num_perm), dtype=np.uint32))
+        meta = json.dumps({'params': self._params(), 'keys': keys}).encode('utf-8')
+        write_atomically(
+            f"{self.path}.npz",
+            lambda f: np.savez(f, meta=np.frombuffer(meta, dtype=np.uint8), signatures=signatures)
+        )
+        self._log.discard_rotated()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def __contains__(self, key):
+        return key in self._signatures
+
+    def signature(self, tokens):
+        """MinHash signature of a tokenized document (see MinHasher.signature)"""
+        return self.hasher.signature(tokens)
+
+    def _band_keys(self, signature):
+        """Bucket key of each band"""
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    def _add(self, key, signature, persist=True):
+        """Index a signature, replacing any previous one for the key"""
+        self._remove(key, persist=False)
+        self._signatures[key] = signature
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(band_key, set()).add(key)
+        if persist:
+            self._persist([{'op': 'add', 'id': key, 'signature': signature.astype(np.uint32).tobytes().hex()}])
+
+    def _remove(self, key, persist=True):
+        """Drop a key from the index"""
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band_key]
+        if persist:
+            self._persist([{'op': 'remove', 'id': key}])
+
+    def _query(self, signature, exclude=None, is_live=None):
+        """Most similar indexed key at or above the threshold, with its similarity"""
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+        candidates.discard(exclude)
+
+        best, best_similarity = None, 0.0
+        for key in candidates:
+            if is_live is not None and not is_live(key):
+                self._remove(key)
+                continue
+            self.stats['candidates'] += 1
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold and similarity > best_similarity:
+                best, best_similarity = key, similarity
+        return (best, best_similarity) if best is not None else None
+
+    def add(self, key, signature):
+        """Index a signature under a key"""
+        with self._lock:
+            self._add(key, signature)
+
+    def remove(self, key):
+        """Drop a key from the index"""
+        with self._lock:
+            self._remove(key)
+
+    def remove_many(self, keys):
+        """Drop several keys (e.g. articles of an expired partition) with one log write"""
+        with self._lock:
+            removed = []
+            for key in keys:
+                if key in self._signatures:
+                    self._remove(key, persist=False)
+                    removed.append({'op': 'remove', 'id': key})
+            self._persist(removed)
+
+    def query(self, signature, exclude=None, is_live=None):
+        """
+        Find the closest near-duplicate of a signature
+
+        Args:
+            signature (np.ndarray): MinHash signature
+            exclude: Key to ignore (the document's own id)
+            is_live (callable): Returns False for keys that no longer exist; those are dropped
+
+        Returns:
+            tuple: (key, estimated similarity), or None if there is no duplicate
+        """
+        with self._lock:
+            return self._query(signature, exclude, is_live)
+
+    def check_and_add(self, key, signature, is_live=None):
+        """
+        Look up a document's near-duplicate and index it if it has none
+
+        The lookup and insert happen under one lock, so two copies of a story
+        ingested concurrently cannot both be treated as originals.
+
+        Args:
+            key: Document id
+            signature (np.ndarray): MinHash signature
+            is_live (callable): See query
+
+        Returns:
+            tuple: (key, estimated similarity) of the original, or None if the document is new
+        """
+        with self._lock:
+            self.stats['checked'] += 1
+            match = self._query(signature, exclude=key, is_live=is_live)
+            if match is None:
+                self._add(key, signature)
+            else:
+                self.stats['duplicates'] += 1
+            return match
+
+    def clear(self):
+        """Drop every indexed signature"""
+        with self._lock:
+            self._buckets = [{} for _ in range(self.bands)]
+            self._signatures = {}
+            if self._log is not None:
+                try:
+                    self._compact()
+                except Exception as e:
+                    print(f"Error persisting near-duplicate index: {e}")
+
+    def close(self):
+        """Close the persisted log"""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
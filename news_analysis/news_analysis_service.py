@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import logging
 import json
@@ -6,9 +6,14 @@ import os
 import requests
 from datetime import datetime, timedelta
 import time
-import threading
 from news_module import NewsAnalyzer
-from vector_db_connector import VectorDB
+from vector_db_connector import VectorDB, PartitionedVectorDB
+from ann_index import create_index
+from ingest_queue import IngestQueue, QueueFull, BatchTooLarge
+from bulk_ingest import ingest_ndjson
+from summary_cache import SummaryCache
+from news_sources import CallableSource, create_source
+from news_scheduler import NewsScheduler
 import sys
 
 # Configure logging
@@ -19,9 +24,72 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
 
+# Approximate nearest-neighbour index for news vectors ('ivf' or 'exact')
+NEWS_ANN_INDEX = os.environ.get('NEWS_ANN_INDEX', 'exact')
+NEWS_ANN_LISTS = int(os.environ.get('NEWS_ANN_LISTS', 256))
+NEWS_ANN_PROBE = int(os.environ.get('NEWS_ANN_PROBE', 8))
+
+# Half-life in days for decaying TF-IDF document frequencies (0 keeps all-time counts)
+NEWS_IDF_HALF_LIFE = float(os.environ.get('NEWS_IDF_HALF_LIFE_DAYS', 0)) * 86400 or None
+
+# Worker processes for CPU-bound article text processing (0 disables the pool)
+NEWS_INGEST_WORKERS = int(os.environ.get('NEWS_INGEST_WORKERS', 0))
+
+# Near-duplicate detection at ingest: estimated Jaccard similarity threshold
+# (0, the default, disables; 0.8 is a good starting point) and whether
+# duplicates are stored with a 'duplicate_of' link ('link') or dropped ('collapse')
+NEWS_DEDUPE_THRESHOLD = float(os.environ.get('NEWS_DEDUPE_THRESHOLD', 0)) or None
+NEWS_DEDUPE_MODE = os.environ.get('NEWS_DEDUPE_MODE', 'link')
+
+# Time-partitioned storage: partition width and article TTL in days (0 keeps a
+# single unpartitioned store / never expires)
+NEWS_PARTITION_DAYS = float(os.environ.get('NEWS_PARTITION_DAYS', 0))
+NEWS_TTL_DAYS = float(os.environ.get('NEWS_TTL_DAYS', 0))
+
+# Default half-life in days for recency-weighted personalized ranking (0 disables)
+NEWS_RECENCY_HALF_LIFE_DAYS = float(os.environ.get('NEWS_RECENCY_HALF_LIFE_DAYS', 0))
+
+# Asynchronous ingestion queue for /process: capacity in articles, worker
+# threads and articles per analyzer batch
+NEWS_INGEST_QUEUE_SIZE = int(os.environ.get('NEWS_INGEST_QUEUE_SIZE', 10000))
+NEWS_INGEST_THREADS = int(os.environ.get('NEWS_INGEST_THREADS', 2))
+NEWS_INGEST_BATCH = int(os.environ.get('NEWS_INGEST_BATCH', 256))
+
+# Summary result cache: entries kept in memory (0 disables), TTL in seconds,
+# an optional directory for the on-disk tier and the files kept there
+NEWS_SUMMARY_CACHE_SIZE = int(os.environ.get('NEWS_SUMMARY_CACHE_SIZE', 1024))
+NEWS_SUMMARY_CACHE_TTL = float(os.environ.get('NEWS_SUMMARY_CACHE_TTL', 3600)) or None
+NEWS_SUMMARY_CACHE_DIR = os.environ.get('NEWS_SUMMARY_CACHE_DIR') or None
+NEWS_SUMMARY_CACHE_DISK_SIZE = int(os.environ.get('NEWS_SUMMARY_CACHE_DISK_SIZE', 10000))
+
+# Concurrent LLM calls for map-reduce summarization of large collections
+NEWS_SUMMARY_WORKERS = int(os.environ.get('NEWS_SUMMARY_WORKERS', 4))
+
+# Store extractive summaries and themes with articles at ingest ('1' enables, off by default)
+NEWS_MATERIALIZE_SUMMARIES = os.environ.get('NEWS_MATERIALIZE_SUMMARIES', '0') == '1'
+
 # Initialize services
-vector_db = VectorDB()
-news_analyzer = NewsAnalyzer(vector_db)
+ann_params = {'n_lists': NEWS_ANN_LISTS, 'n_probe': NEWS_ANN_PROBE} if NEWS_ANN_INDEX == 'ivf' else {}
+if NEWS_PARTITION_DAYS:
+    vector_db = PartitionedVectorDB(
+        partition_seconds=NEWS_PARTITION_DAYS * 86400,
+        ttl=NEWS_TTL_DAYS * 86400 or None,
+        index_factory=lambda: create_index(NEWS_ANN_INDEX, **ann_params)
+    )
+else:
+    vector_db = VectorDB(index=create_index(NEWS_ANN_INDEX, **ann_params))
+summary_cache = SummaryCache(
+    max_entries=NEWS_SUMMARY_CACHE_SIZE,
+    ttl=NEWS_SUMMARY_CACHE_TTL,
+    cache_dir=NEWS_SUMMARY_CACHE_DIR,
+    max_disk_entries=NEWS_SUMMARY_CACHE_DISK_SIZE
+) if NEWS_SUMMARY_CACHE_SIZE else None
+news_analyzer = NewsAnalyzer(vector_db, idf_half_life=NEWS_IDF_HALF_LIFE, ingest_workers=NEWS_INGEST_WORKERS,
+                             dedupe_threshold=NEWS_DEDUPE_THRESHOLD, dedupe_mode=NEWS_DEDUPE_MODE,
+                             summary_cache=summary_cache, summary_workers=NEWS_SUMMARY_WORKERS,
+                             materialize_summaries=NEWS_MATERIALIZE_SUMMARIES)
+ingest_queue = IngestQueue(news_analyzer, max_pending=NEWS_INGEST_QUEUE_SIZE,
+                           workers=NEWS_INGEST_THREADS, max_batch=NEWS_INGEST_BATCH)
 
 # Load configuration
 CONFIG_PATH = os.environ.get('CONFIG_PATH', '../config.json')
@@ -49,6 +117,12 @@ NEWS_API_URL = os.environ.get('NEWS_API_URL', 'https://newsapi.org/v2/everything
 NEWS_SOURCES = os.environ.get('NEWS_SOURCES', 'financial-times,bloomberg,cnbc,the-wall-street-journal,business-insider')
 NEWS_FETCH_INTERVAL = int(os.environ.get('NEWS_FETCH_INTERVAL', 3600))  # Default: fetch every hour
 
+# Scheduled fetch sources: comma-separated http(s) URLs and/or local JSON/NDJSON
+# files (empty uses generated mock news), fetched concurrently with retries
+NEWS_FETCH_SOURCES = [spec.strip() for spec in os.environ.get('NEWS_FETCH_SOURCES', '').split(',') if spec.strip()]
+NEWS_FETCH_WORKERS = int(os.environ.get('NEWS_FETCH_WORKERS', 4))
+NEWS_FETCH_RETRIES = int(os.environ.get('NEWS_FETCH_RETRIES', 3))
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -74,17 +148,29 @@ def get_personalized_news():
         # Get keywords if provided (optional)
         keywords = data.get('keywords', [])
         
+        # Recency half-life in days for vector ranking (0 ranks by similarity only)
+        recency_half_life = float(data.get('recency_half_life_days', NEWS_RECENCY_HALF_LIFE_DAYS)) * 86400 or None
+        
+        # Keyword match mode for hybrid retrieval
+        mode = data.get('mode', 'any')
+        if mode not in ('any', 'all'):
+            return jsonify({"error": "mode must be 'any' or 'all'"}), 400
+        
         logger.info(f"Getting personalized news with vector: {user_vector[:3]}... and {len(keywords)} keywords")
         
         if keywords and len(keywords) > 0:
             # If keywords provided, get news by both vector and keywords
             relevant_news = news_analyzer.get_relevant_news_for_vector_and_keywords(
-                user_vector, keywords, top_n
+                user_vector, keywords, top_n,
+                mode=mode,
+                keyword_weight=float(data.get('keyword_weight', 1.0))
             )
             logger.info(f"Found {len(relevant_news)} articles using vector and keywords")
         else:
             # Get relevant news for the user vector only
-            relevant_news = news_analyzer.get_relevant_news_for_vector(user_vector, top_n)
+            relevant_news = news_analyzer.get_relevant_news_for_vector(
+                user_vector, top_n, recency_half_life=recency_half_life
+            )
             logger.info(f"Found {len(relevant_news)} articles using vector only")
         
         return jsonify({"relevant_news": relevant_news}), 200
@@ -110,8 +196,13 @@ def get_news_by_keywords():
         # Get number of articles to return (default: 3)
         top_n = data.get('limit', 3)
         
+        # Match any keyword (default) or all of them
+        mode = data.get('mode', 'any')
+        if mode not in ('any', 'all'):
+            return jsonify({"error": "mode must be 'any' or 'all'"}), 400
+        
         # Get news articles by keywords
-        articles = news_analyzer.get_news_by_keywords(keywords, top_n)
+        articles = news_analyzer.get_news_by_keywords(keywords, top_n, mode)
         
         return jsonify({"news": articles}), 200
     
@@ -121,7 +212,14 @@ def get_news_by_keywords():
 
 @app.route('/api/v1/news/process', methods=['POST'])
 def process_news_articles():
-    """Process and index a batch of news articles"""
+    """
+    Queue a batch of news articles for processing and indexing
+    
+    Responds 202 with a job id to poll at /api/v1/news/jobs/<job_id>, 429
+    when the ingestion queue is full, or 413 when the batch is larger than
+    the whole queue and must be split. With "wait": true the batch is
+    processed inside the request instead.
+    """
     try:
         data = request.json
         
@@ -133,12 +231,30 @@ def process_news_articles():
         if not articles:
             return jsonify({"error": "No articles provided"}), 400
         
-        # Process articles
-        processed_articles = news_analyzer.batch_process_news(articles)
+        if not data.get('wait'):
+            try:
+                job_id = ingest_queue.submit(articles)
+            except BatchTooLarge as e:
+                return jsonify({"error": str(e), "max_batch": ingest_queue.max_pending}), 413
+            except QueueFull as e:
+                response = jsonify({"error": str(e)})
+                response.headers['Retry-After'] = '5'
+                return response, 429
+            
+            return jsonify({
+                "status": "accepted",
+                "job_id": job_id,
+                "queued": len(articles),
+                "status_url": f"/api/v1/news/jobs/{job_id}"
+            }), 202
+        
+        # Process articles (optionally forcing the process pool on or off)
+        processed_articles = news_analyzer.batch_process_news(articles, parallel=data.get('parallel'))
         
         return jsonify({
             "status": "success", 
             "processed": len(processed_articles),
+            "duplicates_skipped": len(articles) - len(processed_articles),
             "message": f"Successfully processed {len(processed_articles)} articles"
         }), 200
     
@@ -146,6 +262,53 @@ def process_news_articles():
         logger.error(f"Error processing news articles: {str(e)}")
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
+@app.route('/api/v1/news/process/stream', methods=['POST'])
+def process_news_stream():
+    """
+    Bulk-ingest newline-delimited JSON articles from the request body
+    
+    The body is read incrementally and processed in micro-batches of
+    batch_size articles (query parameter), so memory stays constant for any
+    upload size. The response streams one NDJSON progress record per
+    micro-batch, an error record per rejected line and a final
+    'completed' record.
+    """
+    batch_size = request.args.get('batch_size', NEWS_INGEST_BATCH, type=int)
+    if not batch_size or batch_size <= 0:
+        return jsonify({"error": "batch_size must be a positive integer"}), 400
+    
+    def generate():
+        for record in ingest_ndjson(news_analyzer, request.stream, batch_size):
+            if record['type'] == 'completed':
+                logger.info(f"Bulk ingest: processed {record['processed']} of {record['lines']} lines")
+            yield json.dumps(record) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/v1/news/jobs/<job_id>', methods=['GET'])
+def get_ingest_job(job_id):
+    """Status of an ingestion job queued by /process"""
+    job = ingest_queue.status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 404
+    return jsonify(job), 200
+
+@app.route('/api/v1/news/stats', methods=['GET'])
+def get_news_stats():
+    """Store size and ingest counters"""
+    stats = {
+        "articles": len(vector_db),
+        "ingest_queue": {"pending": ingest_queue.pending, "capacity": ingest_queue.max_pending},
+        "dedupe": news_analyzer.dedupe_stats()
+    }
+    if summary_cache is not None:
+        stats["summary_cache"] = summary_cache.metrics()
+    if news_scheduler is not None:
+        stats["sources"] = news_scheduler.status()
+    if isinstance(vector_db, PartitionedVectorDB):
+        stats["partitions"] = [{"start": start, "articles": count} for start, count in vector_db.partitions]
+    return jsonify(stats), 200
+
 @app.route('/api/v1/news/fetch', methods=['POST'])
 def fetch_latest_news():
     """Fetch the latest financial news from external API"""
@@ -188,6 +351,7 @@ def fetch_latest_news():
             "status": "success",
             "fetched": len(mock_articles),
             "processed": len(processed_articles),
+            "duplicates_skipped": len(mock_articles) - len(processed_articles),
             "message": f"Successfully fetched and processed {len(processed_articles)} articles"
         }), 200
         
@@ -206,6 +370,13 @@ def summarize_news():
         
         articles = data.get('articles', [])
         
+        # Stored articles can be referenced by id instead of sent in full
+        article_ids = data.get('article_ids', [])
+        if article_ids and not articles:
+            articles, missing = news_analyzer.get_stored_articles(article_ids)
+            if missing:
+                return jsonify({"error": "Articles not found", "missing_ids": missing}), 404
+        
         if not articles:
             return jsonify({"error": "No articles provided"}), 400
         
@@ -213,8 +384,11 @@ def summarize_news():
         options = {
             'max_length': data.get('max_length', 150),
             'focus_areas': data.get('focus_areas', []),
-            'style': data.get('style', 'informative')  # informative, concise, detailed
+            'style': data.get('style', 'informative'),  # informative, concise, detailed
+            'strategy': data.get('strategy', 'auto')  # auto, single, map_reduce
         }
+        if options['strategy'] not in ('auto', 'single', 'map_reduce'):
+            return jsonify({"error": "strategy must be 'auto', 'single' or 'map_reduce'"}), 400
         
         # Use the NewsAnalyzer to generate the summary
         summary_results = news_analyzer.generate_article_summary(articles, options)
@@ -354,32 +528,38 @@ def generate_mock_news(count=5):
     
     return articles
 
+news_scheduler = None
+
+def expire_partitions(summaries):
+    """Expire old partitions after each scheduled round, even when nothing new was stored"""
+    if isinstance(vector_db, PartitionedVectorDB):
+        dropped = vector_db.drop_expired()
+        if dropped:
+            logger.info(f"Scheduled job: dropped {dropped} expired news partitions")
+
 def start_periodic_news_fetch():
-    """Start a background thread to periodically fetch news"""
-    def news_fetch_job():
-        while True:
-            try:
-                logger.info("Starting scheduled news fetch")
-                mock_articles = generate_mock_news(5)
-                processed_articles = news_analyzer.batch_process_news(mock_articles)
-                logger.info(f"Scheduled job: processed {len(processed_articles)} news articles")
-                
-                # Sleep for the configured interval
-                time.sleep(NEWS_FETCH_INTERVAL)
-                
-            except Exception as e:
-                logger.error(f"Error in scheduled news fetch: {str(e)}")
-                # Sleep for a shorter time if there was an error
-                time.sleep(300)  # 5 minutes
+    """Start the background scheduler that incrementally fetches news from the configured sources"""
+    global news_scheduler
+    if NEWS_FETCH_SOURCES:
+        sources = [create_source(spec) for spec in NEWS_FETCH_SOURCES]
+    else:
+        sources = [CallableSource('mock', lambda: generate_mock_news(5))]
     
-    # Start the thread
-    thread = threading.Thread(target=news_fetch_job, daemon=True)
-    thread.start()
-    logger.info(f"Started periodic news fetch thread (interval: {NEWS_FETCH_INTERVAL}s)")
+    news_scheduler = NewsScheduler(
+        news_analyzer.batch_process_news,
+        sources,
+        interval=NEWS_FETCH_INTERVAL,
+        workers=NEWS_FETCH_WORKERS,
+        max_retries=NEWS_FETCH_RETRIES,
+        state_file=f"{vector_db.base_path}.watermarks.json",
+        after_round=expire_partitions
+    )
+    news_scheduler.start()
+    logger.info(f"Started news fetch scheduler for {len(sources)} sources (interval: {NEWS_FETCH_INTERVAL}s)")
 
 if __name__ == '__main__':
     # Load sample news if vector DB is empty
-    if not vector_db.vectors:
+    if len(vector_db) == 0:
         try:
             sample_news_path = os.path.join(os.path.dirname(__file__), '../recommender/news.json')
             with open(sample_news_path, 'r') as f:
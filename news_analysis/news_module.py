@@ -1,10 +1,17 @@
 import numpy as np
 import json
 import os
-import re
+import multiprocessing
+import threading
 from collections import Counter
-import math
-from vector_db_connector import VectorDB
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from vector_db_connector import VectorDB, PartitionedVectorDB
+from corpus_stats import CorpusStats
+from near_duplicates import NearDuplicateIndex
+from summary_cache import summary_key
+from feature_extraction import (BatchFeatureExtractor, tokenize, article_text, init_worker, count_articles,
+                                extractive_summary)
+from ai_utils.keyword_matcher import KeywordMatcher
 
 class NewsAnalyzer:
     """
@@ -12,9 +19,69 @@ class NewsAnalyzer:
     text processing techniques like TF-IDF and keyword matching.
     This is a simplified version that would typically use more sophisticated NLP.
     """
-    def __init__(self, vector_db=None):
-        """Initialize with a vector database connector"""
-        self.vector_db = vector_db or VectorDB()
+    # Most articles per process-pool task; batches are split evenly across workers
+    INGEST_CHUNK_SIZE = 256
+    
+    # Smallest batch sent to the process pool by default. Below this the
+    # round trip to the workers costs more than it saves; the ingest queue and
+    # stream endpoint batches (256 articles by default) are well above it.
+    PARALLEL_MIN_BATCH = 64
+    
+    # Characters of article text per summarization prompt; larger requests
+    # are map-reduced
+    SUMMARY_PROMPT_CHARS = 12000
+    
+    # Word budget of each per-article (map step) summary
+    MAP_SUMMARY_WORDS = 80
+    
+    # Sentences kept in an ingest-time extractive summary
+    EXTRACTIVE_SENTENCES = 2
+    
+    # Themes of article categories
+    CATEGORY_THEMES = {
+        'economy': 'Economic Developments',
+        'markets': 'Market Trends',
+        'stocks': 'Stock Market Performance',
+        'real estate': 'Real Estate Market',
+        'banking': 'Banking Sector News',
+        'technology': 'Technology Sector Updates',
+        'policy': 'Financial Policy Changes',
+        'personal finance': 'Personal Finance Tips',
+        'global markets': 'Global Market Trends',
+        'finance': 'Financial Industry News'
+    }
+    
+    # Themes of the financial keyword categories (feature vector dimensions)
+    TOPIC_THEMES = {
+        'income': 'Income and Earnings',
+        'spending': 'Consumer Spending',
+        'risk': 'Risk and Volatility',
+        'goals': 'Financial Planning',
+        'savings': 'Saving and Investing',
+        'debt': 'Debt and Credit'
+    }
+    
+    def __init__(self, vector_db=None, idf_half_life=None, ingest_workers=0, dedupe_threshold=None,
+                 dedupe_mode='link', summary_cache=None, summary_workers=4, materialize_summaries=False):
+        """
+        Initialize with a vector database connector
+        
+        Args:
+            vector_db (VectorDB): Vector database for processed articles
+            idf_half_life (float): Half-life in seconds for decaying document frequencies
+                (None keeps all-time statistics)
+            ingest_workers (int): Worker processes for text processing in batch_process_news
+                (0 or 1 processes batches in this process)
+            dedupe_threshold (float): Estimated Jaccard similarity above which an incoming
+                article is a near-duplicate of a stored one (None disables deduplication)
+            dedupe_mode (str): 'link' (the default) to store near-duplicates with a
+                'duplicate_of' field naming the original, 'collapse' to skip storing them
+            summary_cache (SummaryCache): Cache of generate_article_summary results (None disables caching)
+            summary_workers (int): Concurrent LLM calls for map-reduce summarization
+            materialize_summaries (bool): Store an extractive summary and themes with each
+                ingested article so summaries of stored articles need no text processing
+        """
+        self.vector_db = vector_db if vector_db is not None else VectorDB()
         
         # Financial keyword categories for vector representation
         self.keyword_categories = {
@@ -37,18 +104,63 @@ class NewsAnalyzer:
         # Financial entity types to track
         self.entity_types = ['company', 'market', 'sector', 'economic_indicator', 'financial_product']
         
-        # Document corpus (for TF-IDF calculation)
-        self.document_corpus = []
+        # One automaton over every category keyword and sentiment term,
+        # labelled by category / polarity
+        self.keyword_matcher = KeywordMatcher({**self.keyword_categories, **self.sentiment_lexicon})
+        
+        # Document-frequency statistics (for TF-IDF calculation), persisted
+        # next to the vector store so IDF survives restarts
+        self.corpus_stats = CorpusStats(self.keyword_categories, half_life=idf_half_life)
+        self.corpus_stats_file = f"{self.vector_db.base_path}.corpus_stats.json"
+        self.corpus_stats.load(self.corpus_stats_file)
+        
+        # Vectorized feature extraction for batches
+        self.feature_extractor = BatchFeatureExtractor(self.keyword_categories, self.sentiment_lexicon)
+        
+        # MinHash/LSH index of ingested articles for near-duplicate detection,
+        # persisted next to the vector store; articles stored before dedupe was
+        # enabled are not indexed
+        if dedupe_mode not in ('collapse', 'link'):
+            raise ValueError(f"Unknown dedupe mode: {dedupe_mode}")
+        self.dedupe_mode = dedupe_mode
+        self.duplicate_index = None
+        if dedupe_threshold:
+            self.duplicate_index = NearDuplicateIndex(dedupe_threshold, path=f"{self.vector_db.base_path}.minhash")
+            # Expired partitions take their signatures with them
+            if isinstance(self.vector_db, PartitionedVectorDB):
+                self.vector_db.add_drop_listener(self.duplicate_index.remove_many)
+        self._pending_ids = set()
+        
+        # Serializes statistics updates and storage between ingesting threads
+        self._ingest_lock = threading.Lock()
+        
+        self.ingest_workers = ingest_workers
+        
+        # Summary results keyed by article contents and options
+        self.summary_cache = summary_cache
+        
+        # Thread pool for map-reduce summarization, shared by all requests so
+        # it bounds concurrent LLM calls; started on first use
+        self.summary_workers = summary_workers
+        self._summary_pool = None
+        self._summary_pool_lock = threading.Lock()
+        self.materialize_summaries = materialize_summaries
+        
+        # Process pool for CPU-bound text processing, started with the analyzer
+        self._ingest_pool_lock = threading.Lock()
+        self._ingest_pool = self._start_ingest_pool() if ingest_workers > 1 else None
         
         # Import LLM utilities if available
         try:
             import sys
             import os
             sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-            from ai_utils.llm_utils import LLMManager
+            from ai_utils.llm_utils import LLMManager, UNAVAILABLE_RESPONSE
             self.llm_manager = LLMManager()
+            self.llm_unavailable_response = UNAVAILABLE_RESPONSE
         except ImportError:
             self.llm_manager = None
+            self.llm_unavailable_response = None
         
     def preprocess_text(self, text):
         """
@@ -60,27 +172,17 @@ class NewsAnalyzer:
         Returns:
             list: Tokenized text
         """
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove punctuation and special characters
-        text = re.sub(r'[^\w\s]', ' ', text)
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        # Lowercase and split into runs of word characters, which drops
+        # punctuation, special characters and extra whitespace in one pass
+        return tokenize(text)
         
-        # Split into tokens
-        tokens = text.split()
-        
-        return tokens
-        
-    def calculate_tfidf(self, document, category_keywords):
+    def calculate_tfidf(self, document, category):
         """
         Calculate TF-IDF scores for category keywords in the document
         
         Args:
             document (list): Tokenized document
-            category_keywords (list): Keywords to calculate TF-IDF for
+            category (str): Keyword category to calculate TF-IDF for
             
         Returns:
             float: TF-IDF score for the category
@@ -90,23 +192,14 @@ class NewsAnalyzer:
         if document_length == 0:
             return 0.0
             
-        # Count occurrences of category keywords
-        keyword_count = sum(1 for token in document if token in category_keywords)
+        # Count occurrences of category keywords, including multi-word phrases
+        keyword_count = self.keyword_matcher.label_counts(document)[category]
         
         # Calculate term frequency
         tf = keyword_count / document_length
         
-        # Calculate inverse document frequency (simplified)
-        # In a real implementation, this would use the full corpus
-        matches_in_corpus = 0
-        corpus_size = max(1, len(self.document_corpus))
-        
-        for doc in self.document_corpus:
-            if any(keyword in doc for keyword in category_keywords):
-                matches_in_corpus += 1
-        
-        # Add smoothing to avoid division by zero
-        idf = math.log((corpus_size + 1) / (matches_in_corpus + 1)) + 1
+        # Inverse document frequency from the maintained document-frequency table
+        idf = self.corpus_stats.idf(category)
         
         return tf * idf
     
@@ -120,8 +213,9 @@ class NewsAnalyzer:
         Returns:
             float: Sentiment score (-1 to 1)
         """
-        positive_count = sum(1 for token in tokens if token in self.sentiment_lexicon['positive'])
-        negative_count = sum(1 for token in tokens if token in self.sentiment_lexicon['negative'])
+        counts = self.keyword_matcher.label_counts(tokens)
+        positive_count = counts['positive']
+        negative_count = counts['negative']
         
         total_count = positive_count + negative_count
         
@@ -130,111 +224,358 @@ class NewsAnalyzer:
             
         return (positive_count - negative_count) / total_count
     
-    def process_news_article(self, article):
+    def process_news_article(self, article, store=True):
         """
         Process a news article and extract a feature vector
         
         Args:
             article (dict): News article with title, content, date, etc.
+            store (bool): Whether to store the processed article in the vector DB
             
         Returns:
             dict: Processed article with feature vector
         """
-        # Extract text from article
-        title = article.get('title', '')
-        content = article.get('content', '')
-        summary = article.get('summary', '')
-        
-        # Create full text for analysis
-        full_text = f"{title} {summary} {content}"
-        
-        # Preprocess text
-        tokens = self.preprocess_text(full_text)
-        
-        # Update document corpus for future TF-IDF calculations
-        self.document_corpus.append(tokens)
-        
-        # Initialize feature vector
-        # [income_relevance, spending_relevance, risk_relevance, 
-        #  goals_relevance, savings_relevance, debt_relevance]
-        vector = [0.0] * 6
-        
-        # Calculate TF-IDF scores for each category
-        for i, (category, keywords) in enumerate(self.keyword_categories.items()):
-            vector[i] = self.calculate_tfidf(tokens, keywords)
+        # Preprocess article text
+        tokens = self.preprocess_text(self._article_text(article))
+        signature = self.duplicate_index.signature(tokens) if self.duplicate_index is not None else None
+        summary = self._extractive_summary(article) if self.materialize_summaries else None
+        
+        # Feature extraction, statistics updates and storage are serialized across
+        # ingesting threads; tokenization and summarization above run concurrently
+        with self._ingest_lock:
+            try:
+                # Near-duplicates of stored articles are collapsed or linked
+                duplicate_of = None
+                if self.duplicate_index is not None:
+                    if store:
+                        duplicate_of = self._check_duplicates([article], [signature])[0]
+                    elif signature is not None:
+                        match = self.duplicate_index.query(signature, article.get('id'), self._is_stored_or_pending)
+                        duplicate_of = match[0] if match else None
+                    if duplicate_of is not None and self.dedupe_mode == 'collapse':
+                        return dict(article, duplicate_of=duplicate_of)
+                
+                # Feature vector [income_relevance, spending_relevance, risk_relevance,
+                # goals_relevance, savings_relevance, debt_relevance], normalized to
+                # 0-1, plus sentiment and keywords; a batch of one shares the batch
+                # path's keyword matching and TF-IDF arithmetic
+                self.corpus_stats.advance_to()
+                features = self.feature_extractor.extract(
+                    [tokens], self.corpus_stats.document_count, self.corpus_stats.category_doc_freq
+                )
+                
+                # Update document frequencies for TF-IDF calculations
+                self._add_document_frequencies(features)
+                
+                processed_article = self._build_processed_article(
+                    article, features['vectors'][0].tolist(), float(features['sentiment'][0]), features['keywords'][0],
+                    summary
+                )
+                if duplicate_of is not None:
+                    processed_article['duplicate_of'] = duplicate_of
+                
+                # Store in vector DB
+                if store:
+                    self.vector_db.store_vector(processed_article)
+                    self.corpus_stats.save(self.corpus_stats_file)
+                
+                return processed_article
+            finally:
+                # Ids reserved by _check_duplicates are stored or abandoned by now
+                self._pending_ids.clear()
+    
+    def _article_text(self, article):
+        """Full text of an article used for analysis"""
+        return article_text(article)
+    
+    def _start_ingest_pool(self):
+        """
+        Create the ingestion process pool and start its workers
+        
+        Workers are forked here, during construction, rather than on the first
+        large batch while ingest, scheduler and request threads are running.
+        Fork is preferred because spawn and forkserver would re-run the service
+        module's start-up code (vector DB, compactor thread) in every worker.
+        Workers only run count_articles, which touches no locks held by parent
+        threads.
+        """
+        start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+        pool = ProcessPoolExecutor(
+            max_workers=self.ingest_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=init_worker,
+            initargs=(self.keyword_categories, self.sentiment_lexicon, self._minhash_params(),
+                      self.EXTRACTIVE_SENTENCES if self.materialize_summaries else 0)
+        )
+        # The first submission starts every worker process
+        pool.submit(os.getpid).result()
+        return pool
+    
+    def _get_ingest_pool(self):
+        """The ingestion process pool, or None when disabled or closed"""
+        with self._ingest_pool_lock:
+            return self._ingest_pool
+    
+    def _minhash_params(self):
+        """MinHasher settings for pool workers (None when deduplication is off)"""
+        if self.duplicate_index is None:
+            return None
+        hasher = self.duplicate_index.hasher
+        return {'num_perm': hasher.num_perm, 'shingle_size': hasher.shingle_size, 'seed': hasher.seed}
+    
+    def _count_terms(self, articles, parallel):
+        """
+        Term counts, token lengths, MinHash signatures and extractive summaries
+        for a batch, optionally across the process pool (signatures are None
+        when deduplication is off, summaries when they are not materialized)
+        """
+        use_pool = parallel if parallel is not None else len(articles) >= self.PARALLEL_MIN_BATCH
+        pool = self._get_ingest_pool() if use_pool else None
+        if pool is not None:
+            chunk_size = min(self.INGEST_CHUNK_SIZE, -(-len(articles) // self.ingest_workers))
+            chunks = [articles[i:i + chunk_size] for i in range(0, len(articles), chunk_size)]
+            # map() yields results in submission order, keeping the batch ordered
+            results = list(pool.map(count_articles, chunks))
+            counts = np.concatenate([counts for counts, _, _, _ in results])
+            lengths = np.concatenate([lengths for _, lengths, _, _ in results])
+            signatures = None
+            if self.duplicate_index is not None:
+                signatures = [signature for _, _, chunk, _ in results for signature in chunk]
+            summaries = None
+            if self.materialize_summaries:
+                summaries = [summary for _, _, _, chunk in results for summary in chunk]
+            return counts, lengths, signatures, summaries
+        
+        token_lists = [self.preprocess_text(self._article_text(article)) for article in articles]
+        lengths = np.array([len(tokens) for tokens in token_lists], dtype=np.float64)
+        signatures = None
+        if self.duplicate_index is not None:
+            signatures = [self.duplicate_index.signature(tokens) for tokens in token_lists]
+        summaries = None
+        if self.materialize_summaries:
+            summaries = [self._extractive_summary(article) for article in articles]
+        return self.feature_extractor.term_counts(token_lists), lengths, signatures, summaries
+    
+    def _is_stored_or_pending(self, article_id):
+        """Whether an indexed article id is in the vector DB or about to be stored"""
+        return article_id in self._pending_ids or article_id in self.vector_db
+    
+    def _check_duplicates(self, articles, signatures):
+        """
+        Look up each article's near-duplicate in order, indexing the new ones
         
-        # Extract sentiment score
-        sentiment = self.extract_sentiment(tokens)
+        Articles earlier in the batch count as stored, so copies within one
+        batch are caught too. New articles stay in _pending_ids until the
+        caller has stored them (or failed to); callers hold the ingest lock
+        and clear _pending_ids when done. Articles without an id or text are never
+        treated as duplicates.
         
-        # Normalize vector values to 0-1 range
-        max_value = max(vector) if max(vector) > 0 else 1.0
-        vector = [min(1.0, v / max_value) for v in vector]
+        Returns:
+            list: Id of the original per article, or None for new articles
+        """
+        duplicates = []
+        for article, signature in zip(articles, signatures):
+            article_id = article.get('id')
+            match = None
+            if article_id and signature is not None:
+                match = self.duplicate_index.check_and_add(article_id, signature, self._is_stored_or_pending)
+                if match is None:
+                    self._pending_ids.add(article_id)
+            duplicates.append(match[0] if match else None)
+        return duplicates
+    
+    def dedupe_stats(self):
+        """
+        Near-duplicate detection counters
         
-        # Create processed article
+        Returns:
+            dict: Whether deduplication is enabled, its threshold and mode, the
+                number of indexed originals, articles checked and duplicates found
+        """
+        if self.duplicate_index is None:
+            return {'enabled': False}
+        index = self.duplicate_index
+        return {
+            'enabled': True,
+            'threshold': index.threshold,
+            'mode': self.dedupe_mode,
+            'indexed': len(index),
+            'checked': index.stats['checked'],
+            'duplicates': index.stats['duplicates']
+        }
+    
+    def close(self):
+        """Shut down the worker pools and close the near-duplicate index"""
+        with self._ingest_pool_lock:
+            if self._ingest_pool is not None:
+                self._ingest_pool.shutdown()
+                self._ingest_pool = None
+        with self._summary_pool_lock:
+            if self._summary_pool is not None:
+                self._summary_pool.shutdown()
+                self._summary_pool = None
+        if self.duplicate_index is not None:
+            self.duplicate_index.close()
+    
+    def _add_document_frequencies(self, features):
+        """Fold extracted features for a batch into the document-frequency table"""
+        extractor = self.feature_extractor
+        category_totals = features['category_presence'].sum(axis=0)
+        self.corpus_stats.add_counts(
+            len(features['sentiment']),
+            {c: int(n) for c, n in zip(extractor.categories, category_totals)}
+        )
+    
+    def _build_processed_article(self, article, vector, sentiment, keywords, summary=None):
+        """Copy an article and attach its extracted features (and precomputed extractive summary)"""
         processed_article = article.copy()
         processed_article['vector'] = vector
         processed_article['sentiment'] = sentiment
         processed_article['processed_date'] = os.environ.get('CURRENT_DATE', '2025-03-23')
+        processed_article['keywords'] = keywords
+        if self.materialize_summaries:
+            processed_article['extractive_summary'] = summary
+            processed_article['themes'] = self._article_themes(article, vector)
+        return processed_article
+    
+    def _extractive_summary(self, article):
+        """Extractive summary of an article: its EXTRACTIVE_SENTENCES most keyword-dense sentences"""
+        return extractive_summary(article, self.keyword_matcher, self.EXTRACTIVE_SENTENCES)
+    
+    def _category_theme(self, category):
+        """Theme of an article category"""
+        return self.CATEGORY_THEMES.get(category, f"{category.title()} News")
+    
+    def _article_themes(self, article, vector):
+        """Category theme followed by the article's two strongest keyword-category themes"""
+        themes = [self._category_theme(article.get('category', 'general'))]
+        ranked = sorted(zip(vector, self.keyword_categories), key=lambda x: -x[0])
+        themes.extend(self.TOPIC_THEMES[category] for relevance, category in ranked[:2] if relevance > 0)
+        return themes
+    
+    def get_stored_articles(self, article_ids):
+        """
+        Look up stored articles by id
         
-        # Extract keywords for searchability
-        all_keywords = []
-        for category, keywords in self.keyword_categories.items():
-            for keyword in keywords:
-                if keyword in tokens:
-                    all_keywords.append(keyword)
+        Args:
+            article_ids (list): Article ids
+            
+        Returns:
+            tuple: (stored articles in request order, ids that were not found)
+        """
+        articles, missing = [], []
+        for article_id in article_ids:
+            article = self.vector_db.get(article_id)
+            if article is None:
+                missing.append(article_id)
+            else:
+                articles.append(article)
+        return articles, missing
+    
+    def batch_process_news(self, articles, parallel=None):
+        """
+        Process a batch of news articles
         
-        # Store top keywords (unique)
-        processed_article['keywords'] = list(set(all_keywords))
+        Tokenizes each article once, computes TF-IDF vectors, sentiment and keywords
+        for the whole batch with vectorized operations, and stores the results with
+        a single bulk write. Produces the same features as calling
+        process_news_article on each article in order.
         
-        # Store in vector DB
-        self.vector_db.store_vector(processed_article)
+        With ingest_workers > 1, tokenization and term counting run in worker
+        processes; this process merges the results in order, updates document
+        frequencies and commits to the vector DB.
         
-        return processed_article
-    
-    def batch_process_news(self, articles):
-        """Process a batch of news articles"""
-        processed = []
-        for article in articles:
-            processed.append(self.process_news_article(article))
-        return processed
+        Args:
+            articles (list): News articles
+            parallel (bool): Force the process pool on or off (default: batches of at
+                least PARALLEL_MIN_BATCH articles when ingest_workers > 1)
+            
+        Returns:
+            list: Processed articles with feature vectors
+        """
+        articles = list(articles)
+        if not articles:
+            return []
+        
+        counts, lengths, signatures, summaries = self._count_terms(articles, parallel)
+        
+        # Tokenization and counting run concurrently; everything that reads or
+        # updates shared state is serialized across ingesting threads
+        with self._ingest_lock:
+            try:
+                # Near-duplicates of stored (or earlier) articles are dropped or linked
+                duplicate_of = [None] * len(articles)
+                if self.duplicate_index is not None:
+                    duplicate_of = self._check_duplicates(articles, signatures)
+                    if self.dedupe_mode == 'collapse':
+                        keep = [i for i, original in enumerate(duplicate_of) if original is None]
+                        if not keep:
+                            return []
+                        articles = [articles[i] for i in keep]
+                        counts, lengths = counts[keep], lengths[keep]
+                        if summaries is not None:
+                            summaries = [summaries[i] for i in keep]
+                        duplicate_of = [None] * len(articles)
+                
+                self.corpus_stats.advance_to()
+                features = self.feature_extractor.extract_from_counts(
+                    counts, lengths, self.corpus_stats.document_count, self.corpus_stats.category_doc_freq
+                )
+                
+                # Fold the batch into the document-frequency table
+                self._add_document_frequencies(features)
+                
+                processed = [
+                    self._build_processed_article(article, vector.tolist(), float(sentiment), keywords, summary)
+                    for article, vector, sentiment, keywords, summary in zip(
+                        articles, features['vectors'], features['sentiment'], features['keywords'],
+                        summaries or [None] * len(articles)
+                    )
+                ]
+                for processed_article, original in zip(processed, duplicate_of):
+                    if original is not None:
+                        processed_article['duplicate_of'] = original
+                
+                self.vector_db.store_vectors(processed)
+                self.corpus_stats.save(self.corpus_stats_file)
+                return processed
+            finally:
+                # Ids reserved by _check_duplicates are stored or abandoned by now
+                self._pending_ids.clear()
     
-    def get_relevant_news_for_vector(self, user_vector, top_n=3):
+    def get_relevant_news_for_vector(self, user_vector, top_n=3, recency_half_life=None):
         """
         Get news articles relevant to a user vector
         
         Args:
             user_vector (list): User financial persona vector
             top_n (int): Number of articles to return
+            recency_half_life (float): Seconds after which an article's relevance is halved
+                (None ranks by similarity only)
             
         Returns:
             list: Top N most relevant articles
         """
+        if recency_half_life:
+            return self.vector_db.query_similar_vectors(user_vector, top_n, half_life=recency_half_life)
         return self.vector_db.query_similar_vectors(user_vector, top_n)
         
-    def get_news_by_keywords(self, keywords, top_n=3):
+    def get_news_by_keywords(self, keywords, top_n=3, mode='any'):
         """
         Get news articles containing specific keywords
         
         Args:
             keywords (list): List of keywords to search for
             top_n (int): Number of articles to return
+            mode (str): 'any' to match at least one keyword, 'all' to match every keyword
             
         Returns:
-            list: Articles containing the keywords
+            list: Articles containing the keywords, ranked by match count and recency
         """
-        matching_articles = []
-        
-        for article in self.vector_db.vectors:
-            article_keywords = article.get('keywords', [])
-            
-            # Check if any of the search keywords match article keywords
-            if any(keyword in article_keywords for keyword in keywords):
-                matching_articles.append(article)
-        
-        # Return top N matching articles
-        return matching_articles[:top_n]
+        return self.vector_db.query_keywords(keywords, top_n, mode)
         
-    def get_relevant_news_for_vector_and_keywords(self, user_vector, keywords, top_n=3):
+    def get_relevant_news_for_vector_and_keywords(self, user_vector, keywords, top_n=3, mode='any',
+                                                  keyword_weight=1.0):
         """
         Get news articles relevant to both a user vector and containing specific keywords
         
@@ -242,47 +583,21 @@ class NewsAnalyzer:
             user_vector (list): User financial persona vector
             keywords (list): List of keywords to search for
             top_n (int): Number of articles to return
+            mode (str): 'any' to match at least one keyword, 'all' to match every keyword
+            keyword_weight (float): Weight of keyword relevance relative to vector similarity
             
         Returns:
-            list: Top N most relevant articles that also match keywords
+            list: Top N most relevant articles that also match keywords, supplemented
+                with the best vector matches if too few articles match
         """
-        # Get articles by vector similarity
-        vector_matches = self.vector_db.query_similar_vectors(user_vector, top_n * 2)  # Get more to filter
-        
         # If no keywords provided, just return vector matches
         if not keywords or len(keywords) == 0:
-            return vector_matches[:top_n]
-            
-        # Process keywords to lowercase for case-insensitive matching
-        keywords_lower = [k.lower() for k in keywords]
-        
-        # Filter vector matches by keywords
-        keyword_filtered = []
-        
-        for article in vector_matches:
-            # Get article text
-            title = article.get('title', '').lower()
-            content = article.get('content', '').lower()
-            summary = article.get('summary', '').lower()
-            article_keywords = [k.lower() for k in article.get('keywords', [])]
-            
-            # Check if any keyword matches in article text or keywords
-            full_text = f"{title} {summary} {content}"
-            if any(keyword in full_text for keyword in keywords_lower) or \
-               any(keyword in article_keywords for keyword in keywords_lower):
-                keyword_filtered.append(article)
-        
-        # If we don't have enough keyword matches, supplement with top vector matches
-        if len(keyword_filtered) < top_n:
-            # Get IDs of articles already in keyword_filtered
-            filtered_ids = {article.get('id') for article in keyword_filtered}
-            
-            # Add vector matches that aren't already in keyword_filtered
-            for article in vector_matches:
-                if article.get('id') not in filtered_ids and len(keyword_filtered) < top_n:
-                    keyword_filtered.append(article)
+            return self.vector_db.query_similar_vectors(user_vector, top_n)
         
-        return keyword_filtered[:top_n]
+        # Prefilter through the keyword index and fuse keyword and vector ranks
+        return self.vector_db.query_hybrid(
+            user_vector, keywords, top_n, mode=mode, keyword_weight=keyword_weight
+        )
     
     def generate_article_summary(self, articles, options=None):
         """
@@ -294,6 +609,9 @@ class NewsAnalyzer:
                 - max_length (int): Maximum length of summary in words
                 - focus_areas (list): Areas to focus on in the summary
                 - style (str): Summarization style (concise, informative, detailed)
+                - strategy (str): 'single' for one LLM prompt, 'map_reduce' to summarize
+                  articles concurrently and synthesize the partial summaries, or 'auto'
+                  (default) to map-reduce only when the text exceeds one prompt
                 
         Returns:
             dict: Summary results including the summary text and metadata
@@ -306,13 +624,29 @@ class NewsAnalyzer:
         max_length = options.get('max_length', 150)
         focus_areas = options.get('focus_areas', [])
         style = options.get('style', 'informative')  # informative, concise, detailed
+        strategy = options.get('strategy', 'auto')  # auto, single, map_reduce
+        
+        # Identical articles and options return the cached result
+        cache_key = None
+        if self.summary_cache is not None:
+            cache_key = summary_key(
+                articles,
+                {'max_length': max_length, 'focus_areas': focus_areas, 'style': style, 'strategy': strategy},
+                namespace='llm' if self.llm_manager else 'fallback'
+            )
+            cached = self.summary_cache.get(cache_key)
+            if cached is not None:
+                return cached
         
         # Check if we're summarizing a single article or multiple articles
         is_single_article = len(articles) == 1
         
         # Generate the summary using LLM if available
         if self.llm_manager:
-            summary = self._generate_summary_with_llm(articles, is_single_article, max_length, focus_areas, style)
+            if self._use_map_reduce(articles, strategy):
+                summary = self._generate_summary_map_reduce(articles, max_length, focus_areas, style)
+            else:
+                summary = self._generate_summary_with_llm(articles, is_single_article, max_length, focus_areas, style)
         else:
             # Fallback summary if LLM is not available
             summary = self._generate_fallback_summary(articles, is_single_article)
@@ -326,7 +660,7 @@ class NewsAnalyzer:
         # Determine overall sentiment
         sentiment = self._calculate_aggregate_sentiment(articles)
         
-        return {
+        result = {
             "summary": summary,
             "article_count": len(articles),
             "themes": themes,
@@ -334,6 +668,11 @@ class NewsAnalyzer:
             "sentiment": sentiment,
             "generated_at": os.environ.get('CURRENT_DATE', '2025-03-23')
         }
+        
+        # Failed LLM calls are not cached so the next request retries
+        if cache_key is not None and summary != self.llm_unavailable_response:
+            self.summary_cache.put(cache_key, result)
+        return result
     
     def _generate_summary_with_llm(self, articles, is_single_article, max_length, focus_areas, style):
         """Generate a summary using the LLM Manager"""
@@ -382,13 +721,136 @@ class NewsAnalyzer:
         # Generate the summary
         return self.llm_manager.generate(prompt)
     
+    def _summary_text_length(self, articles):
+        """Characters of article text a summarization prompt would include"""
+        return sum(len(article.get('title') or '') + len(article.get('content') or '') for article in articles)
+    
+    def _use_map_reduce(self, articles, strategy):
+        """Whether a summary request should be map-reduced"""
+        if strategy == 'map_reduce':
+            return True
+        if strategy == 'single':
+            return False
+        return self._summary_text_length(articles) > self.SUMMARY_PROMPT_CHARS
+    
+    def _get_summary_pool(self):
+        """Start the summarization thread pool on first use"""
+        with self._summary_pool_lock:
+            if self._summary_pool is None:
+                self._summary_pool = ThreadPoolExecutor(
+                    max_workers=max(1, self.summary_workers), thread_name_prefix='news-summary'
+                )
+            return self._summary_pool
+    
+    def _summary_units(self, articles):
+        """
+        Split articles into map-step units that each fit in one prompt
+        
+        Articles longer than SUMMARY_PROMPT_CHARS are cut into parts at paragraph
+        boundaries (or hard cuts for oversized paragraphs).
+        """
+        limit = self.SUMMARY_PROMPT_CHARS
+        units = []
+        for article in articles:
+            title = article.get('title') or ''
+            content = article.get('content') or ''
+            if len(title) + len(content) <= limit:
+                units.append({'title': title, 'content': content})
+                continue
+            
+            parts, current = [], ''
+            for paragraph in content.split('\n'):
+                while len(paragraph) > limit:
+                    if current:
+                        parts.append(current)
+                        current = ''
+                    parts.append(paragraph[:limit])
+                    paragraph = paragraph[limit:]
+                if current and len(current) + len(paragraph) + 1 > limit:
+                    parts.append(current)
+                    current = ''
+                current = f"{current}\n{paragraph}" if current else paragraph
+            if current:
+                parts.append(current)
+            units.extend(
+                {'title': f"{title} (part {i + 1} of {len(parts)})", 'content': part}
+                for i, part in enumerate(parts)
+            )
+        return units
+    
+    def _summarize_unit(self, unit, focus_areas, style):
+        """Map step: summarize one unit, cached by content and options"""
+        cache_key = None
+        if self.summary_cache is not None:
+            cache_key = summary_key(
+                [unit],
+                {'max_length': self.MAP_SUMMARY_WORDS, 'focus_areas': focus_areas, 'style': style},
+                namespace='map'
+            )
+            cached = self.summary_cache.get(cache_key)
+            if cached is not None:
+                return cached['summary']
+        
+        summary = self._generate_summary_with_llm([unit], True, self.MAP_SUMMARY_WORDS, focus_areas, style)
+        if cache_key is not None and summary != self.llm_unavailable_response:
+            self.summary_cache.put(cache_key, {'summary': summary})
+        return summary
+    
+    def _generate_summary_map_reduce(self, articles, max_length, focus_areas, style):
+        """
+        Summarize articles concurrently, then synthesize the partial summaries
+        
+        Each article (or part of a long article) is summarized on the shared
+        thread pool, so wall-clock time follows the slowest batch of calls
+        rather than the total text size. Partial summaries are combined with
+        the multi-article prompt; if they still exceed one prompt, they are
+        reduced in groups until they fit.
+        """
+        pool = self._get_summary_pool()
+        units = self._summary_units(articles)
+        partials = list(pool.map(lambda unit: self._summarize_unit(unit, focus_areas, style), units))
+        partials = [
+            {'title': unit['title'], 'content': summary}
+            for unit, summary in zip(units, partials)
+            if summary and summary != self.llm_unavailable_response
+        ]
+        if not partials:
+            return self.llm_unavailable_response
+        
+        # Reduce oversized partial sets in prompt-sized groups
+        while len(partials) > 1 and self._summary_text_length(partials) > self.SUMMARY_PROMPT_CHARS:
+            groups, current, size = [], [], 0
+            for partial in partials:
+                length = self._summary_text_length([partial])
+                if current and size + length > self.SUMMARY_PROMPT_CHARS:
+                    groups.append(current)
+                    current, size = [], 0
+                current.append(partial)
+                size += length
+            groups.append(current)
+            if len(groups) == len(partials):
+                break
+            reduced = pool.map(
+                lambda group: self._generate_summary_with_llm(group, len(group) == 1, max_length, focus_areas, style),
+                groups
+            )
+            partials = [
+                {'title': f"Summary of {len(group)} articles", 'content': summary}
+                for group, summary in zip(groups, reduced)
+            ]
+        
+        return self._generate_summary_with_llm(partials, len(partials) == 1, max_length, focus_areas, style)
+    
     def _generate_fallback_summary(self, articles, is_single_article):
         """Generate a basic summary without using LLM"""
         if is_single_article:
-            # For a single article, use the summary field or the first paragraph
+            # For a single article, use the summary field, the ingest-time
+            # extractive summary or the first paragraph
             article = articles[0]
             if article.get('summary'):
                 return article['summary']
+            elif article.get('extractive_summary'):
+                return article['extractive_summary']
             elif article.get('content'):
                 # Get first paragraph (up to 200 chars)
                 content = article['content']
@@ -403,6 +865,11 @@ class NewsAnalyzer:
     
     def _extract_themes_from_articles(self, articles):
         """Extract common themes from the articles"""
+        # Articles ingested with materialized themes only need their themes counted
+        if all('themes' in article for article in articles):
+            theme_counts = Counter(theme for article in articles for theme in article['themes'])
+            return [theme for theme, _ in theme_counts.most_common(3)]
+        
         # In a real implementation, this would use topic modeling or clustering
         # Here we use a simplified approach based on keywords and categories
         
@@ -414,24 +881,9 @@ class NewsAnalyzer:
         # Get the most common categories
         sorted_categories = sorted(categories.items(), key=lambda x: x[1], reverse=True)
         
-        # Map categories to themes
-        theme_mapping = {
-            'economy': 'Economic Developments',
-            'markets': 'Market Trends',
-            'stocks': 'Stock Market Performance',
-            'real estate': 'Real Estate Market',
-            'banking': 'Banking Sector News',
-            'technology': 'Technology Sector Updates',
-            'policy': 'Financial Policy Changes',
-            'personal finance': 'Personal Finance Tips',
-            'global markets': 'Global Market Trends',
-            'finance': 'Financial Industry News'
-        }
-        
         themes = []
         for category, _ in sorted_categories[:3]:  # Get top 3 categories
-            theme = theme_mapping.get(category, f"{category.title()} News")
-            themes.append(theme)
+            themes.append(self._category_theme(category))
         
         return themes
     
@@ -0,0 +1,216 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from vector_db_connector import article_timestamp
+from vector_log import write_atomically
+
+class NewsScheduler:
+    """
+    Incremental scheduled fetcher for a set of news sources
+
+    Every round fetches all sources concurrently on a thread pool, retrying
+    failed fetches with exponential backoff and full jitter. Each source has
+    a high-water mark: the publication time of the newest article ingested
+    from it (plus the ids seen at exactly that time) and the last ETag.
+    Only articles above the mark are ingested, and the mark only advances
+    after ingestion succeeds. Marks are persisted so a restart resumes where
+    the previous process stopped.
+    """
+
+    def __init__(self, ingest, sources, interval=3600, workers=4, max_retries=3, retry_backoff=2.0,
+                 jitter=0.1, state_file=None, after_round=None):
+        """
+        Initialize the scheduler
+
+        Args:
+            ingest (callable): Takes a list of new articles (e.g. NewsAnalyzer.batch_process_news)
+            sources (list): NewsSource instances with unique names
+            interval (float): Seconds between rounds
+            workers (int): Sources fetched concurrently
+            max_retries (int): Retries per source per round after the first attempt
+            retry_backoff (float): Base delay in seconds; retry n waits up to backoff * 2^n
+            jitter (float): Fraction of the interval added at random to each wait
+            state_file (str): JSON file for watermarks (None keeps them in memory only)
+            after_round (callable): Called with the round's summaries after every scheduled round
+        """
+        self.ingest = ingest
+        self.sources = list(sources)
+        self.interval = interval
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.jitter = jitter
+        self.state_file = state_file
+        self.after_round = after_round
+
+        # Source name -> {'published_at', 'ids', 'etag'}
+        self.watermarks = {}
+        # Source name -> counters and last outcome
+        self.source_stats = {source.name: {'rounds': 0, 'fetched': 0, 'ingested': 0, 'errors': 0,
+                                           'last_error': None, 'last_success': None}
+                             for source in self.sources}
+
+        # Guards watermarks and their file; held only for reads and updates,
+        # never while fetching or ingesting
+        self._lock = threading.Lock()
+        # Serializes overlapping polls of one source (e.g. a manual round
+        # during a scheduled one) so each fetch starts from the latest mark
+        self._source_locks = {source.name: threading.Lock() for source in self.sources}
+        self._stop = threading.Event()
+        self._thread = None
+        self._load_state()
+
+    def _load_state(self):
+        """Load persisted watermarks"""
+        if self.state_file and os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f:
+                    self.watermarks = json.load(f)
+            except Exception as e:
+                print(f"Error loading fetch watermarks: {e}")
+
+    def _save_state(self):
+        """Atomically persist watermarks"""
+        if self.state_file:
+            try:
+                write_atomically(self.state_file, lambda f: f.write(json.dumps(self.watermarks).encode('utf-8')))
+            except Exception as e:
+                print(f"Error saving fetch watermarks: {e}")
+
+    def _watermark(self, name):
+        """Copy of a source's watermark with defaults filled in"""
+        mark = self.watermarks.get(name, {})
+        return {'published_at': mark.get('published_at', 0.0), 'ids': list(mark.get('ids', [])),
+                'etag': mark.get('etag')}
+
+    def watermark(self, name):
+        """Current watermark of a source"""
+        with self._lock:
+            return self._watermark(name)
+
+    def _fetch_with_retry(self, source):
+        """Fetch a source, retrying with jittered exponential backoff"""
+        watermark = self.watermark(source.name)
+        for attempt in range(self.max_retries + 1):
+            try:
+                return source.fetch(watermark)
+            except Exception as e:
+                if attempt == self.max_retries or self._stop.is_set():
+                    raise
+                delay = random.uniform(0, self.retry_backoff * 2 ** attempt)
+                print(f"Fetch from {source.name} failed ({e}); retrying in {delay:.1f}s")
+                self._stop.wait(delay)
+
+    def _new_articles(self, articles, watermark):
+        """
+        Articles above a watermark, deduplicated by id
+
+        Undated articles are always passed on (the store upserts by id).
+        """
+        seen_ids = set(watermark['ids'])
+        mark = watermark['published_at']
+        new, ids = [], set()
+        for article in articles:
+            timestamp = article_timestamp(article)
+            article_id = article.get('id')
+            if timestamp and (timestamp < mark or (timestamp == mark and article_id in seen_ids)):
+                continue
+            if article_id is not None:
+                if article_id in ids:
+                    continue
+                ids.add(article_id)
+            new.append(article)
+        return new
+
+    def _advance(self, name, articles, etag):
+        """Move a source's watermark past the ingested articles"""
+        mark = self.watermarks.setdefault(name, {'published_at': 0.0, 'ids': [], 'etag': None})
+        for article in articles:
+            timestamp = article_timestamp(article)
+            if timestamp > mark['published_at']:
+                mark['published_at'] = timestamp
+                mark['ids'] = []
+            if timestamp and timestamp == mark['published_at'] and article.get('id') is not None:
+                if article['id'] not in mark['ids']:
+                    mark['ids'].append(article['id'])
+        if etag is not None:
+            mark['etag'] = etag
+
+    def _poll_source(self, source):
+        """Fetch, filter and ingest one source; returns its round summary"""
+        with self._source_locks[source.name]:
+            return self._poll_source_locked(source)
+
+    def _poll_source_locked(self, source):
+        """_poll_source body, run under the source's lock"""
+        stats = self.source_stats[source.name]
+        stats['rounds'] += 1
+        try:
+            result = self._fetch_with_retry(source)
+            # Other sources fetch, ingest and report status while this one ingests
+            articles = self._new_articles(result.articles, self.watermark(source.name))
+            if articles:
+                self.ingest(articles)
+            with self._lock:
+                self._advance(source.name, articles, result.etag)
+                self._save_state()
+        except Exception as e:
+            stats['errors'] += 1
+            stats['last_error'] = str(e)
+            print(f"Error fetching news from {source.name}: {e}")
+            return {'source': source.name, 'error': str(e)}
+
+        stats['fetched'] += len(result.articles)
+        stats['ingested'] += len(articles)
+        stats['last_success'] = time.time()
+        return {'source': source.name, 'fetched': len(result.articles), 'ingested': len(articles)}
+
+    def run_once(self):
+        """
+        Fetch every source concurrently and ingest new articles
+
+        Returns:
+            list: Per-source summaries ('fetched' and 'ingested' counts, or 'error')
+        """
+        if not self.sources:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(self.sources)))) as pool:
+            return list(pool.map(self._poll_source, self.sources))
+
+    def _run(self):
+        """Scheduler thread: run rounds until stopped"""
+        while not self._stop.is_set():
+            summaries = self.run_once()
+            ingested = sum(summary.get('ingested', 0) for summary in summaries)
+            print(f"Scheduled news fetch: ingested {ingested} new articles from {len(summaries)} sources")
+            if self.after_round is not None:
+                try:
+                    self.after_round(summaries)
+                except Exception as e:
+                    print(f"Error after scheduled news fetch: {e}")
+            self._stop.wait(self.interval + random.uniform(0, self.jitter * self.interval))
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="news-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the scheduler thread after its current round"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def status(self):
+        """Watermarks and counters per source"""
+        with self._lock:
+            return {
+                name: dict(stats, watermark=self.watermarks.get(name, {}).get('published_at'))
+                for name, stats in self.source_stats.items()
+            }
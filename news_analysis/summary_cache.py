@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from vector_log import write_atomically
+
+# Article fields that affect a generated summary; anything else (vectors,
+# ingest metadata) is left out of the cache key
+SUMMARY_FIELDS = ('title', 'content', 'summary', 'category', 'keywords', 'tags', 'sentiment',
+                  'extractive_summary', 'themes')
+
+def summary_key(articles, options, namespace=''):
+    """
+    Content-addressed cache key for a summary request
+
+    The key is a SHA-256 over the summary-relevant fields of each article (in
+    order) and the summarization options, so the same articles under any ids,
+    or fetched again from the store, map to the same entry.
+
+    Args:
+        articles (list): Articles being summarized
+        options (dict): Summarization options (max_length, focus_areas, style, ...)
+        namespace (str): Distinguishes otherwise identical requests (e.g. LLM vs fallback)
+
+    Returns:
+        str: Hex digest
+    """
+    payload = {
+        'namespace': namespace,
+        'articles': [{field: article.get(field) for field in SUMMARY_FIELDS} for article in articles],
+        'options': options
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+class SummaryCache:
+    """
+    LRU + TTL cache of summary results with an optional on-disk tier
+
+    The memory tier keeps at most max_entries results in least-recently-used
+    order. With a cache directory, every result is also written there as one
+    JSON file per key, so entries survive restarts and memory evictions;
+    a disk hit is promoted back into memory. Entries older than ttl seconds
+    are treated as misses and removed from both tiers. The disk tier keeps
+    at most max_disk_entries files, dropping the oldest writes first, and
+    expired files are swept when the cache opens.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600, cache_dir=None, max_disk_entries=10000):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries (int): Results kept in memory
+            ttl (float): Seconds a result stays valid (None never expires)
+            cache_dir (str): Directory for the disk tier (None keeps results in memory only)
+            max_disk_entries (int): Result files kept in cache_dir
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+
+        # Key -> (stored at, result)
+        self._entries = OrderedDict()
+        # Key -> write time of every file in the disk tier, oldest first
+        self._disk_keys = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Cache counters: hits (memory or disk), disk_hits, misses, evictions,
+        # disk_evictions, expirations
+        self.stats = Counter()
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._sweep_disk()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        """(stored at, result) from the disk tier, or None"""
+        try:
+            with open(self._disk_path(key), 'r') as f:
+                entry = json.load(f)
+            return entry['stored_at'], entry['result']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading cached summary {key}: {e}")
+            return None
+
+    def _remove_disk(self, key):
+        self._disk_keys.pop(key, None)
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
+
+    def _sweep_disk(self, now=None):
+        """Index the disk tier by file write time, deleting expired files and any beyond the cap"""
+        now = time.time() if now is None else now
+        written = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            try:
+                written.append((os.path.getmtime(os.path.join(self.cache_dir, name)), name[:-len('.json')]))
+            except OSError:
+                continue
+        for mtime, key in sorted(written):
+            if self._expired(mtime, now):
+                self._remove_disk(key)
+                self.stats['expirations'] += 1
+            else:
+                self._disk_keys[key] = mtime
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete the oldest result files beyond max_disk_entries"""
+        while len(self._disk_keys) > self.max_disk_entries:
+            key = next(iter(self._disk_keys))
+            self._remove_disk(key)
+            self.stats['disk_evictions'] += 1
+
+    def _insert(self, key, stored_at, result):
+        """Add an entry to the memory tier, evicting the least recently used"""
+        self._entries[key] = (stored_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def get(self, key, now=None):
+        """
+        Look up a cached result
+
+        Args:
+            key (str): Key from summary_key
+            now (float): Current POSIX time (defaults to time.time())
+
+        Returns:
+            dict: A copy of the cached result, or None on a miss
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            elif self.cache_dir:
+                entry = self._read_disk(key)
+                if entry is not None and not self._expired(entry[0], now):
+                    self.stats['disk_hits'] += 1
+                    self._insert(key, *entry)
+
+            if entry is not None and self._expired(entry[0], now):
+                self._entries.pop(key, None)
+                if self.cache_dir:
+                    self._remove_disk(key)
+                self.stats['expirations'] += 1
+                entry = None
+
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            return dict(entry[1])
+
+    def put(self, key, result, now=None):
+        """
+        Store a result
+
+        Args:
+            key (str): Key from summary_key
+            result (dict): JSON-serializable summary result
+            now (float): Current POSIX time (defaults to time.time())
+        """
+        now = time.time() if now is None else now
+        result = dict(result)
+        with self._lock:
+            self._insert(key, now, result)
+        if self.cache_dir:
+            try:
+                payload = json.dumps({'stored_at': now, 'result': result}).encode('utf-8')
+                write_atomically(self._disk_path(key), lambda f: f.write(payload))
+            except Exception as e:
+                print(f"Error writing cached summary {key}: {e}")
+                return
+            with self._lock:
+                self._disk_keys[key] = now
+                self._disk_keys.move_to_end(key)
+                self._evict_disk()
+
+    def clear(self):
+        """Drop every cached result from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            self._disk_keys.clear()
+            if self.cache_dir:
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith('.json'):
+                        self._remove_disk(name[:-len('.json')])
+
+    def metrics(self):
+        """Hit/miss counters, hit rate and size"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'entries': len(self._entries),
+                'disk_entries': len(self._disk_keys),
+                'hits': self.stats['hits'],
+                'disk_hits': self.stats['disk_hits'],
+                'misses': self.stats['misses'],
+                'evictions': self.stats['evictions'],
+                'disk_evictions': self.stats['disk_evictions'],
+                'expirations': self.stats['expirations'],
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0
+            }
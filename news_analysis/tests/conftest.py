@@ -0,0 +1,5 @@
+import os
+import sys
+
+# news_analysis modules import each other by bare name, as in the service
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,65 @@
+import io
+import json
+
+from bulk_ingest import ingest_ndjson, read_ndjson
+
+
+class FakeAnalyzer:
+    """batch_process_news stand-in that records batch sizes and drops some ids"""
+
+    def __init__(self, drop_ids=(), fail_ids=()):
+        self.drop_ids = set(drop_ids)
+        self.fail_ids = set(fail_ids)
+        self.batches = []
+
+    def batch_process_news(self, articles):
+        self.batches.append(len(articles))
+        if any(a.get('id') in self.fail_ids for a in articles):
+            raise RuntimeError('store failed')
+        return [a for a in articles if a.get('id') not in self.drop_ids]
+
+
+def ndjson(*lines):
+    return io.BytesIO(b''.join(
+        (line if isinstance(line, bytes) else json.dumps(line).encode('utf-8')) + b'\n' for line in lines
+    ))
+
+
+def test_read_ndjson_reports_bad_lines_and_skips_blank_ones():
+    stream = ndjson({'id': 'a'}, b'', b'{not json', b'[1, 2]', b'x' * 40, {'id': 'b'})
+    rows = list(read_ndjson(stream, max_line_bytes=32))
+    assert [(number, article) for number, article, _ in rows] == [
+        (1, {'id': 'a'}), (3, None), (4, None), (5, None), (6, {'id': 'b'})
+    ]
+    errors = [error for _, _, error in rows]
+    assert errors[1].startswith('Invalid JSON')
+    assert errors[2] == 'Expected a JSON object'
+    assert errors[3] == 'Line exceeds 32 bytes'
+
+
+def test_unterminated_last_line_is_read():
+    assert list(read_ndjson(io.BytesIO(b'{"id": "a"}\n{"id": "b"}'))) == [
+        (1, {'id': 'a'}, None), (2, {'id': 'b'}, None)
+    ]
+
+
+def test_ingest_streams_progress_per_micro_batch():
+    analyzer = FakeAnalyzer(drop_ids={'a3'})
+    stream = ndjson(*[{'id': f"a{i}"} for i in range(5)], b'oops', {'id': 'a5'})
+    records = list(ingest_ndjson(analyzer, stream, batch_size=2))
+
+    assert analyzer.batches == [2, 2, 2]
+    assert [r['type'] for r in records] == ['progress', 'progress', 'error', 'progress', 'completed']
+    assert records[2]['line'] == 6
+    assert records[-1] == {
+        'type': 'completed', 'lines': 7, 'processed': 5, 'duplicates_skipped': 1, 'errors': 1, 'batches': 3
+    }
+
+
+def test_failed_batch_is_reported_and_ingest_continues():
+    analyzer = FakeAnalyzer(fail_ids={'a1'})
+    records = list(ingest_ndjson(analyzer, ndjson(*[{'id': f"a{i}"} for i in range(4)]), batch_size=2))
+    assert [r['type'] for r in records] == ['error', 'progress', 'completed']
+    assert records[0]['message'] == 'Batch failed: store failed'
+    assert records[-1]['processed'] == 2
+    assert records[-1]['errors'] == 2
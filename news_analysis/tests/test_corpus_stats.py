@@ -0,0 +1,49 @@
+import math
+
+import pytest
+
+from corpus_stats import CorpusStats
+
+
+CATEGORIES = {'income': ['salary', 'wage'], 'debt': ['loan', 'mortgage']}
+
+
+def test_idf_follows_incremental_document_frequencies():
+    stats = CorpusStats(CATEGORIES)
+    assert stats.idf('income') == pytest.approx(math.log(2 / 1) + 1)
+
+    stats.add_counts(4, {'income': 1, 'debt': 0}, timestamp=0)
+    stats.add_counts(6, {'income': 2, 'debt': 5}, timestamp=0)
+    assert stats.document_count == 10
+    assert stats.idf('income') == pytest.approx(math.log(11 / 4) + 1)
+    assert stats.idf('debt') == pytest.approx(math.log(11 / 6) + 1)
+    assert stats.idf('income') > stats.idf('debt')
+
+
+def test_counts_decay_by_half_life():
+    stats = CorpusStats(CATEGORIES, half_life=100)
+    stats.add_counts(8, {'income': 4}, timestamp=1000)
+    stats.advance_to(1200)
+    assert stats.document_count == pytest.approx(2)
+    assert stats.category_doc_freq['income'] == pytest.approx(1)
+
+    # Older timestamps never rewind the clock
+    stats.add_counts(2, {'income': 2}, timestamp=1100)
+    assert stats.updated_at == 1200
+    assert stats.document_count == pytest.approx(4)
+
+
+def test_statistics_survive_save_and_load(tmp_path):
+    path = str(tmp_path / 'stats.json')
+    stats = CorpusStats(CATEGORIES, half_life=60)
+    stats.add_counts(5, {'income': 2, 'debt': 3}, timestamp=10)
+    stats.save(path)
+
+    # Categories that are no longer configured are dropped on load
+    restored = CorpusStats({'income': ['salary']}, half_life=60)
+    restored.load(path)
+    assert restored.document_count == 5
+    assert dict(restored.category_doc_freq) == {'income': 2}
+    assert restored.updated_at == 10
+    assert restored.idf('income') == stats.idf('income')
+
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+from ingest_queue import IngestQueue, QueueFull, BatchTooLarge
+
+
+class FakeAnalyzer:
+    """batch_process_news stand-in that records batches and can hold workers back"""
+
+    def __init__(self, drop_ids=(), fail=False):
+        self.drop_ids = set(drop_ids)
+        self.fail = fail
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def batch_process_news(self, articles):
+        self.release.wait(5)
+        self.batches.append([a.get('id') for a in articles])
+        if self.fail:
+            raise RuntimeError('analyzer down')
+        return [a for a in articles if a.get('id') not in self.drop_ids]
+
+
+def articles(prefix, count):
+    return [{'id': f"{prefix}{i}", 'title': f"{prefix} {i}"} for i in range(count)]
+
+
+def wait_finished(queue, job_id):
+    for _ in range(500):
+        status = queue.status(job_id)
+        if status['status'] in ('completed', 'failed'):
+            return status
+        threading.Event().wait(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_accepted_job_is_processed_in_batches():
+    analyzer = FakeAnalyzer()
+    queue = IngestQueue(analyzer, max_pending=100, workers=1, max_batch=4)
+    job_id = queue.submit(articles('a', 10))
+
+    status = wait_finished(queue, job_id)
+    queue.close()
+    assert status['status'] == 'completed'
+    assert (status['total'], status['processed'], status['failed']) == (10, 10, 0)
+    assert [len(batch) for batch in analyzer.batches] == [4, 4, 2]
+    assert queue.pending == 0
+
+
+def test_full_queue_rejects_until_drained():
+    analyzer = FakeAnalyzer()
+    analyzer.release.clear()
+    queue = IngestQueue(analyzer, max_pending=5, workers=1, max_batch=2)
+
+    first = queue.submit(articles('a', 2))
+    second = queue.submit(articles('b', 3))
+    with pytest.raises(QueueFull) as excinfo:
+        queue.submit(articles('c', 3))
+    assert not isinstance(excinfo.value, BatchTooLarge)
+
+    analyzer.release.set()
+    wait_finished(queue, first)
+    wait_finished(queue, second)
+    third = queue.submit(articles('c', 3))
+    assert wait_finished(queue, third)['processed'] == 3
+    queue.close()
+
+
+def test_batch_larger_than_capacity_is_too_large():
+    queue = IngestQueue(FakeAnalyzer(), max_pending=5, workers=1)
+    with pytest.raises(BatchTooLarge):
+        queue.submit(articles('a', 6))
+    assert queue.pending == 0
+    queue.close()
+
+
+def test_duplicates_and_failures_are_counted_per_job():
+    queue = IngestQueue(FakeAnalyzer(drop_ids={'a1', 'a3'}), max_pending=100, workers=1, max_batch=10)
+    status = wait_finished(queue, queue.submit(articles('a', 5)))
+    queue.close()
+    assert (status['processed'], status['duplicates_skipped']) == (3, 2)
+
+    queue = IngestQueue(FakeAnalyzer(fail=True), max_pending=100, workers=1)
+    status = wait_finished(queue, queue.submit(articles('b', 3)))
+    queue.close()
+    assert status['status'] == 'failed'
+    assert (status['processed'], status['failed'], status['error']) == (0, 3, 'analyzer down')
+
+
+def test_closed_queue_rejects_submissions():
+    queue = IngestQueue(FakeAnalyzer(), max_pending=10, workers=1)
+    queue.close()
+    with pytest.raises(QueueFull):
+        queue.submit(articles('a', 1))
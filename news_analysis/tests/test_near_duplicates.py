@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from near_duplicates import MinHasher, NearDuplicateIndex, optimal_bands
+
+STORY = ("the federal reserve cut interest rates by a quarter point on wednesday citing slowing "
+         "growth and easing inflation while signalling that further cuts may follow this year").split()
+
+
+def edited(tokens, changes, seed=0):
+    """Copy of tokens with a few words replaced"""
+    rng = np.random.default_rng(seed)
+    tokens = list(tokens)
+    for i in rng.choice(len(tokens), changes, replace=False):
+        tokens[i] = f"edit{i}"
+    return tokens
+
+
+def exact_jaccard(a, b, size=3):
+    shingles = lambda t: {tuple(t[i:i + size]) for i in range(len(t) - size + 1)}
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def test_signature_similarity_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    other = edited(STORY, 3)
+    estimate = np.mean(hasher.signature(STORY) == hasher.signature(other))
+    assert estimate == pytest.approx(exact_jaccard(STORY, other), abs=0.1)
+
+
+def test_bands_fit_the_signature():
+    bands, rows = optimal_bands(0.8, 128)
+    assert bands * rows <= 128
+
+
+def test_near_duplicates_are_found_and_distinct_stories_are_not():
+    index = NearDuplicateIndex(0.6)
+    assert index.check_and_add('original', index.signature(STORY)) is None
+    match = index.check_and_add('copy', index.signature(edited(STORY, 1)))
+    assert match is not None and match[0] == 'original'
+
+    unrelated = "stocks rallied as technology shares posted record quarterly earnings".split()
+    assert index.check_and_add('other', index.signature(unrelated)) is None
+    assert len(index) == 2
+
+
+def test_dead_keys_are_not_reported():
+    index = NearDuplicateIndex(0.6)
+    index.add('gone', index.signature(STORY))
+    assert index.query(index.signature(STORY), is_live=lambda key: False) is None
+    assert 'gone' not in index
+
+
+def test_persisted_index_survives_reload_and_removals(tmp_path):
+    path = str(tmp_path / 'news.minhash')
+    index = NearDuplicateIndex(0.6, path=path)
+    index.add('a', index.signature(STORY))
+    index.add('b', index.signature("an entirely different story about housing".split()))
+    index.remove_many(['b', 'missing'])
+    index.close()
+
+    reloaded = NearDuplicateIndex(0.6, path=path)
+    assert len(reloaded) == 1
+    assert reloaded.query(reloaded.signature(STORY))[0] == 'a'
+    reloaded.close()
+
+    # Different settings invalidate the persisted signatures
+    changed = NearDuplicateIndex(0.6, num_perm=64, path=path)
+    assert len(changed) == 0
+    changed.close()
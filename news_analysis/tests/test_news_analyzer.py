@@ -0,0 +1,236 @@
+import re
+
+import pytest
+
+from news_module import NewsAnalyzer
+from summary_cache import SummaryCache
+from vector_db_connector import VectorDB
+
+
+TOPICS = [
+    'Stocks rally as strong earnings lift the market and investors buy growth shares',
+    'Mortgage rates climb and the interest rate on credit card debt rises again',
+    'Households save more and invest in a retirement portfolio to build a nest egg',
+    'Recession risk grows as volatile markets crash and uncertainty hits the economy',
+]
+
+
+def make_articles(count, prefix='n'):
+    return [
+        {'id': f"{prefix}{i}", 'title': f"Story {i}", 'content': f"{TOPICS[i % len(TOPICS)]} in week {i}"}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def make_analyzer(tmp_path):
+    analyzers = []
+
+    def make(name='news.json', **options):
+        analyzer = NewsAnalyzer(VectorDB(str(tmp_path / name), compact_interval=0), **options)
+        analyzers.append(analyzer)
+        return analyzer
+
+    yield make
+    for analyzer in analyzers:
+        analyzer.close()
+        analyzer.vector_db.close()
+
+
+def test_queue_sized_batches_use_the_process_pool(make_analyzer):
+    analyzer = make_analyzer(ingest_workers=2)
+    pool = analyzer._get_ingest_pool()
+    chunk_sizes = []
+    original_map = pool.map
+
+    def recording_map(fn, chunks):
+        chunk_sizes.extend(len(chunk) for chunk in chunks)
+        return original_map(fn, chunks)
+
+    pool.map = recording_map
+    assert len(analyzer.batch_process_news(make_articles(256))) == 256
+    assert chunk_sizes == [128, 128]
+
+    # Small batches stay in this process
+    analyzer.batch_process_news(make_articles(8, prefix='s'))
+    assert chunk_sizes == [128, 128]
+
+
+def test_near_duplicates_are_linked_by_default(make_analyzer):
+    analyzer = make_analyzer(dedupe_threshold=0.8)
+    original, copy = make_articles(1, 'a')[0], dict(make_articles(1, 'b')[0])
+    processed = analyzer.batch_process_news([original, copy])
+    assert [a.get('duplicate_of') for a in processed] == [None, 'a0']
+    assert analyzer.dedupe_stats()['mode'] == 'link'
+
+
+def test_failed_store_releases_reserved_ids(make_analyzer):
+    analyzer = make_analyzer(dedupe_threshold=0.8)
+
+    def fail(articles):
+        raise OSError('disk full')
+
+    analyzer.vector_db.store_vectors = fail
+    with pytest.raises(OSError):
+        analyzer.batch_process_news(make_articles(3))
+    with pytest.raises(OSError):
+        analyzer.process_news_article(make_articles(1, 'single')[0])
+    assert analyzer._pending_ids == set()
+
+
+def test_analyzer_statistics_stay_bounded_and_persist(make_analyzer):
+    analyzer = make_analyzer()
+    analyzer.batch_process_news(make_articles(40))
+    stats = analyzer.corpus_stats
+    assert stats.document_count == 40
+    assert set(stats.category_doc_freq) <= set(analyzer.keyword_categories)
+
+    reopened = make_analyzer(name='other.json')
+    reopened.corpus_stats.load(analyzer.corpus_stats_file)
+    assert reopened.corpus_stats.to_dict() == stats.to_dict()
+
+
+def test_batch_features_match_sequential_processing(make_analyzer):
+    articles = make_articles(12) + [
+        {'id': 'empty', 'title': '', 'content': ''},
+        {'id': 'phrase', 'title': 'Nest egg', 'content': 'A nest egg beats credit card debt at any interest rate'},
+    ]
+    sequential = make_analyzer('sequential.json')
+    batched = make_analyzer('batched.json')
+    expected = [sequential.process_news_article(article) for article in articles]
+    processed = batched.batch_process_news(articles)
+
+    for want, got in zip(expected, processed):
+        assert got['vector'] == pytest.approx(want['vector'])
+        assert got['sentiment'] == pytest.approx(want['sentiment'])
+        assert got['keywords'] == want['keywords']
+    assert batched.corpus_stats.document_count == sequential.corpus_stats.document_count
+    assert batched.corpus_stats.category_doc_freq == sequential.corpus_stats.category_doc_freq
+
+
+def test_process_pool_matches_in_process_ingest(make_analyzer):
+    articles = make_articles(30)
+    local = make_analyzer('local.json', dedupe_threshold=0.8, materialize_summaries=True)
+    pooled = make_analyzer('pooled.json', ingest_workers=2, dedupe_threshold=0.8, materialize_summaries=True)
+    expected = local.batch_process_news(articles, parallel=False)
+    processed = pooled.batch_process_news(articles, parallel=True)
+
+    # Results come back in submission order with identical features
+    assert [a['id'] for a in processed] == [a['id'] for a in articles]
+    for want, got in zip(expected, processed):
+        assert got['vector'] == pytest.approx(want['vector'])
+        assert got['sentiment'] == pytest.approx(want['sentiment'])
+        assert got['keywords'] == want['keywords']
+        assert got['extractive_summary'] == want['extractive_summary']
+        assert got.get('duplicate_of') == want.get('duplicate_of')
+    assert len(pooled.vector_db) == len(local.vector_db) == 30
+
+
+class FakeLLM:
+    """LLMManager stand-in that 'summarizes' a prompt as the titles it contains"""
+
+    UNAVAILABLE = 'LLM unavailable'
+
+    def __init__(self, fail_titles=()):
+        self.fail_titles = set(fail_titles)
+        self.prompts = []
+
+    def generate(self, prompt):
+        self.prompts.append(prompt)
+        titles = re.findall(r'Title: (.*)', prompt)
+        if self.fail_titles & set(titles):
+            return self.UNAVAILABLE
+        return 'gist of ' + ' + '.join(titles)
+
+    def count(self, prefix):
+        return sum(prompt.strip().startswith(prefix) for prompt in self.prompts)
+
+
+def summarizer(make_analyzer, llm, prompt_chars=None, **options):
+    analyzer = make_analyzer(**options)
+    analyzer.llm_manager = llm
+    analyzer.llm_unavailable_response = FakeLLM.UNAVAILABLE
+    if prompt_chars is not None:
+        analyzer.SUMMARY_PROMPT_CHARS = prompt_chars
+    return analyzer
+
+
+def test_map_reduce_summarizes_articles_then_synthesizes(make_analyzer):
+    llm = FakeLLM()
+    analyzer = summarizer(make_analyzer, llm)
+    articles = [{'title': title, 'content': 'Rates rose.'} for title in ('A', 'B', 'C')]
+    result = analyzer.generate_article_summary(articles, {'strategy': 'map_reduce'})
+
+    assert llm.count('Summarize the following') == 3
+    assert llm.count('Synthesize a summary of the following 3') == 1
+    assert 'Title: B\nContent: gist of B' in llm.prompts[-1]
+    assert result['summary'] == 'gist of A + B + C'
+
+    # Small collections default to a single prompt
+    llm.prompts.clear()
+    analyzer.generate_article_summary(articles)
+    assert len(llm.prompts) == 1
+
+
+def test_long_articles_are_split_at_paragraphs(make_analyzer):
+    analyzer = summarizer(make_analyzer, FakeLLM(), prompt_chars=100)
+    content = '\n'.join(['p' * 60, 'q' * 30, 'r' * 250])
+    units = analyzer._summary_units([{'title': 'Long', 'content': content}, {'title': 'Short', 'content': 'x'}])
+
+    assert [unit['title'] for unit in units] == [f"Long (part {i} of 4)" for i in range(1, 5)] + ['Short']
+    assert [unit['content'] for unit in units[:4]] == ['p' * 60 + '\n' + 'q' * 30, 'r' * 100, 'r' * 100, 'r' * 50]
+    assert all(len(unit['content']) <= 100 for unit in units)
+
+
+def test_oversized_partials_are_reduced_in_groups(make_analyzer):
+    llm = FakeLLM()
+    analyzer = summarizer(make_analyzer, llm, prompt_chars=100)
+    articles = [{'title': f"Article {i}", 'content': 'Markets moved.'} for i in range(10)]
+    result = analyzer.generate_article_summary(articles)
+
+    # Ten map calls, then partials reduced in prompt-sized groups until they fit
+    assert all(prompt.strip().startswith('Summarize the following') for prompt in llm.prompts[:10])
+    assert llm.count('Synthesize a summary of the following 3') == 3
+    assert 'Title: Article' not in llm.prompts[-1]
+    assert result['summary'].startswith('gist of Summary of')
+
+
+def test_failed_partials_are_dropped_and_failures_not_cached(make_analyzer):
+    llm = FakeLLM(fail_titles={'B'})
+    analyzer = summarizer(make_analyzer, llm, summary_cache=SummaryCache(ttl=None))
+    articles = [{'title': title, 'content': 'Rates rose.'} for title in ('A', 'B')]
+    options = {'strategy': 'map_reduce'}
+    assert analyzer.generate_article_summary(articles, options)['summary'] == 'gist of A'
+
+    llm.fail_titles = {'A', 'B'}
+    assert analyzer.generate_article_summary(articles[1:], options)['summary'] == FakeLLM.UNAVAILABLE
+
+    # Cached map results are reused under new options; the failed one is retried
+    llm.fail_titles = set()
+    llm.prompts.clear()
+    result = analyzer.generate_article_summary(articles, {'strategy': 'map_reduce', 'max_length': 100})
+    assert result['summary'] == 'gist of A + B'
+    assert llm.count('Summarize the following') == 1
+    assert 'Title: B' in llm.prompts[0]
+
+
+def test_ingest_materializes_extractive_summaries_and_themes(make_analyzer):
+    analyzer = make_analyzer(materialize_summaries=True)
+    article = {
+        'id': 'fed', 'title': 'Fed decision', 'category': 'economy',
+        'content': 'Officials met on Tuesday. Mortgage debt and the interest rate on each loan rose. '
+                   'The weather was mild. Savers chose to invest and save more.'
+    }
+    processed = analyzer.process_news_article(article)
+    assert processed['extractive_summary'] == (
+        'Mortgage debt and the interest rate on each loan rose. Savers chose to invest and save more.'
+    )
+    assert processed['themes'] == ['Economic Developments', 'Debt and Credit', 'Saving and Investing']
+
+    # Without an LLM, summaries of stored articles reuse the materialized fields
+    analyzer.llm_manager = None
+    stored, missing = analyzer.get_stored_articles(['fed', 'gone'])
+    assert missing == ['gone']
+    result = analyzer.generate_article_summary(stored)
+    assert result['summary'] == processed['extractive_summary']
+    assert result['themes'] == processed['themes']
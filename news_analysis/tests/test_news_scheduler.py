@@ -0,0 +1,100 @@
+from collections import namedtuple
+
+from news_scheduler import NewsScheduler
+
+
+# Same shape as news_sources.FetchResult, which needs requests to import
+FetchResult = namedtuple('FetchResult', ['articles', 'etag'])
+
+
+class FakeSource:
+    """News source serving a fixed article list, optionally failing first"""
+
+    def __init__(self, name, articles, failures=0):
+        self.name = name
+        self.articles = articles
+        self.failures = failures
+        self.watermarks = []
+
+    def fetch(self, watermark):
+        self.watermarks.append(watermark)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('feed unavailable')
+        return FetchResult(list(self.articles), etag=f"etag-{len(self.articles)}")
+
+
+def article(article_id, day):
+    return {'id': article_id, 'title': article_id, 'published_at': f"2025-03-{day:02d}T00:00:00+00:00"}
+
+
+def discard(articles):
+    pass
+
+
+def make_scheduler(sources, ingest, **options):
+    return NewsScheduler(ingest, sources, retry_backoff=0, **options)
+
+
+def test_only_articles_above_the_watermark_are_ingested():
+    source = FakeSource('wire', [article('a', 1), article('b', 2)])
+    ingested = []
+    scheduler = make_scheduler([source], ingested.extend)
+    assert scheduler.run_once() == [{'source': 'wire', 'fetched': 2, 'ingested': 2}]
+
+    # Same day as the mark but a new id, an older article and a repeat within the feed
+    source.articles += [article('c', 2), article('old', 1), article('c', 2)]
+    assert scheduler.run_once() == [{'source': 'wire', 'fetched': 5, 'ingested': 1}]
+    assert [a['id'] for a in ingested] == ['a', 'b', 'c']
+    mark = scheduler.watermark('wire')
+    assert sorted(mark['ids']) == ['b', 'c']
+    assert mark['etag'] == 'etag-5'
+    assert source.watermarks[-1]['etag'] == 'etag-2'
+
+
+def test_watermark_advances_only_after_ingest_succeeds():
+    source = FakeSource('wire', [article('a', 1)])
+    calls = []
+
+    def flaky_ingest(articles):
+        calls.append([a['id'] for a in articles])
+        if len(calls) == 1:
+            raise RuntimeError('store down')
+
+    scheduler = make_scheduler([source], flaky_ingest)
+    assert scheduler.run_once() == [{'source': 'wire', 'error': 'store down'}]
+    assert scheduler.watermark('wire')['published_at'] == 0.0
+    assert scheduler.run_once() == [{'source': 'wire', 'fetched': 1, 'ingested': 1}]
+    assert calls == [['a'], ['a']]
+    assert scheduler.status()['wire']['errors'] == 1
+
+
+def test_failed_fetches_are_retried():
+    source = FakeSource('wire', [article('a', 1)], failures=2)
+    ingested = []
+    assert make_scheduler([source], ingested.extend, max_retries=2).run_once()[0]['ingested'] == 1
+
+    source = FakeSource('down', [article('a', 1)], failures=5)
+    summary = make_scheduler([source], discard, max_retries=1).run_once()
+    assert summary == [{'source': 'down', 'error': 'feed unavailable'}]
+    assert len(source.watermarks) == 2
+
+
+def test_one_failing_source_does_not_block_the_others():
+    sources = [FakeSource('down', [article('x', 1)], failures=5), FakeSource('wire', [article('a', 1)])]
+    ingested = []
+    summaries = make_scheduler(sources, ingested.extend, max_retries=0).run_once()
+    assert [s.get('ingested') for s in summaries] == [None, 1]
+    assert [a['id'] for a in ingested] == ['a']
+
+
+def test_watermarks_survive_a_restart(tmp_path):
+    state_file = str(tmp_path / 'watermarks.json')
+    source = FakeSource('wire', [article('a', 1), article('b', 2)])
+    make_scheduler([source], discard, state_file=state_file).run_once()
+
+    ingested = []
+    restarted = make_scheduler([source], ingested.extend, state_file=state_file)
+    assert restarted.run_once() == [{'source': 'wire', 'fetched': 2, 'ingested': 0}]
+    assert ingested == []
+    assert restarted.watermark('wire')['ids'] == ['b']
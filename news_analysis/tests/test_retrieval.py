@@ -0,0 +1,107 @@
+import numpy as np
+
+from ann_index import IVFFlatIndex
+from vector_db_connector import VectorDB, fuse_ranks, top_k
+
+
+def open_db(tmp_path, **options):
+    return VectorDB(str(tmp_path / 'news.json'), compact_interval=0, **options)
+
+
+def test_top_k_breaks_ties_by_index():
+    rows, scores = top_k(np.array([0.5, 0.9, 0.5, 0.9, 0.1]), 3)
+    assert rows.tolist() == [1, 3, 0]
+    assert scores.tolist() == [0.9, 0.9, 0.5]
+
+
+def test_rank_fusion_rewards_agreement_between_rankings():
+    similarity = np.array([0.9, 0.8, 0.1])
+    match_counts = np.array([1.0, 2.0, 2.0])
+    timestamps = np.zeros(3)
+    # Candidate 1 is second by similarity and first by keywords
+    assert fuse_ranks(similarity, match_counts, timestamps, 3).tolist() == [1, 0, 2]
+    # Without keyword weight the vector ranking decides alone
+    assert fuse_ranks(similarity, match_counts, timestamps, 3, keyword_weight=0).tolist() == [0, 1, 2]
+
+
+def test_keyword_prefilter_matches_words_and_phrases(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vectors([
+        {'id': 'fed', 'vector': [1.0, 0.0], 'title': 'Fed raises interest-rate target', 'keywords': ['monetary policy']},
+        {'id': 'cpi', 'vector': [0.0, 1.0], 'title': 'Prices', 'content': 'Inflation pressure eases'},
+        {'id': 'btc', 'vector': [1.0, 1.0], 'title': 'Crypto', 'summary': 'Rate of corporate adoption', 'tags': ['bitcoin']},
+    ])
+    query = lambda *keywords, mode='any': sorted(a['id'] for a in db.query_keywords(list(keywords), 5, mode))
+    assert query('interest rate') == ['fed']
+    assert query('rate') == ['btc', 'fed']
+    assert query('inflation') == ['cpi']
+    assert query('inflationary') == []
+    assert query('Monetary Policy') == ['fed']
+    assert query('corporate rate') == []
+    assert query('bitcoin', 'prices') == ['btc', 'cpi']
+    assert query('crypto', 'bitcoin', mode='all') == ['btc']
+    assert query('bond') == []
+
+    db.delete_vector('cpi')
+    assert query('inflation') == []
+
+
+def test_keyword_index_is_built_after_load_and_tracks_mutations(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vectors([{'id': f"n{i}", 'vector': [1.0, float(i)], 'title': f"story {i}"} for i in range(50)])
+    db.compact()
+    db.close()
+
+    # Stop the build after one chunk, then mutate rows on both sides of it
+    class OneChunk:
+        calls = 0
+
+        def is_set(self):
+            self.calls += 1
+            return self.calls > 1
+
+    db = open_db(tmp_path)
+    db._closed.set()
+    db._indexer.join()
+    db._keyword_index, db._indexed_rows, db._keyword_index_complete = None, 0, False
+    db._build_keyword_index(chunk_rows=20, stop=OneChunk())
+    assert db._indexed_rows == 20
+    db.delete_vector('n3')
+    db.delete_vector('n45')
+    db.store_vector({'id': 'n7', 'vector': [1.0, 0.0], 'title': 'rewritten'})
+    db.store_vector({'id': 'new', 'vector': [1.0, 0.0], 'title': 'story new'})
+    assert len(db.query_keywords(['story'], 100)) == 48
+    assert [a['id'] for a in db.query_keywords(['rewritten'])] == ['n7']
+    assert db.query_keywords(['3']) == []
+
+
+def test_hybrid_query_supplements_with_vector_matches(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vectors([
+        {'id': 'match', 'vector': [0.0, 1.0], 'title': 'Mortgage rates climb'},
+        {'id': 'near', 'vector': [1.0, 0.1], 'title': 'Stocks rally'},
+        {'id': 'far', 'vector': [-1.0, 0.0], 'title': 'Weather'},
+    ])
+    ranked = db.query_hybrid([1.0, 0.0], ['mortgage'], top_n=2)
+    assert [a['id'] for a in ranked] == ['match', 'near']
+
+
+def test_ivf_recall_against_exact_search(tmp_path):
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(32, 16))
+    vectors = centers[rng.integers(0, 32, 3000)] + 0.3 * rng.normal(size=(3000, 16))
+    articles = [{'id': f"n{i}", 'vector': v.tolist()} for i, v in enumerate(vectors)]
+    queries = centers[rng.integers(0, 32, 20)] + 0.3 * rng.normal(size=(20, 16))
+
+    exact = open_db(tmp_path)
+    exact.store_vectors(articles)
+    approx = VectorDB(str(tmp_path / 'ivf.json'), compact_interval=0,
+                      index=IVFFlatIndex(n_lists=32, n_probe=8, min_train_rows=1000))
+    approx.store_vectors(articles)
+
+    recalls = []
+    for want, got in zip(exact.query_similar_vectors_batch(queries, 10),
+                         approx.query_similar_vectors_batch(queries, 10)):
+        recalls.append(len({a['id'] for a in want} & {a['id'] for a in got}) / 10)
+    assert approx.index.trained
+    assert np.mean(recalls) >= 0.9
@@ -0,0 +1,68 @@
+import os
+import threading
+
+from summary_cache import SummaryCache, summary_key
+
+
+def test_key_ignores_ids_and_vectors_but_not_options():
+    a = {'id': 1, 'title': 'Rates cut', 'content': 'The Fed cut rates.', 'vector': [1.0]}
+    b = dict(a, id=2, vector=[0.0])
+    assert summary_key([a], {'max_length': 100}) == summary_key([b], {'max_length': 100})
+    assert summary_key([a], {'max_length': 100}) != summary_key([a], {'max_length': 200})
+    assert summary_key([a], {}, 'llm') != summary_key([a], {}, 'fallback')
+
+
+def test_lru_evicts_least_recently_used():
+    cache = SummaryCache(max_entries=2, ttl=None)
+    cache.put('a', {'summary': 'A'})
+    cache.put('b', {'summary': 'B'})
+    assert cache.get('a') == {'summary': 'A'}
+    cache.put('c', {'summary': 'C'})
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.metrics()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = SummaryCache(ttl=10)
+    cache.put('a', {'summary': 'A'}, now=100)
+    assert cache.get('a', now=105) is not None
+    assert cache.get('a', now=111) is None
+    assert cache.metrics()['expirations'] == 1
+
+
+def test_disk_tier_survives_restart_and_is_bounded(tmp_path):
+    cache = SummaryCache(max_entries=1, ttl=None, cache_dir=str(tmp_path), max_disk_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, {'summary': key.upper()})
+    assert sorted(os.listdir(tmp_path)) == ['b.json', 'c.json']
+    assert cache.metrics()['disk_evictions'] == 1
+
+    reopened = SummaryCache(max_entries=1, ttl=None, cache_dir=str(tmp_path), max_disk_entries=2)
+    assert reopened.get('b') == {'summary': 'B'}
+    assert reopened.metrics()['disk_hits'] == 1
+
+
+def test_expired_files_are_swept_on_open(tmp_path):
+    cache = SummaryCache(ttl=60, cache_dir=str(tmp_path))
+    cache.put('old', {'summary': 'old'})
+    cache.put('new', {'summary': 'new'})
+    stale = os.path.getmtime(tmp_path / 'old.json') - 3600
+    os.utime(tmp_path / 'old.json', (stale, stale))
+
+    reopened = SummaryCache(ttl=60, cache_dir=str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == ['new.json']
+    assert reopened.metrics()['disk_entries'] == 1
+
+
+def test_concurrent_puts_of_one_key_leave_a_whole_file(tmp_path):
+    caches = [SummaryCache(ttl=None, cache_dir=str(tmp_path)) for _ in range(8)]
+    result = {'summary': 'x' * 100000}
+    threads = [threading.Thread(target=lambda c=c: [c.put('same', result) for _ in range(20)]) for c in caches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(os.listdir(tmp_path)) == ['same.json']
+    assert SummaryCache(ttl=None, cache_dir=str(tmp_path)).get('same') == result
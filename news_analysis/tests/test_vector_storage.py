@@ -0,0 +1,253 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from vector_db_connector import VectorDB, PartitionedVectorDB
+from vector_snapshot import load_snapshot, manifest_path
+
+
+def open_db(tmp_path, name='news.json', **options):
+    options.setdefault('compact_interval', 0)
+    return VectorDB(str(tmp_path / name), **options)
+
+
+def article(article_id, vector, **fields):
+    return dict(fields, id=article_id, vector=vector)
+
+
+def test_log_replay_restores_upserts_and_deletes(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vectors([article('a', [1.0, 0.0], title='A'), article('b', [0.0, 1.0], title='B')])
+    db.store_vector(article('a', [0.5, 0.5], title='A2'))
+    db.delete_vector('b')
+    db.close()
+
+    assert load_snapshot(db.base_path) is None
+    reopened = open_db(tmp_path)
+    assert reopened.ids == ['a']
+    assert reopened.get('a')['title'] == 'A2'
+    assert reopened.get('a')['vector'] == pytest.approx([0.5, 0.5])
+    assert reopened.get('b') is None
+
+
+def test_compaction_round_trip(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vectors([article(f"n{i}", [float(i), 1.0], title=f"T{i}") for i in range(10)])
+    db.delete_vector('n3')
+    db.compact()
+    db.store_vector(article('late', [2.0, 2.0], title='after snapshot'))
+    db.close()
+
+    # Only the post-compaction upsert is left in the log
+    with open(f"{db.base_path}.log.ndjson") as f:
+        assert [json.loads(line)['article']['id'] for line in f] == ['late']
+
+    reopened = open_db(tmp_path)
+    assert len(reopened) == 10
+    assert 'n3' not in reopened
+    assert reopened.get('n7')['title'] == 'T7'
+    assert reopened.get('late')['vector'] == pytest.approx([2.0, 2.0])
+    assert reopened.matrix.shape == (10, 2)
+
+
+def test_queries_read_the_mapped_snapshot_in_place(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vectors([article('a', [3.0, 4.0]), article('b', [0.0, 2.0])])
+    db.compact()
+    db.close()
+
+    reopened = open_db(tmp_path)
+    assert [a['id'] for a in reopened.query_similar_vectors([0.0, 1.0], 2)] == ['b', 'a']
+    assert not reopened._matrix.flags.writeable
+    assert not reopened._normed.flags.writeable
+    assert reopened._normed.ravel().tolist() == pytest.approx([0.6, 0.8, 0.0, 1.0])
+
+    # The first write moves both matrices into private memory
+    reopened.store_vector(article('c', [1.0, 0.0]))
+    assert reopened._normed.flags.writeable
+    assert [a['id'] for a in reopened.query_similar_vectors([1.0, 0.0], 1)] == ['c']
+
+
+def test_snapshot_preserves_id_types(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vectors([article(7, [1.0, 0.0]), article('seven', [0.0, 1.0]), {'vector': [1.0, 1.0]}])
+    db.compact()
+    db.close()
+
+    reopened = open_db(tmp_path)
+    assert reopened.ids == [7, 'seven']
+    assert reopened.get(7) is not None
+    assert reopened.get('7') is None
+
+
+def test_string_ids_keep_numpy_ids_file(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vectors([article('a', [1.0, 0.0]), article('b', [0.0, 1.0])])
+    db.compact()
+    db.close()
+
+    with open(manifest_path(db.base_path)) as f:
+        assert json.load(f)['ids'].endswith('.ids.npy')
+    assert open_db(tmp_path).ids == ['a', 'b']
+
+
+def test_legacy_json_import_writes_snapshot(tmp_path):
+    with open(tmp_path / 'news.json', 'w') as f:
+        json.dump([article('old', [1.0, 0.0], title='Legacy')], f)
+
+    db = open_db(tmp_path)
+    assert load_snapshot(db.base_path).rows == 1
+    db.close()
+
+    # The snapshot takes precedence over the JSON file from now on
+    os.remove(tmp_path / 'news.json')
+    assert open_db(tmp_path).get('old')['title'] == 'Legacy'
+
+
+def test_failed_log_write_raises_and_is_snapshotted_on_close(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vector(article('a', [1.0, 0.0]))
+
+    def fail(records):
+        raise IOError('disk full')
+
+    db._log.append = fail
+    with pytest.raises(OSError):
+        db.store_vector(article('b', [0.0, 1.0]))
+    assert db.dirty
+    db.close()
+
+    assert open_db(tmp_path).ids == ['a', 'b']
+
+
+def test_invalid_batch_stores_nothing(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vector(article('a', [1.0, 0.0]))
+    for bad in ({'id': 'c'}, article('c', [1.0, 0.0, 0.0])):
+        with pytest.raises(ValueError):
+            db.store_vectors([article('b', [0.0, 1.0]), bad])
+    assert db.ids == ['a']
+    assert not db.dirty
+    db.close()
+
+    assert open_db(tmp_path).ids == ['a']
+
+
+def test_unreadable_log_fails_instead_of_starting_empty(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vector(article('a', [1.0, 0.0]))
+    db.compact()
+    db.close()
+    with open(f"{db.base_path}.log.ndjson", 'w') as f:
+        f.write('{"op":"upsert","article":{"id":"b","vector":[1.0]}}\n')
+
+    with pytest.raises(ValueError):
+        open_db(tmp_path)
+    assert load_snapshot(db.base_path).rows == 1
+
+
+def test_undated_articles_are_dated_when_stored(tmp_path):
+    db = open_db(tmp_path)
+    db.store_vectors([article('undated', [1.0, 0.0]),
+                      article('dated', [1.0, 0.0], published_at='2020-01-01T00:00:00Z')])
+    stored_at = db.get('undated')['stored_at']
+    assert 'stored_at' not in db.get('dated')
+
+    # A fresh undated article outranks an old dated one under recency decay
+    ranked = db.query_similar_vectors([1.0, 0.0], 2, half_life=86400, now=stored_at)
+    assert [a['id'] for a in ranked] == ['undated', 'dated']
+
+
+def test_partitions_import_legacy_store_once(tmp_path):
+    legacy = open_db(tmp_path)
+    legacy.store_vector(article('a', [1.0, 0.0], published_at='1960-06-01T00:00:00Z'))
+    legacy.close()
+
+    db = PartitionedVectorDB(str(tmp_path / 'news.json'), partition_seconds=86400)
+    assert db.get('a') is not None
+    assert db.partitions[0][0] < 0
+    assert os.path.exists(tmp_path / 'news.imported.json')
+    assert not os.path.exists(tmp_path / 'news.log.ndjson')
+
+    # Negative partition starts are found again on reload
+    starts = [start for start, _ in db.partitions]
+    db.close()
+    reopened = PartitionedVectorDB(str(tmp_path / 'news.json'), partition_seconds=86400)
+    assert [start for start, _ in reopened.partitions] == starts
+    reopened.close()
+
+
+def test_partition_import_keeps_seed_json_and_leaves_no_legacy_snapshot(tmp_path):
+    with open(tmp_path / 'news.json', 'w') as f:
+        json.dump([article('seed', [1.0, 0.0], published_at='2020-01-01T00:00:00Z')], f)
+
+    db = PartitionedVectorDB(str(tmp_path / 'news.json'), partition_seconds=86400)
+    assert db.get('seed') is not None
+    db.close()
+
+    assert os.path.exists(tmp_path / 'news.json')
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('news.snapshot')]
+
+    # Every partition expiring does not bring the seed data back
+    expired = PartitionedVectorDB(str(tmp_path / 'news.json'), partition_seconds=86400, ttl=86400)
+    assert len(expired) == 0
+    expired.close()
+    assert len(PartitionedVectorDB(str(tmp_path / 'news.json'), partition_seconds=86400)) == 0
+
+
+def test_expired_partitions_are_dropped_whole(tmp_path):
+    day = 86400
+    now = time.time()
+
+    def dated(article_id, vector, age):
+        published = datetime.fromtimestamp(now - age, timezone.utc).isoformat()
+        return article(article_id, vector, published_at=published)
+
+    db = PartitionedVectorDB(str(tmp_path / 'news.json'), partition_seconds=day, ttl=10 * day, compact_interval=0)
+    dropped = []
+    db.add_drop_listener(dropped.extend)
+    stored = db.store_vectors([dated('fresh', [1.0, 0.2], 3600), dated('week', [1.0, 0.0], 7 * day),
+                               dated('ancient', [1.0, 0.0], 30 * day)])
+    assert stored == 2
+    assert len(db.partitions) == 2
+
+    # Recency decay lets the fresh article outrank a closer but older one
+    assert [a['id'] for a in db.query_similar_vectors([1.0, 0.0], 2)] == ['week', 'fresh']
+    assert [a['id'] for a in db.query_similar_vectors([1.0, 0.0], 2, half_life=day, now=now)] == ['fresh', 'week']
+
+    week_start = db.partitions[-1][0]
+    assert db.drop_expired(now + 5 * day) == 1
+    assert dropped == ['week']
+    assert db.get('week') is None and db.get('fresh') is not None
+    assert db._partition_files(week_start) == []
+    db.close()
+
+
+def test_matrix_grows_and_swap_remove_keeps_the_id_index(tmp_path):
+    db = open_db(tmp_path)
+    count = VectorDB.INITIAL_CAPACITY * 2 + 1
+    db.store_vectors([article(f"n{i}", [float(i), 1.0], title=f"story {i}") for i in range(count)])
+    db.store_vector({'vector': [0.0, 1.0], 'title': 'no id'})
+    assert len(db) == count + 1
+    assert db.matrix.shape == (count + 1, 2)
+    assert db._matrix.shape[0] >= count + 1
+
+    # Removing rows moves the last row into each freed slot
+    for i in (0, 5, count - 1, 40):
+        assert db.delete_vector(f"n{i}")
+    assert not db.delete_vector('n5')
+    assert len(db) == count - 3
+    for article_id in db.ids:
+        row = db._id_index[article_id]
+        assert db._ids[row] == article_id
+        assert db.matrix[row].tolist() == [float(article_id[1:]), 1.0]
+
+    # Upserts replace rows in place
+    db.store_vector(article('n7', [-1.0, 0.0], title='rewritten'))
+    assert len(db) == count - 3
+    stored = db.get('n7')
+    assert (stored['title'], stored['vector']) == ('rewritten', [-1.0, 0.0])
+    assert db.query_similar_vectors([-1.0, 0.0], 1)[0]['id'] == 'n7'
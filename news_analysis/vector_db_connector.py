@@ -1,63 +1,771 @@
 import numpy as np
+import heapq
 import json
 import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from datetime import datetime
+from vector_log import AppendLog
+from vector_snapshot import load_snapshot, write_snapshot, encode_metadata, manifest_path, remove_snapshot
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ai_utils.ranking import normalize_rows, top_k_indices
+
+# Article fields whose text is searchable by keyword
+TEXT_FIELDS = ('title', 'summary', 'content')
+
+# Word tokens indexed from article text
+WORD_PATTERN = re.compile(r'\w+')
 
 class VectorDB:
     """
     Mock in-memory vector database for storing and retrieving news articles
     In a real implementation, this would connect to Elasticsearch, Faiss, or another vector DB
+
+    Vectors are kept in a contiguous float32 matrix (one row per article) that grows
+    geometrically, article metadata is kept in a parallel list, and an id -> row hash
+    index makes upserts and lookups O(1).
+
+    Persistence is a snapshot plus an append-only write-ahead log: every mutation is
+    appended to the log, and a background compactor periodically folds the log into
+    a fresh snapshot. Startup memory-maps the snapshot (see vector_snapshot.py) and
+    replays the log; snapshot metadata is decoded lazily per row. A legacy JSON array
+    at db_file is imported once if no snapshot exists yet.
+
+    Queries read the snapshot's raw and normalized matrices in place, so
+    processes that only read share their page-cache pages. The first
+    mutation (including a replayed log record) copies both matrices into
+    private, writable memory, which that process then keeps: only read-only
+    processes benefit from the sharing.
     """
-    
-    def __init__(self, db_file=None):
-        """Initialize the vector database"""
+
+    # Initial row capacity of the vector matrix
+    INITIAL_CAPACITY = 64
+
+    # ANN candidates per requested result when re-ranking by recency
+    DECAY_OVERSAMPLE = 10
+
+    def __init__(self, db_file=None, compact_threshold=10000, compact_interval=300, fsync=False,
+                 index=None):
+        """
+        Initialize the vector database
+
+        Args:
+            db_file (str): Legacy JSON database path; snapshot and log files are derived from it
+            compact_threshold (int): Log records that trigger a background compaction
+            compact_interval (float): Seconds between compactor checks (0 disables the compactor)
+            fsync (bool): Whether to fsync the log after every write
+            index: Optional ANN index (see ann_index.py); None means exact search
+        """
         self.db_file = db_file or 'news_vectors.json'
-        self.vectors = []
-        
+        self.base_path = os.path.splitext(self.db_file)[0]
+        self.compact_threshold = compact_threshold
+        self.index = index
+
+        # Storage: vector matrix, row metadata and id -> row index. A metadata
+        # entry is either a dict or the row number of a not yet decoded
+        # snapshot record.
+        self._snapshot = None
+        self._matrix = None
+        self._normed = None
+        self._size = 0
+        self._metadata = []
+        self._ids = []
+        self._id_index = {}
+
+        # Keyword/tag/text word -> set of rows inverted index. It is built in
+        # chunks (see _build_keyword_index): rows below _indexed_rows are in
+        # it, and once _keyword_index_complete is set every row is.
+        self._keyword_index = None
+        self._indexed_rows = 0
+        self._keyword_index_complete = False
+
+        # Publication timestamp per row, built on first recency-weighted query
+        self._timestamps = None
+
+        # Mutations and compaction may come from different threads
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._log = AppendLog(f"{self.base_path}.log.ndjson", fsync=fsync)
+
+        # Set when a mutation could not be logged: memory is ahead of disk
+        # until the next snapshot
+        self.dirty = False
+
         # Load existing database if it exists
         self._load_db()
-    
+
+        # Start the background compactor
+        self._compact_requested = threading.Event()
+        self._closed = threading.Event()
+        self._compactor = None
+        if compact_interval:
+            self._compactor = threading.Thread(
+                target=self._compaction_loop, args=(compact_interval,), daemon=True
+            )
+            self._compactor.start()
+
+        # Index the loaded articles for keyword queries without holding up startup
+        self._indexer = None
+        if self._size:
+            self._indexer = threading.Thread(
+                target=self._build_keyword_index, kwargs={'stop': self._closed}, daemon=True
+            )
+            self._indexer.start()
+
+    def __len__(self):
+        """Number of stored articles"""
+        return self._size
+
+    def __contains__(self, article_id):
+        """Check whether an article id is stored"""
+        return article_id in self._id_index
+
+    @property
+    def dimension(self):
+        """Vector dimension, or None while the store is empty"""
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    @property
+    def ids(self):
+        """Ids of the stored articles"""
+        with self._lock:
+            return list(self._id_index)
+
+    @property
+    def matrix(self):
+        """Read-only view of the stored vectors (one row per article)"""
+        if self._matrix is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        view = self._matrix[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def vectors(self):
+        """
+        All stored articles as dicts with their 'vector' field
+
+        Kept for backwards compatibility; this materializes every row, so prefer
+        len(), get() or the query methods on hot paths.
+        """
+        with self._lock:
+            return [self._article_at(row) for row in range(self._size)]
+
     def _load_db(self):
-        """Load vector database from disk if it exists"""
+        """
+        Map the snapshot (or import the legacy JSON file) and replay the write-ahead log
+
+        A legacy import is written out as a snapshot right away, so later
+        starts map it instead of parsing the JSON file again.
+
+        Raises:
+            Exception: If the snapshot, legacy file or log cannot be read. The
+                store must not start empty in that case, since its next
+                compaction would replace the snapshot on disk.
+        """
+        imported = False
         try:
-            if os.path.exists(self.db_file):
+            snapshot = load_snapshot(self.base_path)
+            if snapshot is not None:
+                self._snapshot = snapshot
+                if snapshot.rows:
+                    self._matrix = snapshot.vectors
+                    self._normed = snapshot.normed
+                    self._size = snapshot.rows
+                    self._ids = list(snapshot.ids)
+                    self._metadata = list(range(snapshot.rows))
+                    self._id_index = {article_id: row for row, article_id in enumerate(self._ids) if article_id}
+            elif os.path.exists(self.db_file):
                 with open(self.db_file, 'r') as f:
-                    self.vectors = json.load(f)
+                    for article in json.load(f):
+                        self._upsert(article)
+                imported = True
+
+            for record in self._log.replay():
+                self._apply(record)
         except Exception as e:
             print(f"Error loading vector DB: {e}")
-            self.vectors = []
-    
-    def _save_db(self):
-        """Save vector database to disk"""
+            raise
+
+        if imported:
+            self.compact()
+
+    def _apply(self, record):
+        """Apply a single write-ahead log record"""
+        if record.get('op') == 'upsert':
+            self._upsert(record['article'])
+        elif record.get('op') == 'delete':
+            self._remove(record['id'])
+
+    def _write_log(self, records):
+        """
+        Append records to the write-ahead log and request compaction when it grows large
+
+        If the append fails the in-memory state is already ahead of the log:
+        the store is marked dirty, so the next compaction (requested here,
+        and run at the latest by close()) persists it as a snapshot, and the
+        error is raised to the caller.
+
+        Raises:
+            OSError: If the records could not be written
+        """
         try:
-            with open(self.db_file, 'w') as f:
-                json.dump(self.vectors, f, indent=2)
+            self._log.append(records)
         except Exception as e:
-            print(f"Error saving vector DB: {e}")
-    
-    def store_vector(self, article):
+            self.dirty = True
+            self._compact_requested.set()
+            raise OSError(f"Error writing vector DB log: {e}") from e
+        if self._log.record_count >= self.compact_threshold:
+            self._compact_requested.set()
+
+    def _compaction_loop(self, interval):
+        """Background thread: compact whenever the log passes the threshold"""
+        while not self._closed.is_set():
+            self._compact_requested.wait(interval)
+            self._compact_requested.clear()
+            if self._closed.is_set():
+                break
+            if self.dirty or self._log.record_count >= self.compact_threshold:
+                self.compact()
+
+    def compact(self):
         """
-        Store an article with its feature vector in the database
-        
-        Args:
-            article (dict): Article with 'vector' field
+        Fold the write-ahead log into a new snapshot
+
+        The live log is rotated aside and the in-memory state copied under the
+        lock; the snapshot is then written without blocking writers, and the
+        rotated log is only discarded once the snapshot has been renamed into place.
+        """
+        with self._compact_lock:
+            with self._lock:
+                self._log.rotate()
+                dirty, self.dirty = self.dirty, False
+                size = self._size
+                matrix = normed = None
+                if self._matrix is not None:
+                    matrix = self._matrix[:size].copy()
+                    normed = self._normalized().copy()
+                ids = list(self._ids)
+                metadata = list(self._metadata)
+                snapshot = self._snapshot
+
+            # Undecoded snapshot records are copied through as raw bytes
+            blobs = (
+                snapshot.metadata_bytes(entry) if isinstance(entry, int) else encode_metadata(entry)
+                for entry in metadata
+            )
+
+            try:
+                write_snapshot(self.base_path, matrix, ids, blobs, normed)
+                self._log.discard_rotated()
+            except Exception as e:
+                self.dirty = self.dirty or dirty
+                print(f"Error compacting vector DB: {e}")
+
+    def close(self):
+        """Stop the background threads, snapshot unlogged changes and close the log"""
+        self._closed.set()
+        self._compact_requested.set()
+        for thread in (self._compactor, self._indexer):
+            if thread is not None:
+                thread.join()
+        if self.dirty:
+            self.compact()
+        with self._lock:
+            self._log.close()
+
+    def _ensure_capacity(self, dimension, extra_rows=1):
+        """Allocate or grow the vector matrix so extra_rows more rows fit"""
+        self._make_writable()
+        if self._matrix is None:
+            self._resize(max(self.INITIAL_CAPACITY, extra_rows), dimension)
+            return
+
+        if dimension != self._matrix.shape[1]:
+            raise ValueError(
+                f"Vector dimension {dimension} does not match store dimension {self._matrix.shape[1]}"
+            )
+
+        needed = self._size + extra_rows
+        capacity = self._matrix.shape[0]
+        if needed > capacity:
+            # Geometric growth keeps appends amortized O(1)
+            self._resize(max(needed, capacity * 2), dimension)
+
+    def _make_writable(self):
+        """Copy a memory-mapped snapshot matrix into private memory before mutating it"""
+        if self._matrix is not None and not self._matrix.flags.writeable:
+            self._resize(max(self.INITIAL_CAPACITY, self._size * 2), self._matrix.shape[1])
+
+    def _resize(self, capacity, dimension):
+        """Reallocate the raw and normalized matrices with a new row capacity"""
+        matrix = np.zeros((capacity, dimension), dtype=np.float32)
+        if self._matrix is not None:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+        if self._normed is not None:
+            normed = np.zeros((capacity, dimension), dtype=np.float32)
+            normed[:self._size] = self._normed[:self._size]
+            self._normed = normed
+
+    def _normalized(self):
+        """
+        Unit-length form of the stored rows
+
+        Mapped from the snapshot when it has them, otherwise built on first use.
         """
+        if self._normed is None:
+            self._normed = normalize_rows(self._matrix)
+        return self._normed[:self._size]
+
+    def _set_row(self, row, vector):
+        """Write a vector (and its normalized form) into a matrix row"""
+        self._matrix[row] = vector
+        if self._normed is not None or self.index is not None:
+            normed_vector = normalize_rows(self._matrix[row:row + 1])[0]
+            if self._normed is not None:
+                self._normed[row] = normed_vector
+            if self.index is not None:
+                self.index.upsert(row, normed_vector)
+
+    def _metadata_at(self, row):
+        """Metadata dict of a row, decoding it from the snapshot on first access"""
+        metadata = self._metadata[row]
+        if isinstance(metadata, int):
+            metadata = self._snapshot.metadata(metadata)
+            self._metadata[row] = metadata
+        return metadata
+
+    def _article_at(self, row):
+        """Rebuild the article dict stored at a matrix row"""
+        article = dict(self._metadata_at(row))
+        article['vector'] = self._matrix[row].tolist()
+        return article
+
+    def _upsert(self, article):
+        """Insert or replace a single article without persisting"""
         if 'vector' not in article:
             raise ValueError("Article must have a 'vector' field")
-        
-        # Check if article already exists (by id)
+
+        vector = np.asarray(article['vector'], dtype=np.float32).ravel()
+        metadata = {k: v for k, v in article.items() if k != 'vector'}
         article_id = article.get('id')
+
+        # Update existing article in place
+        row = self._id_index.get(article_id) if article_id else None
+        if row is not None:
+            self._ensure_capacity(vector.shape[0], 0)
+            self._set_row(row, vector)
+            self._unindex_keywords(row)
+            self._metadata[row] = metadata
+            self._index_keywords(row)
+            self._set_timestamp(row)
+            return row
+
+        # Add new article
+        self._ensure_capacity(vector.shape[0])
+        row = self._size
+        self._set_row(row, vector)
+        self._metadata.append(metadata)
+        self._ids.append(article_id)
         if article_id:
-            # Update existing article
-            for i, existing in enumerate(self.vectors):
-                if existing.get('id') == article_id:
-                    self.vectors[i] = article
-                    self._save_db()
+            self._id_index[article_id] = row
+        self._size += 1
+        self._index_keywords(row)
+        self._set_timestamp(row)
+        return row
+
+    def _remove(self, article_id):
+        """Remove an article by id without persisting; returns False if absent"""
+        row = self._id_index.pop(article_id, None)
+        if row is None:
+            return False
+
+        # Move the last row into the freed slot so removal stays O(1)
+        self._make_writable()
+        last = self._size - 1
+        if self.index is not None:
+            self.index.remove(row)
+            if row != last:
+                self.index.move(last, row)
+        self._unindex_keywords(row)
+        if row != last:
+            self._unindex_keywords(last)
+            self._matrix[row] = self._matrix[last]
+            if self._normed is not None:
+                self._normed[row] = self._normed[last]
+            self._metadata[row] = self._metadata[last]
+            if self._timestamps is not None:
+                self._timestamps[row] = self._timestamps[last]
+            self._ids[row] = self._ids[last]
+            if self._ids[row]:
+                self._id_index[self._ids[row]] = row
+        self._metadata.pop()
+        self._ids.pop()
+        self._size -= 1
+        if row != last:
+            self._index_keywords(row)
+        self._indexed_rows = min(self._indexed_rows, self._size)
+        return True
+
+    def _set_timestamp(self, row):
+        """Record the publication time of a row once timestamps are tracked"""
+        if self._timestamps is not None:
+            if row >= len(self._timestamps):
+                grown = np.zeros(max(row + 1, len(self._timestamps) * 2, self.INITIAL_CAPACITY))
+                grown[:len(self._timestamps)] = self._timestamps
+                self._timestamps = grown
+            self._timestamps[row] = article_timestamp(self._metadata_at(row))
+
+    def _ensure_timestamps(self):
+        """Publication timestamps of every row, decoded from metadata on first use"""
+        if self._timestamps is None:
+            timestamps = np.zeros(max(self._size, self.INITIAL_CAPACITY))
+            for row in range(self._size):
+                timestamps[row] = article_timestamp(self._metadata_at(row))
+            self._timestamps = timestamps
+        return self._timestamps[:self._size]
+
+    def _decay_weights(self, half_life, now=None):
+        """
+        Exponential recency weight of every row: 0.5 ** (age / half_life)
+
+        Articles stored without a publication date are as old as their
+        'stored_at' time (see date_undated).
+        """
+        now = time.time() if now is None else now
+        age = np.maximum(0.0, now - self._ensure_timestamps())
+        return np.exp2(-age / half_life).astype(np.float32)
+
+    def _row_keywords(self, row):
+        """Lowercased keywords and tags of the article at a row"""
+        metadata = self._metadata_at(row)
+        terms = list(metadata.get('keywords') or []) + list(metadata.get('tags') or [])
+        return {str(term).lower() for term in terms}
+
+    def _row_terms(self, row):
+        """Index terms of a row: its keywords and tags plus the word tokens of its text"""
+        metadata = self._metadata_at(row)
+        terms = self._row_keywords(row)
+        for field in TEXT_FIELDS:
+            terms.update(WORD_PATTERN.findall(str(metadata.get(field) or '').lower()))
+        return terms
+
+    def _is_indexed(self, row):
+        """Whether a row belongs in the keyword index as it is being built"""
+        return self._keyword_index is not None and (self._keyword_index_complete or row < self._indexed_rows)
+
+    def _index_keywords(self, row):
+        """Add a row to the posting lists of its keywords"""
+        if self._is_indexed(row):
+            for keyword in self._row_terms(row):
+                self._keyword_index.setdefault(keyword, set()).add(row)
+
+    def _unindex_keywords(self, row):
+        """Remove a row from the posting lists of its keywords"""
+        if self._is_indexed(row):
+            for keyword in self._row_terms(row):
+                postings = self._keyword_index.get(keyword)
+                if postings is not None:
+                    postings.discard(row)
+                    if not postings:
+                        del self._keyword_index[keyword]
+
+    def _build_keyword_index(self, chunk_rows=200, stop=None):
+        """
+        Index every row for keyword queries, chunk_rows rows per lock hold
+
+        Runs in the background after a load and is finished on demand by the
+        first keyword query. Mutations between chunks keep the index
+        consistent: rows already covered are updated in place and the rest
+        are picked up by later chunks.
+
+        Args:
+            chunk_rows (int): Rows indexed per lock hold
+            stop (threading.Event): Abandons the build when set
+        """
+        while stop is None or not stop.is_set():
+            with self._lock:
+                if self._keyword_index is None:
+                    self._keyword_index = {}
+                    self._indexed_rows = 0
+                if self._keyword_index_complete:
                     return
-        
-        # Add new article
-        self.vectors.append(article)
-        self._save_db()
-    
+                end = min(self._indexed_rows + chunk_rows, self._size)
+                for row in range(self._indexed_rows, end):
+                    for keyword in self._row_terms(row):
+                        self._keyword_index.setdefault(keyword, set()).add(row)
+                self._indexed_rows = end
+                if end >= self._size:
+                    self._keyword_index_complete = True
+                    return
+
+    def _ensure_keyword_index(self):
+        """The complete keyword inverted index, finishing its build if needed"""
+        if not self._keyword_index_complete:
+            self._build_keyword_index(chunk_rows=self._size or 1)
+        return self._keyword_index
+
+    def _keyword_rows(self, index, keyword):
+        """
+        Rows whose keywords or tags include a keyword, or whose text contains it as words
+
+        A single word is looked up in its posting list. A phrase is matched
+        by intersecting the posting lists of its words and checking that the
+        words are adjacent in the title, summary or content of each remaining
+        row, so the cost is bounded by posting-list sizes.
+
+        Args:
+            index (dict): Inverted index from _ensure_keyword_index
+            keyword (str): Lowercased keyword
+
+        Returns:
+            set: Matching rows
+        """
+        rows = set(index.get(keyword, ()))
+        words = WORD_PATTERN.findall(keyword)
+        if len(words) < 2:
+            if words:
+                rows.update(index.get(words[0], ()))
+            return rows
+
+        postings = sorted((index.get(word, set()) for word in set(words)), key=len)
+        candidates = postings[0].intersection(*postings[1:]) - rows
+        if candidates:
+            phrase = re.compile(r'\b' + r'\W+'.join(re.escape(word) for word in words) + r'\b')
+            for row in candidates:
+                metadata = self._metadata_at(row)
+                if any(phrase.search(str(metadata.get(field) or '').lower()) for field in TEXT_FIELDS):
+                    rows.add(row)
+        return rows
+
+    def _keyword_matches(self, keywords, mode='any'):
+        """
+        Rows matching keywords, with the number of distinct keywords each matches
+
+        Args:
+            keywords (list): Keywords (case-insensitive)
+            mode (str): 'any' for rows matching at least one keyword, 'all' for every keyword
+
+        Returns:
+            Counter: row -> number of matched keywords
+        """
+        if mode not in ('any', 'all'):
+            raise ValueError(f"Unknown keyword match mode: {mode}")
+        index = self._ensure_keyword_index()
+        postings = [self._keyword_rows(index, k) for k in {str(k).lower() for k in keywords}]
+        if not postings:
+            return Counter()
+
+        if mode == 'all':
+            # Intersect starting from the shortest posting list
+            postings.sort(key=len)
+            rows = set(postings[0]).intersection(*postings[1:])
+            return Counter({row: len(postings) for row in rows})
+
+        matches = Counter()
+        for rows in postings:
+            matches.update(rows)
+        return matches
+
+    def query_keywords(self, keywords, top_n=3, mode='any'):
+        """
+        Find articles by keyword through the inverted index
+
+        Args:
+            keywords (list): Keywords to search for (case-insensitive)
+            top_n (int): Number of results to return
+            mode (str): 'any' to match at least one keyword, 'all' to match every keyword
+
+        Returns:
+            list: Matching articles ranked by number of matched keywords, then recency
+        """
+        return [article for _, article in self._ranked_keyword_matches(keywords, top_n, mode)]
+
+    def _ranked_keyword_matches(self, keywords, top_n, mode='any'):
+        """Top keyword matches as ((-match count, -timestamp, row), article) pairs, best first"""
+        with self._lock:
+            matches = self._keyword_matches(keywords, mode)
+            ranked = heapq.nsmallest(
+                top_n,
+                ((-count, -article_timestamp(self._metadata_at(row)), row) for row, count in matches.items())
+            )
+            return [(key, self._article_at(key[2])) for key in ranked]
+
+    def store_vector(self, article):
+        """
+        Store an article with its feature vector in the database
+
+        Args:
+            article (dict): Article with 'vector' field
+        """
+        self.store_vectors([article])
+
+    def store_vectors(self, articles):
+        """
+        Store a batch of articles with a single log write
+
+        Args:
+            articles (list): Articles with 'vector' fields
+
+        Returns:
+            int: Number of articles stored
+
+        Raises:
+            ValueError: If an article has no vector or one of the wrong
+                dimension; nothing from the batch is stored
+            OSError: If the write-ahead log could not be written (the articles
+                are kept in memory and persisted by the next compaction)
+        """
+        articles = date_undated(articles)
+        if not articles:
+            return 0
+
+        with self._lock:
+            self._check_vectors(articles)
+            records = []
+            try:
+                for article in articles:
+                    row = self._upsert(article)
+                    records.append({'op': 'upsert', 'article': self._article_at(row)})
+            finally:
+                # Whatever reached memory is logged, even if a later upsert failed
+                self._write_log(records)
+        return len(articles)
+
+    def _check_vectors(self, articles):
+        """
+        Validate the vectors of a batch before any of it is applied
+
+        Raises:
+            ValueError: If an article has no 'vector' field, or its vector does not
+                match the store dimension (or, in an empty store, the first vector)
+        """
+        dimension = self.dimension
+        for article in articles:
+            if 'vector' not in article:
+                raise ValueError("Article must have a 'vector' field")
+            size = np.asarray(article['vector'], dtype=np.float32).size
+            if dimension is None:
+                dimension = size
+            elif size != dimension:
+                raise ValueError(f"Vector dimension {size} does not match store dimension {dimension}")
+
+    def delete_vector(self, article_id):
+        """
+        Delete an article by id
+
+        Args:
+            article_id (str): Id of the article to delete
+
+        Returns:
+            bool: True if the article existed
+
+        Raises:
+            OSError: If the write-ahead log could not be written
+        """
+        with self._lock:
+            removed = self._remove(article_id)
+            if removed:
+                self._write_log([{'op': 'delete', 'id': article_id}])
+        return removed
+
+    def get(self, article_id):
+        """
+        Get a stored article by id
+
+        Args:
+            article_id (str): Article id
+
+        Returns:
+            dict: The article with its 'vector' field, or None if not stored
+        """
+        with self._lock:
+            row = self._id_index.get(article_id)
+            if row is None:
+                return None
+            return self._article_at(row)
+
+    def clear(self):
+        """Drop every stored article (in memory only)"""
+        self._matrix = None
+        self._normed = None
+        self._size = 0
+        self._metadata = []
+        self._ids = []
+        self._id_index = {}
+        self._keyword_index = None
+        self._indexed_rows = 0
+        self._keyword_index_complete = False
+        self._timestamps = None
+        if self.index is not None:
+            self.index.reset()
+
+    def query_hybrid(self, query_vector, keywords, top_n=3, mode='any', rrf_k=60,
+                     vector_weight=1.0, keyword_weight=1.0):
+        """
+        Find articles matching keywords, ranked by fused vector and keyword relevance
+
+        Candidates come from the keyword index, so only posting-list rows are
+        scored by cosine similarity. Each candidate gets a vector rank and a
+        keyword rank (match count, then recency) which are combined with
+        weighted reciprocal-rank fusion: w_v / (rrf_k + rank_v) + w_k / (rrf_k + rank_k).
+        If fewer than top_n articles match, the best remaining vector matches
+        are appended.
+
+        Args:
+            query_vector (list): Query vector
+            keywords (list): Keywords to prefilter on (case-insensitive)
+            top_n (int): Number of results to return
+            mode (str): 'any' or 'all' keyword matching
+            rrf_k (float): Rank fusion constant; larger values flatten rank differences
+            vector_weight (float): Weight of the vector rank
+            keyword_weight (float): Weight of the keyword rank
+
+        Returns:
+            list: Top N articles
+        """
+        with self._lock:
+            if not self._size:
+                return []
+
+            rows, similarity, match_counts, timestamps = self._hybrid_candidates(query_vector, keywords, mode)
+            positions = fuse_ranks(similarity, match_counts, timestamps, top_n, rrf_k,
+                                   vector_weight, keyword_weight)
+            ranked = rows[positions].tolist()
+
+            # Supplement with plain vector matches when too few articles match
+            if len(ranked) < top_n:
+                seen = set(ranked)
+                (vector_rows, _), = self._search([query_vector], top_n + len(seen))
+                ranked.extend(row for row in vector_rows.tolist() if row not in seen)
+
+            return [self._article_at(row) for row in ranked[:top_n]]
+
+    def _hybrid_candidates(self, query_vector, keywords, mode):
+        """
+        Keyword-matching rows with the signals query_hybrid fuses
+
+        Returns:
+            tuple: (rows, cosine similarity, matched keyword count, timestamp) arrays
+        """
+        matches = self._keyword_matches(keywords, mode)
+        rows = np.fromiter(matches.keys(), dtype=np.int64, count=len(matches))
+        rows.sort()
+        if not len(rows):
+            return rows, np.zeros(0, dtype=np.float32), np.zeros(0), np.zeros(0)
+        query = normalize_rows(np.asarray(query_vector, dtype=np.float32)[None, :])[0]
+        similarity = self._normalized()[rows] @ query
+        match_counts = np.array([matches[row] for row in rows], dtype=np.float64)
+        timestamps = np.array([article_timestamp(self._metadata_at(row)) for row in rows])
+        return rows, similarity, match_counts, timestamps
+
     def cosine_similarity(self, v1, v2):
         """Calculate cosine similarity between two vectors"""
         v1 = np.array(v1)
@@ -65,37 +773,496 @@ class VectorDB:
         dot_product = np.dot(v1, v2)
         norm_v1 = np.linalg.norm(v1)
         norm_v2 = np.linalg.norm(v2)
-        
+
         # Avoid division by zero
         if norm_v1 == 0 or norm_v2 == 0:
             return 0
-            
+
         return dot_product / (norm_v1 * norm_v2)
-    
-    def query_similar_vectors(self, query_vector, top_n=3):
+
+    def _search(self, queries, top_n, half_life=None, now=None):
+        """
+        Cosine top-k for a batch of queries (approximate when an ANN index is set)
+
+        With a half_life, scores are cosine similarity times the recency
+        weight of each row (see _decay_weights). The ANN index then supplies
+        DECAY_OVERSAMPLE times as many cosine candidates for re-ranking.
+
+        Args:
+            queries (np.ndarray): (m x d) query matrix
+            top_n (int): Number of results per query
+            half_life (float): Recency half-life in seconds (None ranks by similarity only)
+            now (float): Reference time for recency (defaults to now)
+
+        Returns:
+            list: (rows, scores) array pairs per query, best first
+        """
+        queries = normalize_rows(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        if queries.shape[1] != self._matrix.shape[1]:
+            raise ValueError(
+                f"Query dimension {queries.shape[1]} does not match store dimension {self._matrix.shape[1]}"
+            )
+
+        weights = self._decay_weights(half_life, now) if half_life else None
+
+        # Serve from the ANN index when it is ready
+        if self.index is not None:
+            candidates = top_n * self.DECAY_OVERSAMPLE if weights is not None else top_n
+            results = self.index.search(queries, candidates, self._normalized(), top_k)
+            if results is not None:
+                if weights is None:
+                    return results
+                reranked = []
+                for rows, scores in results:
+                    positions, decayed = top_k(scores * weights[rows], top_n)
+                    reranked.append((rows[positions], decayed))
+                return reranked
+
+        # One BLAS call scores every query against every row
+        scores = queries @ self._normalized().T
+        if weights is not None:
+            scores *= weights
+        return [top_k(row_scores, top_n) for row_scores in scores]
+
+    def query_similar_vectors(self, query_vector, top_n=3, half_life=None, now=None):
         """
         Find vectors similar to the query vector
-        
+
         Args:
             query_vector (list): Query vector
             top_n (int): Number of results to return
-            
+            half_life (float): Recency half-life in seconds; similarity is multiplied by
+                0.5 ** (age / half_life) of each article's date/published_at (None disables)
+            now (float): Reference POSIX time for ages (defaults to now)
+
         Returns:
             list: Top N most similar articles
         """
-        if not self.vectors:
-            return []
-        
-        # Calculate similarity for each vector
-        similarities = []
-        for article in self.vectors:
-            article_vector = article.get('vector', [])
-            if article_vector:
-                similarity = self.cosine_similarity(query_vector, article_vector)
-                similarities.append((article, similarity))
-        
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return top N articles
-        return [article for article, _ in similarities[:top_n]] 
\ No newline at end of file
+        return self.query_similar_vectors_batch([query_vector], top_n, half_life, now)[0]
+
+    def query_similar_vectors_batch(self, query_vectors, top_n=3, half_life=None, now=None):
+        """
+        Find the vectors most similar to each of several query vectors
+
+        Args:
+            query_vectors (list): (m x d) matrix or list of query vectors
+            top_n (int): Number of results to return per query
+            half_life (float): Recency half-life in seconds (see query_similar_vectors)
+            now (float): Reference POSIX time for ages (defaults to now)
+
+        Returns:
+            list: For each query, its top N most similar articles
+        """
+        return [
+            [article for _, article in results]
+            for results in self._scored_matches(query_vectors, top_n, half_life, now)
+        ]
+
+    def _scored_matches(self, query_vectors, top_n, half_life=None, now=None):
+        """(score, article) pairs of the top matches for each query, best first"""
+        query_vectors = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        with self._lock:
+            if not self._size:
+                return [[] for _ in range(len(query_vectors))]
+
+            return [
+                [(float(score), self._article_at(row)) for row, score in zip(rows, scores)]
+                for rows, scores in self._search(query_vectors, top_n, half_life, now)
+            ]
+
+
+class PartitionedVectorDB:
+    """
+    VectorDB split into time partitions so old news can expire cheaply
+
+    Articles are routed by publication time (date / published_at, or ingest
+    time when unknown) into fixed-width partitions, each a VectorDB with its
+    own snapshot and log files under <base>.p<start>. Expiring news past the
+    TTL drops whole partitions: the partition is closed and its files are
+    deleted, without filtering or rewriting any live rows. Queries fan out to
+    every partition and merge the per-partition results.
+
+    Offers the same storage and query API as VectorDB, so NewsAnalyzer works
+    with either.
+    """
+
+    def __init__(self, db_file=None, partition_seconds=86400, ttl=None, index_factory=None, **db_options):
+        """
+        Open every existing partition
+
+        A non-partitioned store at db_file is imported on first start.
+
+        Args:
+            db_file (str): Base database path, as for VectorDB
+            partition_seconds (float): Width of a partition in seconds
+            ttl (float): Seconds after which a partition's articles expire (None keeps everything)
+            index_factory (callable): Returns a fresh ANN index per partition (None for exact search)
+            **db_options: Keyword arguments for each partition's VectorDB
+        """
+        self.db_file = db_file or 'news_vectors.json'
+        self.base_path = os.path.splitext(self.db_file)[0]
+        self.partition_seconds = partition_seconds
+        self.ttl = ttl
+        self.index_factory = index_factory
+        self.db_options = db_options
+
+        # Partition start time -> VectorDB
+        self._partitions = {}
+        self._lock = threading.RLock()
+
+        # Callbacks receiving the article ids of each dropped partition
+        self._drop_listeners = []
+
+        self._load_partitions()
+        self.drop_expired()
+
+    def __len__(self):
+        """Number of stored articles"""
+        return sum(len(db) for db in self._snapshot_partitions())
+
+    def __contains__(self, article_id):
+        """Check whether an article id is stored"""
+        return any(article_id in db for db in self._snapshot_partitions())
+
+    @property
+    def dimension(self):
+        """Vector dimension, or None while the store is empty"""
+        for db in self._snapshot_partitions():
+            if db.dimension is not None:
+                return db.dimension
+        return None
+
+    @property
+    def vectors(self):
+        """All stored articles as dicts with their 'vector' field (materializes every row)"""
+        return [article for db in self._snapshot_partitions() for article in db.vectors]
+
+    @property
+    def partitions(self):
+        """(start time, article count) of every partition, newest first"""
+        with self._lock:
+            return [(start, len(self._partitions[start])) for start in sorted(self._partitions, reverse=True)]
+
+    def _partition_files(self, start=None):
+        """Files of one partition (or of all partitions) as (start, path) pairs"""
+        directory = os.path.dirname(os.path.abspath(self.base_path))
+        name = os.path.basename(self.base_path)
+        pattern = re.compile(rf'{re.escape(name)}\.p(-?\d+)\.')
+        files = []
+        for filename in os.listdir(directory):
+            match = pattern.match(filename)
+            if match and (start is None or int(match.group(1)) == start):
+                files.append((int(match.group(1)), os.path.join(directory, filename)))
+        return files
+
+    def _open_partition(self, start):
+        """Open (or create) the VectorDB of a partition"""
+        index = self.index_factory() if self.index_factory else None
+        return VectorDB(f"{self.base_path}.p{start}.json", index=index, **self.db_options)
+
+    def _load_partitions(self):
+        """
+        Open partitions found on disk, importing a non-partitioned store if there are none
+
+        Once the imported articles are compacted into their partitions, the
+        store's snapshot and log files are deleted and an <base>.imported.json
+        marker is written, so later starts neither re-import it nor load it
+        back once every partition has expired. The legacy JSON file is left
+        in place, since it may be tracked seed data.
+        """
+        for start in sorted({start for start, _ in self._partition_files()}):
+            self._partitions[start] = self._open_partition(start)
+
+        marker = f"{self.base_path}.imported.json"
+        log_paths = (f"{self.base_path}.log.ndjson", f"{self.base_path}.log.ndjson.1")
+        legacy_files = (self.db_file, manifest_path(self.base_path)) + log_paths
+        if self._partitions or os.path.exists(marker) or not any(os.path.exists(path) for path in legacy_files):
+            return
+
+        legacy = VectorDB(self.db_file, compact_interval=0)
+        try:
+            count = self.store_vectors(legacy.vectors)
+            self.compact()
+        finally:
+            legacy.close()
+        remove_snapshot(self.base_path)
+        for path in log_paths:
+            if os.path.exists(path):
+                os.remove(path)
+        with open(marker, 'w') as f:
+            json.dump({'imported_at': time.time(), 'articles': count}, f)
+
+    def _snapshot_partitions(self):
+        """Current partitions, newest first"""
+        with self._lock:
+            return [self._partitions[start] for start in sorted(self._partitions, reverse=True)]
+
+    def _partition_start(self, article):
+        """Start time of the partition an article belongs to (see date_undated)"""
+        timestamp = article_timestamp(article)
+        return int(timestamp // self.partition_seconds * self.partition_seconds)
+
+    def _expired(self, start, now):
+        """Whether every article in the partition starting at start is past the TTL"""
+        return self.ttl is not None and start + self.partition_seconds <= now - self.ttl
+
+    def add_drop_listener(self, callback):
+        """
+        Register a callback for expired articles
+
+        Args:
+            callback (callable): Called with the list of article ids of every
+                partition dropped by drop_expired
+        """
+        self._drop_listeners.append(callback)
+
+    def drop_expired(self, now=None):
+        """
+        Drop every partition whose articles are all older than the TTL
+
+        Each drop closes one VectorDB and deletes its files, independent of
+        how many articles the partition holds. Drop listeners are told which
+        article ids went away.
+
+        Args:
+            now (float): Reference POSIX time (defaults to now)
+
+        Returns:
+            int: Number of partitions dropped
+        """
+        now = time.time() if now is None else now
+        dropped_ids = []
+        with self._lock:
+            expired = [start for start in self._partitions if self._expired(start, now)]
+            for start in expired:
+                db = self._partitions.pop(start)
+                dropped_ids.extend(db.ids)
+                db.close()
+                for _, path in self._partition_files(start):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+        if dropped_ids:
+            for callback in self._drop_listeners:
+                try:
+                    callback(dropped_ids)
+                except Exception as e:
+                    print(f"Error notifying partition drop: {e}")
+        return len(expired)
+
+    def store_vector(self, article):
+        """Store an article with its feature vector (see store_vectors)"""
+        self.store_vectors([article])
+
+    def store_vectors(self, articles):
+        """
+        Store a batch of articles in their time partitions
+
+        Articles already past the TTL are not stored. An article whose date
+        moved it to another partition is removed from the old one.
+
+        Args:
+            articles (list): Articles with 'vector' fields
+
+        Returns:
+            int: Number of articles stored
+        """
+        now = time.time()
+        self.drop_expired(now)
+
+        with self._lock:
+            groups = {}
+            for article in date_undated(articles, now):
+                start = self._partition_start(article)
+                if self._expired(start, now):
+                    continue
+                article_id = article.get('id')
+                if article_id:
+                    for other_start, db in self._partitions.items():
+                        if other_start != start and article_id in db:
+                            db.delete_vector(article_id)
+                groups.setdefault(start, []).append(article)
+
+            for start, group in groups.items():
+                if start not in self._partitions:
+                    self._partitions[start] = self._open_partition(start)
+                self._partitions[start].store_vectors(group)
+            return sum(len(group) for group in groups.values())
+
+    def delete_vector(self, article_id):
+        """Delete an article by id; returns True if it existed"""
+        return any([db.delete_vector(article_id) for db in self._snapshot_partitions()])
+
+    def get(self, article_id):
+        """Get a stored article by id, or None"""
+        for db in self._snapshot_partitions():
+            article = db.get(article_id)
+            if article is not None:
+                return article
+        return None
+
+    def clear(self):
+        """Drop every stored article (in memory only)"""
+        for db in self._snapshot_partitions():
+            db.clear()
+
+    def compact(self):
+        """Compact every partition"""
+        for db in self._snapshot_partitions():
+            db.compact()
+
+    def close(self):
+        """Close every partition"""
+        for db in self._snapshot_partitions():
+            db.close()
+
+    def query_similar_vectors(self, query_vector, top_n=3, half_life=None, now=None):
+        """Find vectors similar to the query vector (see VectorDB.query_similar_vectors)"""
+        return self.query_similar_vectors_batch([query_vector], top_n, half_life, now)[0]
+
+    def query_similar_vectors_batch(self, query_vectors, top_n=3, half_life=None, now=None):
+        """
+        Find the vectors most similar to each of several query vectors
+
+        Each partition contributes its own top N; these are merged by score,
+        newer partitions first on ties.
+        """
+        query_vectors = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        per_partition = [
+            db._scored_matches(query_vectors, top_n, half_life, now) for db in self._snapshot_partitions()
+        ]
+        if not per_partition:
+            return [[] for _ in range(len(query_vectors))]
+
+        merged = []
+        for per_query in zip(*per_partition):
+            matches = (match for results in per_query for match in results)
+            merged.append([article for _, article in heapq.nlargest(top_n, matches, key=lambda match: match[0])])
+        return merged
+
+    def query_keywords(self, keywords, top_n=3, mode='any'):
+        """Find articles by keyword, ranked by match count then recency (see VectorDB.query_keywords)"""
+        if mode not in ('any', 'all'):
+            raise ValueError(f"Unknown keyword match mode: {mode}")
+        matches = [
+            (key[:2], order, article)
+            for order, db in enumerate(self._snapshot_partitions())
+            for key, article in db._ranked_keyword_matches(keywords, top_n, mode)
+        ]
+        return [article for _, _, article in heapq.nsmallest(top_n, matches, key=lambda match: match[:2])]
+
+    def query_hybrid(self, query_vector, keywords, top_n=3, mode='any', rrf_k=60,
+                     vector_weight=1.0, keyword_weight=1.0):
+        """
+        Find articles matching keywords, ranked by fused vector and keyword relevance
+
+        Candidates from every partition are ranked together, so the fusion
+        matches a single VectorDB holding all articles (see VectorDB.query_hybrid).
+        """
+        if mode not in ('any', 'all'):
+            raise ValueError(f"Unknown keyword match mode: {mode}")
+        databases = self._snapshot_partitions()
+        with ExitStack() as stack:
+            for db in databases:
+                stack.enter_context(db._lock)
+
+            candidates = [
+                (db, db._hybrid_candidates(query_vector, keywords, mode)) for db in databases if len(db)
+            ]
+            if not candidates:
+                return []
+            owners = [(db, row) for db, (rows, _, _, _) in candidates for row in rows.tolist()]
+            similarity, match_counts, timestamps = (
+                np.concatenate([signals[i] for _, signals in candidates]) for i in (1, 2, 3)
+            )
+            positions = fuse_ranks(similarity, match_counts, timestamps, top_n, rrf_k,
+                                   vector_weight, keyword_weight)
+            ranked = [owners[position][0]._article_at(owners[position][1]) for position in positions]
+
+            # Supplement with plain vector matches when too few articles match
+            if len(ranked) < top_n:
+                seen = {article.get('id') for article in ranked}
+                for article in self.query_similar_vectors(query_vector, top_n + len(seen)):
+                    if article.get('id') not in seen:
+                        ranked.append(article)
+            return ranked[:top_n]
+
+
+def article_timestamp(article):
+    """
+    Publication time of an article as a POSIX timestamp
+
+    Falls back to the 'stored_at' time date_undated gives undated articles,
+    then to 0 (infinitely old).
+    """
+    value = article.get('published_at') or article.get('date')
+    if value:
+        try:
+            return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+    return float(article.get('stored_at') or 0.0)
+
+
+def date_undated(articles, now=None):
+    """
+    Give articles without a usable publication date a 'stored_at' time
+
+    Undated articles are treated as published when first stored, both for
+    recency weighting and for time partitioning. Articles that already have
+    a date (or a 'stored_at' from an earlier store) are passed through.
+
+    Args:
+        articles (iterable): Articles to store
+        now (float): Storage POSIX time (defaults to now)
+
+    Returns:
+        list: The articles, undated ones copied with 'stored_at' set
+    """
+    now = time.time() if now is None else now
+    return [article if article_timestamp(article) else dict(article, stored_at=now) for article in articles]
+
+
+def fuse_ranks(similarity, match_counts, timestamps, top_n, rrf_k=60, vector_weight=1.0, keyword_weight=1.0):
+    """
+    Weighted reciprocal-rank fusion of vector and keyword rankings
+
+    Each candidate's vector rank (by similarity) and keyword rank (by match
+    count, then recency) are combined as
+    w_v / (rrf_k + rank_v) + w_k / (rrf_k + rank_k). Ties keep candidate order.
+
+    Args:
+        similarity (np.ndarray): Cosine similarity per candidate
+        match_counts (np.ndarray): Matched keywords per candidate
+        timestamps (np.ndarray): Publication timestamp per candidate
+        top_n (int): Number of candidates to keep
+        rrf_k (float): Rank fusion constant
+        vector_weight (float): Weight of the vector rank
+        keyword_weight (float): Weight of the keyword rank
+
+    Returns:
+        np.ndarray: Positions of the top N candidates, best first
+    """
+    n = len(similarity)
+    if not n:
+        return np.zeros(0, dtype=np.int64)
+    order = np.arange(n)
+    vector_rank = np.empty(n)
+    vector_rank[np.lexsort((order, -similarity))] = np.arange(1, n + 1)
+    keyword_rank = np.empty(n)
+    keyword_rank[np.lexsort((order, -timestamps, -match_counts))] = np.arange(1, n + 1)
+    fused = vector_weight / (rrf_k + vector_rank) + keyword_weight / (rrf_k + keyword_rank)
+    positions, _ = top_k(fused, top_n)
+    return positions
+
+
+def top_k(scores, k):
+    """
+    Indices and values of the k largest scores, best first
+
+    Selection is O(n) (see ai_utils.ranking.top_k_indices); ties keep the
+    lower index first, including ties at the k-th score.
+    """
+    rows = top_k_indices(scores, k)
+    return rows, scores[rows]
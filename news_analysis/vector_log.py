@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+
+class AppendLog:
+    """
+    Append-only NDJSON write-ahead log of vector store mutations
+
+    Each line is one record, either {"op": "upsert", "article": {...}} or
+    {"op": "delete", "id": "..."}. Records are flushed to the OS after every
+    append so a crash loses at most the tail that was still being written;
+    pass fsync=True to also force them to stable storage.
+
+    Compaction rotates the live log aside (to <path>.1), lets the caller write
+    a snapshot that covers every rotated record, and then discards the rotated
+    file. Replay therefore reads the rotated log (left behind by a crash during
+    compaction) before the live one.
+    """
+
+    def __init__(self, path, fsync=False):
+        """
+        Open (or create) the log
+
+        Args:
+            path (str): Path of the live log file
+            fsync (bool): Whether to fsync after every append
+        """
+        self.path = path
+        self.rotated_path = f"{path}.1"
+        self.fsync = fsync
+        self.record_count = 0
+        self._file = None
+
+    def _open(self):
+        """Open the live log for appending if it is not already open"""
+        if self._file is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+    def append(self, records):
+        """
+        Append records to the log and flush them
+
+        Args:
+            records (list): Records (dicts) to append
+        """
+        if not records:
+            return
+        self._open()
+        self._file.write(''.join(json.dumps(r, separators=(',', ':')) + '\n' for r in records))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.record_count += len(records)
+
+    def replay(self):
+        """
+        Yield every record in the rotated and live logs, oldest first
+
+        A truncated or corrupt line (the unflushed tail of a crashed writer)
+        ends replay of that file, and is cut off the live log so later appends
+        start on a clean line.
+        """
+        for path in (self.rotated_path, self.path):
+            if not os.path.exists(path):
+                continue
+            valid_bytes = 0
+            with open(path, 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        try:
+                            if not line.endswith(b'\n'):
+                                raise ValueError("unterminated record")
+                            record = json.loads(line)
+                        except ValueError:
+                            print(f"Ignoring truncated record at end of {path}")
+                            break
+                        self.record_count += 1
+                        yield record
+                    valid_bytes += len(line)
+            if path == self.path and valid_bytes < os.path.getsize(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(valid_bytes)
+
+    def rotate(self):
+        """Move the live log aside so a snapshot can absorb it"""
+        self.close()
+        if os.path.exists(self.path):
+            if os.path.exists(self.rotated_path):
+                # A previous compaction failed; keep its records ahead of ours
+                with open(self.rotated_path, 'ab') as dst, open(self.path, 'rb') as src:
+                    dst.write(src.read())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+        self.record_count = 0
+
+    def discard_rotated(self):
+        """Delete the rotated log once a snapshot covering it is durable"""
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def close(self):
+        """Close the live log file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def write_atomically(path, write_fn):
+    """
+    Write a file through a temporary sibling and atomically rename it into place
+
+    Args:
+        path (str): Destination path
+        write_fn (callable): Called with the open binary file object
+    """
+    # A unique temporary file per call, so concurrent writers of the same
+    # path never share (and tear) one
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write_fn(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,230 @@
+"""
+On-disk snapshot format for the news VectorDB
+
+A snapshot is a generation of data files plus a small manifest:
+
+    <base>.snapshot.json             manifest naming the current generation
+    <base>.snapshot-<gen>.npy        float32 (rows x dimension) vector matrix
+    <base>.snapshot-<gen>.normed.npy the same rows scaled to unit length
+    <base>.snapshot-<gen>.ids.npy    article ids (unicode array, '' for no id)
+                                     or .ids.json when any id is not a string
+    <base>.snapshot-<gen>.meta       metadata, one compact JSON object per row
+    <base>.snapshot-<gen>.offsets.npy  int64 byte offsets into the .meta file
+
+Vectors (raw and normalized) are opened with np.load(mmap_mode='r') and
+metadata through mmap, so a cold start only reads the ids, and every worker
+process serving the same snapshot shares the same page-cache pages, for
+queries as well as lookups. The manifest is replaced
+atomically after the data files are durable, so readers always see a
+complete generation.
+
+Run as a script to convert a legacy JSON array database:
+
+    python vector_snapshot.py news_vectors.json
+"""
+import json
+import mmap
+import os
+import sys
+import time
+import numpy as np
+from vector_log import write_atomically
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ai_utils.ranking import normalize_rows
+
+SNAPSHOT_VERSION = 1
+
+def manifest_path(base_path):
+    """Path of the snapshot manifest for a database base path"""
+    return f"{base_path}.snapshot.json"
+
+def encode_metadata(metadata):
+    """Serialize one metadata dict to the compact bytes stored in the .meta file"""
+    return json.dumps(metadata, separators=(',', ':')).encode('utf-8')
+
+def ids_suffix(ids):
+    """File suffix for ids: .npy when every id is a string or None, else .json"""
+    return '.npy' if all(i is None or isinstance(i, str) for i in ids) else '.json'
+
+def save_ids(f, ids):
+    """Write ids as a unicode array, or as JSON (see ids_suffix) to keep non-string ids"""
+    if ids_suffix(ids) == '.json':
+        f.write(json.dumps(ids, separators=(',', ':')).encode('utf-8'))
+    else:
+        np.save(f, np.asarray([i or '' for i in ids], dtype=str))
+
+def load_ids(path):
+    """Article ids of a snapshot, None for rows without one"""
+    if path.endswith('.json'):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return [i or None for i in np.load(path).tolist()]
+
+class Snapshot:
+    """Read-only, memory-mapped view of one snapshot generation"""
+
+    def __init__(self, base_path, manifest):
+        """
+        Open the files named by a manifest
+
+        Args:
+            base_path (str): Database base path
+            manifest (dict): Parsed manifest
+        """
+        directory = os.path.dirname(os.path.abspath(base_path))
+        self.rows = manifest['rows']
+        self.dimension = manifest['dimension']
+        self.vectors = np.load(os.path.join(directory, manifest['vectors']), mmap_mode='r')
+        # Snapshots written before normalized rows were stored have none
+        self.normed = None
+        if manifest.get('normed'):
+            self.normed = np.load(os.path.join(directory, manifest['normed']), mmap_mode='r')
+        self.ids = load_ids(os.path.join(directory, manifest['ids']))
+        self.offsets = np.load(os.path.join(directory, manifest['offsets']))
+
+        # mmap cannot map an empty file
+        self._meta_file = open(os.path.join(directory, manifest['metadata']), 'rb')
+        self._meta = b''
+        if os.fstat(self._meta_file.fileno()).st_size:
+            self._meta = mmap.mmap(self._meta_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def metadata_bytes(self, row):
+        """Raw encoded metadata of a snapshot row"""
+        return self._meta[self.offsets[row]:self.offsets[row + 1]]
+
+    def metadata(self, row):
+        """Decoded metadata dict of a snapshot row"""
+        return json.loads(self.metadata_bytes(row))
+
+def load_snapshot(base_path):
+    """
+    Open the current snapshot for a database base path
+
+    Args:
+        base_path (str): Database base path
+
+    Returns:
+        Snapshot: The open snapshot, or None if none has been written
+    """
+    path = manifest_path(base_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {manifest.get('version')}")
+    return Snapshot(base_path, manifest)
+
+def write_snapshot(base_path, matrix, ids, metadata_blobs, normed=None):
+    """
+    Write a new snapshot generation and atomically make it current
+
+    Args:
+        base_path (str): Database base path
+        matrix (np.ndarray): (rows x dimension) vectors, or None when empty
+        ids (list): Article id per row (None allowed)
+        metadata_blobs (iterable): Encoded metadata bytes per row, see encode_metadata
+        normed (np.ndarray): The rows of matrix scaled to unit length (computed when None)
+    """
+    directory = os.path.dirname(os.path.abspath(base_path))
+    name = os.path.basename(base_path)
+    generation = time.time_ns()
+    prefix = f"{name}.snapshot-{generation}"
+    if matrix is None:
+        matrix = np.zeros((0, 0), dtype=np.float32)
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    normed = normalize_rows(matrix) if normed is None else np.ascontiguousarray(normed, dtype=np.float32)
+
+    # Metadata and offsets
+    offsets = [0]
+
+    def write_metadata(f):
+        for blob in metadata_blobs:
+            f.write(blob)
+            offsets.append(offsets[-1] + len(blob))
+
+    write_atomically(os.path.join(directory, f"{prefix}.meta"), write_metadata)
+    write_atomically(os.path.join(directory, f"{prefix}.offsets.npy"),
+                     lambda f: np.save(f, np.asarray(offsets, dtype=np.int64)))
+    ids = list(ids)
+    ids_file = f"{prefix}.ids{ids_suffix(ids)}"
+    write_atomically(os.path.join(directory, ids_file), lambda f: save_ids(f, ids))
+    write_atomically(os.path.join(directory, f"{prefix}.npy"), lambda f: np.save(f, matrix))
+    write_atomically(os.path.join(directory, f"{prefix}.normed.npy"), lambda f: np.save(f, normed))
+
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'generation': generation,
+        'rows': int(matrix.shape[0]),
+        'dimension': int(matrix.shape[1]),
+        'vectors': f"{prefix}.npy",
+        'normed': f"{prefix}.normed.npy",
+        'ids': ids_file,
+        'metadata': f"{prefix}.meta",
+        'offsets': f"{prefix}.offsets.npy"
+    }
+
+    previous = None
+    path = manifest_path(base_path)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            previous = json.load(f)
+
+    write_atomically(path, lambda f: f.write(json.dumps(manifest, indent=2).encode('utf-8')))
+
+    # Drop the previous generation; open mmaps keep their pages until closed
+    if previous:
+        remove_generation(directory, previous)
+
+def remove_generation(directory, manifest):
+    """Delete the data files of the snapshot generation a manifest names"""
+    for key in ('vectors', 'normed', 'ids', 'metadata', 'offsets'):
+        if manifest.get(key):
+            try:
+                os.remove(os.path.join(directory, manifest[key]))
+            except OSError:
+                pass
+
+def remove_snapshot(base_path):
+    """
+    Delete the current snapshot of a database base path, manifest included
+
+    Args:
+        base_path (str): Database base path
+    """
+    path = manifest_path(base_path)
+    if not os.path.exists(path):
+        return
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    os.remove(path)
+    remove_generation(os.path.dirname(os.path.abspath(base_path)), manifest)
+
+def convert_json(json_path, base_path=None):
+    """
+    Convert a legacy JSON array database into a snapshot
+
+    Args:
+        json_path (str): Path of the legacy news_vectors.json file
+        base_path (str): Database base path (defaults to json_path without extension)
+
+    Returns:
+        int: Number of converted articles
+    """
+    base_path = base_path or os.path.splitext(json_path)[0]
+    with open(json_path, 'r') as f:
+        articles = json.load(f)
+
+    matrix = np.asarray([a['vector'] for a in articles], dtype=np.float32) if articles else None
+    ids = [a.get('id') for a in articles]
+    blobs = (encode_metadata({k: v for k, v in a.items() if k != 'vector'}) for a in articles)
+    write_snapshot(base_path, matrix, ids, blobs)
+    return len(articles)
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python vector_snapshot.py <news_vectors.json> [base_path]")
+        sys.exit(1)
+    count = convert_json(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Converted {count} articles from {sys.argv[1]}")
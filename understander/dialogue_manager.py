@@ -3,13 +3,40 @@ import logging
 import random
 import re
 import os
+import sys
 import uuid
 from datetime import datetime, timedelta
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from ai_utils.keyword_matcher import KeywordMatcher
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Financial goal keywords (substring matches)
+GOAL_KEYWORDS = {
+    'home_purchase': ['house', 'home', 'property', 'mortgage', 'buy', 'real estate'],
+    'retirement': ['retire', 'retirement', 'pension', '401k', 'ira'],
+    'education': ['education', 'college', 'university', 'school', 'tuition', 'student'],
+    'investment': ['invest', 'investment', 'stock', 'bond', 'portfolio', 'wealth'],
+    'debt_payment': ['pay off', 'debt', 'loan', 'credit card', 'student loan'],
+    'emergency_fund': ['emergency', 'fund', 'rainy day', 'safety net'],
+    'travel': ['travel', 'vacation', 'trip', 'holiday'],
+    'business': ['business', 'startup', 'company', 'entrepreneur']
+}
+
+# Risk tolerance keywords in priority order (substring matches)
+RISK_KEYWORDS = {
+    'conservative': ['conservative', 'low risk', 'safe', 'security', 'cautious', 'minimal risk'],
+    'moderate': ['moderate', 'balanced', 'middle', 'average', 'medium'],
+    'aggressive': ['aggressive', 'high risk', 'risky', 'growth', 'ambitious']
+}
+
+# Each keyword table is scanned in a single pass per message
+GOAL_MATCHER = KeywordMatcher(GOAL_KEYWORDS, unit='char')
+RISK_MATCHER = KeywordMatcher(RISK_KEYWORDS, unit='char')
+
 class DialogueState:
     """Class to track the state of a dialogue"""
     
@@ -372,23 +399,8 @@ class DialogueManager:
     
     def _extract_goals(self, message):
         """Extract financial goals from message"""
-        goal_keywords = {
-            'home_purchase': ['house', 'home', 'property', 'mortgage', 'buy', 'real estate'],
-            'retirement': ['retire', 'retirement', 'pension', '401k', 'ira'],
-            'education': ['education', 'college', 'university', 'school', 'tuition', 'student'],
-            'investment': ['invest', 'investment', 'stock', 'bond', 'portfolio', 'wealth'],
-            'debt_payment': ['pay off', 'debt', 'loan', 'credit card', 'student loan'],
-            'emergency_fund': ['emergency', 'fund', 'rainy day', 'safety net'],
-            'travel': ['travel', 'vacation', 'trip', 'holiday'],
-            'business': ['business', 'startup', 'company', 'entrepreneur']
-        }
-        
-        found_goals = []
-        msg_lower = message.lower()
-        
-        for goal, keywords in goal_keywords.items():
-            if any(keyword in msg_lower for keyword in keywords):
-                found_goals.append(goal)
+        matched = GOAL_MATCHER.labels(message)
+        found_goals = [goal for goal in GOAL_KEYWORDS if goal in matched]
         
         confidence = 0.0
         if found_goals:
@@ -399,15 +411,9 @@ class DialogueManager:
     
     def _extract_risk_tolerance(self, message):
         """Extract risk tolerance information from message"""
-        risk_keywords = {
-            'conservative': ['conservative', 'low risk', 'safe', 'security', 'cautious', 'minimal risk'],
-            'moderate': ['moderate', 'balanced', 'middle', 'average', 'medium'],
-            'aggressive': ['aggressive', 'high risk', 'risky', 'growth', 'ambitious']
-        }
-        
-        msg_lower = message.lower()
-        for tolerance, keywords in risk_keywords.items():
-            if any(keyword in msg_lower for keyword in keywords):
+        matched = RISK_MATCHER.labels(message)
+        for tolerance in RISK_KEYWORDS:
+            if tolerance in matched:
                 return 0.8, tolerance
         
         return 0.0, None